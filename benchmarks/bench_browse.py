@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+Benchmarks of browsing a synthetic library farm, for pytest-benchmark.
+
+    make bench            # compare with the last saved run, fail on regressions
+    make bench-baseline   # save a new baseline
+
+or directly
+
+    python -m pytest benchmarks/bench_browse.py --benchmark-storage=benchmarks/baselines/$(hostname -s) \\
+        --benchmark-compare --benchmark-compare-fail=median:25%
+
+Baselines are saved per machine under benchmarks/baselines/BENCH_MACHINE,
+by default the host name, make bench fails when a median is
+BENCH_THRESHOLD slower than in the last one, and when there is no
+baseline to compare with. Baselines are recorded on the machine they are
+compared on, none are committed.
+
+The farm, see synth.make_farm, is created once in the temporary directory,
+EDA_EXPLORER_BENCH_LIBRARIES and EDA_EXPLORER_BENCH_BIG_CELLS size it.
+
+"Cold" benchmarks clear the caches involved before each round, the others
+time the repeated calls the browser makes once they are warm.
+"""
+
+import gc
+import os
+import tempfile
+import time
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from eda_explorer.spyder import cadStuff
+
+from benchmarks.synth import make_farm
+
+LIBRARIES = int(os.environ.get('EDA_EXPLORER_BENCH_LIBRARIES', 5000))
+BIG_CELLS = int(os.environ.get('EDA_EXPLORER_BENCH_BIG_CELLS', 100000))
+
+
+def clear_caches():
+    cadStuff.clear_cdslib_cache()
+    cadStuff.xschem_scanner.clear()
+    cadStuff.master_tag_cache.clear()
+
+
+@pytest.fixture(scope='session')
+def farm():
+    root = os.path.join(tempfile.gettempdir(), 'eda_explorer_bench', f'farm{LIBRARIES}_{BIG_CELLS}')
+    return make_farm(root, LIBRARIES, big_cells=BIG_CELLS)
+
+@pytest.fixture
+def projhome(farm, monkeypatch):
+    """The module level cadStuff functions use $PROJHOME/cds.lib."""
+    monkeypatch.setenv('PROJHOME', os.path.dirname(farm))
+    clear_caches()
+    cadStuff.parse_cdslib()
+    return farm
+
+
+# --- cds.lib
+# ----------------------------------------------------------------------------
+def test_parse_cdslib_cold(benchmark, farm):
+    libraries = benchmark.pedantic(cadStuff.parse_cdslib, (farm,), setup=clear_caches, rounds=10)
+    assert len(libraries) == LIBRARIES + 3
+
+def test_parse_cdslib(benchmark, farm):
+    cadStuff.parse_cdslib(farm)
+    assert len(benchmark(cadStuff.parse_cdslib, farm)) == LIBRARIES + 3
+
+
+# --- Scanners
+# ----------------------------------------------------------------------------
+def test_isXschem_all_cold(benchmark, projhome):
+    libs = [lib for lib in cadStuff.parse_cdslib() if lib != 'missing']
+
+    def classify():
+        return sum(map(cadStuff.isXschem, libs))
+    xschem = benchmark.pedantic(classify, setup=cadStuff.xschem_scanner.clear, rounds=3)
+    assert xschem == LIBRARIES // 3 + 1
+
+def test_isXschem_all(benchmark, projhome):
+    libs = [lib for lib in cadStuff.parse_cdslib() if lib != 'missing']
+    benchmark(lambda: sum(map(cadStuff.isXschem, libs)))
+
+def test_getXschemCells_big_cold(benchmark, projhome):
+    cells = benchmark.pedantic(cadStuff.getXschemCells, ('big_xs',),
+                               setup=cadStuff.xschem_scanner.clear, rounds=3)
+    assert len(cells) == BIG_CELLS
+
+def test_getXschemCells_big(benchmark, projhome):
+    assert len(benchmark(cadStuff.getXschemCells, 'big_xs')) == BIG_CELLS
+
+def test_getXschemCellViews(benchmark, projhome):
+    # cell000000 has an xschemviews directory too
+    views = benchmark(cadStuff.getXschemCellViews, 'big_xs', 'cell000000')
+    assert set(views) == {'sch', 'sym', 'gen'}
+
+
+# --- oalcv
+# ----------------------------------------------------------------------------
+def test_oalcv_oa_cold(benchmark, projhome):
+    lcv = benchmark.pedantic(cadStuff.oalcv, ('big_oa/cell000042/schematic',),
+                             setup=cadStuff.master_tag_cache.clear, rounds=100)
+    assert lcv.viewfile.endswith('sch.oa')
+
+def test_oalcv_oa(benchmark, projhome):
+    assert benchmark(cadStuff.oalcv, 'big_oa/cell000042/schematic').viewfile.endswith('sch.oa')
+
+def test_oalcv_xschem(benchmark, projhome):
+    assert benchmark(cadStuff.oalcv, 'big_xs/cell000042/sch').viewfile.endswith('cell000042.sch')
+
+
+# --- Browser
+# ----------------------------------------------------------------------------
+@pytest.fixture
+def widget(projhome, qtbot, tmp_path_factory, monkeypatch):
+    """A built browser on the farm, its first refresh done."""
+    from qtpy.QtWidgets import QMainWindow
+    from eda_explorer.spyder.widgets import EDAExplorerWidget
+
+    class Parent(QMainWindow):
+        widgetlist = []
+
+    class Widget(EDAExplorerWidget):
+        CONF_SECTION = 'eda_explorer'
+
+    from eda_explorer.spyder import snapshot
+    from eda_explorer.spyder.fsguard import guard
+
+    cache = str(tmp_path_factory.getbasetemp() / 'cache')
+    monkeypatch.setenv('EDA_EXPLORER_CACHE', cache)
+    guard.reset()
+    parent = Parent()
+    qtbot.addWidget(parent)
+    widget = Widget(name='eda_explorer', plugin=None, parent=parent)
+    widget._setup()
+    widget.setup()
+    start = time.time()
+    widget.build()
+    wait_refreshed(qtbot, widget)
+    # The search index and the snapshot are built in the background once
+    # the refresh is done, not to be timed with what follows, nor the
+    # collection of the previous test's widget
+    qtbot.waitUntil(lambda: len(widget.search.libraries()) == LIBRARIES + 2, timeout=600000)
+    path = os.path.join(cache, 'snapshots', snapshot.snapshot_name(widget.cad.cdslibPath))
+    qtbot.waitUntil(lambda: os.path.exists(path) and os.stat(path).st_mtime >= start,
+                    timeout=600000)
+    gc.collect()
+    yield widget
+    widget.on_close()
+
+def wait_refreshed(qtbot, widget):
+    qtbot.waitUntil(lambda: not widget._futures and not widget._pendingLibs, timeout=600000)
+
+def test_b_Refresh(benchmark, qtbot, widget):
+    def refresh():
+        widget.b_Refresh()
+        wait_refreshed(qtbot, widget)
+    benchmark.pedantic(refresh, rounds=3)
+    assert widget.widgets['libraries'].model().rowCount() > 0
+
+@pytest.mark.parametrize('lib', ['big_oa', 'big_xs', 'lib00000'])
+def test_l_libraries(benchmark, widget, lib):
+    selection = widget.widgets['libraries'].selectionModel()
+
+    def click():
+        # Both run l_libraries, with no library selected it only clears
+        # the other lists
+        selection.clearSelection()
+        widget._select('libraries', lib)
+    benchmark(click)
+    assert widget.lib == lib
+    assert len(widget.widgets['cells'].model().names()) == (BIG_CELLS if lib.startswith('big') else 4)
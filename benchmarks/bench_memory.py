@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+Compare the memory held by a catalog of a synthetic project in the list
+and dictionary form the cadStuff helpers return with the CompactCatalog.
+
+    python -m benchmarks.bench_memory [--cells 20000]
+
+Memory is measured with tracemalloc as what stays allocated once each
+catalog is built, the scanner caches are cleared in between.
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from eda_explorer.spyder import cadStuff
+from eda_explorer.spyder.compact import CompactCatalog
+
+from .synth import make_project
+
+
+def clear_caches():
+    cadStuff.xschem_scanner.clear()
+    cadStuff.master_tag_cache.clear()
+
+def lists(ctx):
+    """Cell lists plus a {view: viewfile} dictionary per cell, per library."""
+    catalog = {}
+    for lib, lib_path in ctx.libraries().items():
+        if ctx.isXschem(lib):
+            cells = ctx.getXschemCells(lib)
+        else:
+            cells = cadStuff.oaCellsIn(lib_path)
+        catalog[lib] = (cells, {cell: ctx.getCellViewfiles(lib, cell) for cell in cells})
+    return catalog
+
+def compact(ctx):
+    catalog = CompactCatalog()
+    catalog.addContext(ctx, max_workers=1)
+    return catalog
+
+def measure(name, fn, *args):
+    clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    clear_caches()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f'{name:<10} {held/2**20:8.1f} MiB')
+    return result, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=int, default=20000)
+    parser.add_argument('--root', default=os.path.join(tempfile.gettempdir(), 'eda_explorer_bench'))
+    args = parser.parse_args()
+
+    cdslib = make_project(os.path.join(args.root, f'project{args.cells}'), args.cells)
+    ctx = cadStuff.CadContext(cdslib)
+    catalog, held_lists = measure('lists', lists, ctx)
+    cellviews = sum(len(views) for cells, viewD in catalog.values() for views in viewD.values())
+    del catalog
+    catalog, held_compact = measure('compact', compact, ctx)
+    assert len(catalog) == cellviews
+    print(f'{cellviews} cellviews, {held_lists/cellviews:.0f} vs {held_compact/cellviews:.0f} '
+          f'bytes per cellview, {held_lists/held_compact:.1f}x smaller')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+Compare the filesystem calls of listing an OpenAccess library the way the
+browser used to (os.listdir then os.path.isdir per entry) with the
+scandir based scanner.
+
+    python -m benchmarks.bench_oa_scan [--cells 20000] [--workers 8]
+
+Python level calls are counted, DirEntry only falls back to a stat of its
+own on filesystems that don't report entry types.
+"""
+
+import argparse
+import builtins
+import os
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from eda_explorer.spyder.scanner import scanOaLibrary
+
+from .synth import make_oa_library
+
+COUNTED = ('stat', 'lstat', 'listdir', 'scandir')
+
+
+@contextmanager
+def counting(counts):
+    """Count calls of the COUNTED os functions and of open."""
+    originals = {name: getattr(os, name) for name in COUNTED}
+    original_open = builtins.open
+
+    def wrap(name, fn):
+        def counted(*args, **kwargs):
+            counts[name] += 1
+            return fn(*args, **kwargs)
+        return counted
+
+    for name, fn in originals.items():
+        setattr(os, name, wrap(name, fn))
+    builtins.open = wrap('open', original_open)
+    try:
+        yield counts
+    finally:
+        for name, fn in originals.items():
+            setattr(os, name, fn)
+        builtins.open = original_open
+
+def read_master_tag(view_path):
+    try:
+        with open(os.path.join(view_path, 'master.tag')) as f:
+            next(f, None)
+            for line in f:
+                if line.strip():
+                    return os.path.join(view_path, line.strip())
+    except FileNotFoundError:
+        return None
+
+def listdir_scan(path):
+    """The listdir/isdir pattern of the original browser, for every cell."""
+    cells = sorted(d for d in os.listdir(path)
+                   if os.path.isdir(os.path.join(path, d)) and not d.startswith('.'))
+    result = {}
+    for cell in cells:
+        cell_path = os.path.join(path, cell)
+        if not os.path.isdir(cell_path):
+            continue
+        views = {d: p for d in os.listdir(cell_path)
+                 if os.path.isdir(p := os.path.join(cell_path, d)) and not d.startswith('.')}
+        result[cell] = {view: read_master_tag(p) for view, p in views.items()}
+    return result
+
+def run(name, fn, *args):
+    counts = Counter()
+    start = time.perf_counter()
+    with counting(counts):
+        result = fn(*args)
+    elapsed = time.perf_counter() - start
+    calls = ', '.join(f'{k} {counts[k]}' for k in COUNTED + ('open',) if counts[k])
+    print(f'{name:<22} {elapsed:7.2f} s   {calls}')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', default=os.path.join(tempfile.gettempdir(), 'eda_explorer_bench'))
+    args = parser.parse_args()
+
+    path = make_oa_library(os.path.join(args.root, f'oa{args.cells}'), args.cells)
+    before = run('listdir + isdir', listdir_scan, path)
+    serial = run('scandir', scanOaLibrary, path, read_master_tag, 1)
+    parallel = run(f'scandir, {args.workers} threads', scanOaLibrary, path,
+                   read_master_tag, args.workers)
+    assert before == serial == parallel
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+Time type-ahead searches of a SearchIndex of synthetic cell names.
+
+    python -m benchmarks.bench_search [--cells 1000000] [--libraries 200]
+
+Cell names are made of standard cell like parts, "nand2_x4_lvt",
+"sram_ctrl_17", so trigrams are shared as in real libraries. Every cell
+has one of a few sets of views. Each query is timed as typed, one search
+per keystroke.
+"""
+
+import argparse
+import random
+import time
+
+from eda_explorer.spyder.search import SearchIndex
+
+STEMS = ['inv', 'nand', 'nor', 'and', 'or', 'xor', 'xnor', 'aoi', 'oai', 'mux', 'buf',
+         'dff', 'latch', 'sdff', 'tie', 'fill', 'decap', 'clkbuf', 'sram', 'rom', 'pll',
+         'ldo', 'bandgap', 'comp', 'amp', 'adc', 'dac', 'serdes', 'ctrl', 'ana', 'esd']
+SUFFIXES = ['x1', 'x2', 'x4', 'x8', 'lvt', 'hvt', 'svt', 'top', 'core', 'tb', 'ctrl', 'io']
+
+VIEW_SETS = [('schematic', 'symbol'), ('layout', 'schematic', 'symbol'),
+             ('abstract', 'layout', 'schematic', 'symbol'), ('veriloga', 'symbol')]
+
+QUERIES = ['nand2_x4', 'clkbuf2_x8_lvt', 'sram1_ctrl', 'bandgap3_top', 'bandgpa3_top', 'x4_lvt',
+           'schematic', 'lib01/nand2/layout']
+
+
+def cell_names(count, seed=1):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        parts = [rng.choice(STEMS) + str(rng.randrange(1, 5))]
+        parts += rng.sample(SUFFIXES, rng.randrange(1, 3))
+        parts.append(str(rng.randrange(100)))
+        names.add('_'.join(parts))
+    return sorted(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=int, default=1000000)
+    parser.add_argument('--libraries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    names = cell_names(args.cells)
+    index = SearchIndex()
+    start = time.perf_counter()
+    per_lib = len(names) // args.libraries
+    for lib in range(args.libraries):
+        cells = names[lib * per_lib:(lib + 1) * per_lib]
+        index.setLibrary(f'lib{lib:04d}', cells,
+                         {cell: VIEW_SETS[i % len(VIEW_SETS)] for i, cell in enumerate(cells)})
+    print(f'indexed {len(index)} cells and their views in {time.perf_counter() - start:.1f} s')
+
+    start = time.perf_counter()
+    index.setLibrary('lib0000', names[:per_lib])
+    print(f'unchanged library update {1e3*(time.perf_counter() - start):.1f} ms')
+    # The browser doesn't keep the names, a million element list would only
+    # add garbage collector pauses to the timings
+    del names
+
+    worst = 0
+    for query in QUERIES:
+        times = []
+        for n in range(1, len(query) + 1):
+            start = time.perf_counter()
+            matches = index.search(query[:n], args.limit)
+            times.append(time.perf_counter() - start)
+        worst = max(worst, max(times))
+        print(f'{query:<16} {len(matches):4d} matches, '
+              f'mean {1e3*sum(times)/len(times):5.1f} ms, max {1e3*max(times):5.1f} ms per keystroke, '
+              f'best {matches[0] if matches else None}')
+    print(f'worst keystroke {1e3*worst:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+Synthetic libraries for the EDA Explorer benchmarks.
+
+    python -m benchmarks.synth /tmp/synth --cells 20000
+    python -m benchmarks.synth /tmp/farm --farm [--libraries 5000] [--cells 4]
+                               [--big-cells 100000] [--depth 20]
+"""
+
+import argparse
+import os
+
+OA_VIEWS = ('schematic', 'symbol', 'layout')
+XSCHEM_VIEWS = ('sch', 'sym')
+
+
+def make_oa_library(path, cells=20000, views=OA_VIEWS):
+    """
+    Create an OpenAccess library with cells cell directories, each with
+    the given view directories holding a master.tag and its viewfile.
+    Existing libraries are left alone.
+    """
+    if os.path.isdir(path):
+        return path
+    os.makedirs(path)
+    for i in range(cells):
+        for view in views:
+            view_path = os.path.join(path, f'cell{i:06d}', view)
+            os.makedirs(view_path)
+            viewfile = 'sch.oa' if view == 'schematic' else f'{view}.oa'
+            with open(os.path.join(view_path, 'master.tag'), 'w') as f:
+                f.write(f'-- Master.tag File, Rev:1.0\n{viewfile}\n')
+            open(os.path.join(view_path, viewfile), 'w').close()
+    return path
+
+def make_xschem_library(path, cells=20000, views=XSCHEM_VIEWS, extra_every=10):
+    """
+    Create an XSchem library with cells cells, every extra_every-th also
+    with an xschemviews directory holding a Python view.
+    Existing libraries are left alone.
+    """
+    if os.path.isdir(path):
+        return path
+    os.makedirs(os.path.join(path, 'xschemviews'))
+    for i in range(cells):
+        for view in views:
+            open(os.path.join(path, f'cell{i:06d}.{view}'), 'w').close()
+        if extra_every and i % extra_every == 0:
+            os.makedirs(os.path.join(path, 'xschemviews', f'cell{i:06d}'))
+            open(os.path.join(path, 'xschemviews', f'cell{i:06d}', 'gen.py'), 'w').close()
+    return path
+
+def make_project(root, cells=20000):
+    """Create an OpenAccess and an XSchem library and a cds.lib defining them."""
+    make_oa_library(os.path.join(root, 'oa'), cells)
+    make_xschem_library(os.path.join(root, 'xs'), cells)
+    with open(os.path.join(root, 'cds.lib'), 'w') as f:
+        f.write('DEFINE oa ./oa\nDEFINE xs ./xs\n')
+    return os.path.join(root, 'cds.lib')
+
+def make_farm(root, libraries=5000, cells=4, big_cells=100000, depth=20, xschem_every=3):
+    """
+    Create a project shaped like a large site: libraries small libraries,
+    every xschem_every-th an XSchem one, an OpenAccess and an XSchem
+    library of big_cells cells each, and a missing library.
+
+    The cds.lib DEFINEs the big libraries and INCLUDEs a chain of depth
+    files, each DEFINEing its share of the small libraries, SOFTDEFINEing
+    one already defined and INCLUDEing the next. An existing farm is left
+    alone.
+
+    Returns:
+        Path of the cds.lib
+    """
+    cdslib = os.path.join(root, 'cds.lib')
+    if os.path.isfile(cdslib):
+        return cdslib
+    make_oa_library(os.path.join(root, 'libs', 'big_oa'), big_cells, ('schematic',))
+    make_xschem_library(os.path.join(root, 'libs', 'big_xs'), big_cells)
+    names = [f'lib{i:05d}' for i in range(libraries)]
+    for i, lib in enumerate(names):
+        path = os.path.join(root, 'libs', lib)
+        if i % xschem_every == xschem_every - 1:
+            make_xschem_library(path, cells)
+        else:
+            make_oa_library(path, cells)
+
+    os.makedirs(os.path.join(root, 'inc'), exist_ok=True)
+    per_level = -(-libraries // depth)
+    for level in range(depth):
+        lines = [f'# Level {level + 1} of {depth}']
+        if level:
+            lines.append(f'SOFTDEFINE {names[(level - 1) * per_level]} /nowhere')
+        lines += [f'DEFINE {lib} ../libs/{lib}'
+                  for lib in names[level * per_level:(level + 1) * per_level]]
+        if level + 1 < depth:
+            lines.append(f'INCLUDE level{level + 2:03d}.lib')
+        with open(os.path.join(root, 'inc', f'level{level + 1:03d}.lib'), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+    # Written last, its presence marks a complete farm
+    with open(cdslib, 'w') as f:
+        f.write('DEFINE big_oa ./libs/big_oa\nDEFINE big_xs ./libs/big_xs\n'
+                'DEFINE missing ./libs/missing\nINCLUDE inc/level001.lib\n')
+    return cdslib
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', help='directory to create the project in')
+    parser.add_argument('--cells', type=int, default=None,
+                        help='cells per library, default 20000, 4 for a farm')
+    parser.add_argument('--farm', action='store_true', help='create a library farm, see make_farm')
+    parser.add_argument('--libraries', type=int, default=5000)
+    parser.add_argument('--big-cells', type=int, default=100000)
+    parser.add_argument('--depth', type=int, default=20)
+    args = parser.parse_args()
+    if args.farm:
+        print(make_farm(args.root, args.libraries, args.cells or 4, args.big_cells, args.depth))
+    else:
+        print(make_project(args.root, args.cells or 20000))
+
+
+if __name__ == '__main__':
+    main()
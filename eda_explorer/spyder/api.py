@@ -6,4 +6,149 @@
 # ----------------------------------------------------------------------------
 """
 EDA Explorer API.
+
+Query the libraries, cells and views of a project from scripts and batch
+jobs. Uses the same shared cds.lib contexts, XSchem scanner, master.tag
+cache and on-disk catalog as the browser, without importing qtpy or spyder:
+
+    from eda_explorer.spyder import api
+
+    api.ls('stdcells')                          # cells of a library
+    api.resolve(['stdcells/inv/schematic'])     # {lcv: viewfile}
+    for lcv in api.find('stdcells/inv*/layout'):
+        ...
+
+The eda-explorer command line tool gives the same queries with JSON output.
 """
+
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .cadStuff import (CadContext, _NamePattern, _apply_context, _check_lcv, _split_lcv,
+                       context, resolve_many)
+from .catalog import Catalog, shared_catalog
+
+DEFAULT_CDSLIB = "$PROJHOME/cds.lib"
+
+# A cds.lib path, several joined with os.pathsep, or a context
+CdsLib = Union[str, CadContext]
+
+
+def catalog() -> Catalog:
+    """The on-disk catalog shared with the browser, opened on first use."""
+    return shared_catalog()
+
+def _context(cdslib: CdsLib) -> CadContext:
+    return cdslib if isinstance(cdslib, CadContext) else context(cdslib)
+
+def _libPath(ctx: CadContext, lib: str) -> str:
+    lib_paths = ctx.libraries()
+    if lib not in lib_paths:
+        raise ValueError(f"Library '{lib}' not found in cds.lib")
+    return lib_paths[lib]
+
+def libraries(cdslib: CdsLib = DEFAULT_CDSLIB) -> Dict[str, str]:
+    """Library names mapped to their paths."""
+    return dict(_context(cdslib).libraries())
+
+def ls(path: str = '', cdslib: CdsLib = DEFAULT_CDSLIB) -> List[str]:
+    """
+    List one level of the library tree, as the browser lists do.
+
+    Args:
+        path: '' for the libraries, "lib" for the cells of a library or
+              "lib/cell" for the views of a cell
+        cdslib: cds.lib path, several joined with os.pathsep, or a CadContext
+
+    Returns:
+        Sorted names
+
+    Raises:
+        ValueError: If the library is not in cds.lib or path has more
+                    than two components
+    """
+    ctx = _context(cdslib)
+    parts = [part for part in path.split('/') if part]
+    if not parts:
+        return sorted(ctx.libraries())
+    if len(parts) > 2:
+        raise ValueError(f"Expected '', 'lib' or 'lib/cell', got '{path}'")
+    lib_path = _libPath(ctx, parts[0])
+    if len(parts) == 1:
+        return catalog().cells(lib_path)
+    return sorted(catalog().views(lib_path, parts[1]))
+
+def resolve(lcvs: Iterable[str], default_view: Optional[str] = None,
+            cdslib: CdsLib = DEFAULT_CDSLIB, max_workers: Optional[int] = 8,
+            strict: bool = False) -> Dict[str, Optional[str]]:
+    """
+    Resolve library/cell/view strings to their viewfiles, in one batch,
+    see resolve_many.
+
+    Args:
+        lcvs: "library/cell/view" strings, "library/cell" with default_view
+        default_view: View of strings without one
+        cdslib: cds.lib path, several joined with os.pathsep, or a CadContext
+        max_workers: Cells resolved at the same time
+        strict: Raise on the first malformed string or unknown library
+                instead of mapping it to None
+
+    Returns:
+        Dictionary mapping each string to its viewfile, None where there
+        is none, in the order of lcvs
+
+    Raises:
+        ValueError: If strict and a string can't be resolved
+    """
+    ctx = _context(cdslib)
+    lcvs = list(dict.fromkeys(lcvs))
+    try:
+        viewfiles = resolve_many(lcvs, default_view, max_workers, ctx)
+    except ValueError:
+        if strict:
+            raise
+        # Leave out the strings resolve_many rejects, the checks it makes
+        # before touching the filesystem, and resolve the rest in one batch
+        lib_paths = ctx.libraries()
+        cv_context = None
+        if any('_' in str(lcv).strip().split('/') for lcv in lcvs):
+            cv_context = ctx._detectCellviewContext()
+        valid = [lcv for lcv in lcvs if _resolvable(lcv, default_view, lib_paths, cv_context)]
+        resolved = dict(zip(valid, resolve_many(valid, default_view, max_workers, ctx)))
+        return {lcv: resolved.get(lcv) for lcv in lcvs}
+    return dict(zip(lcvs, viewfiles))
+
+def _resolvable(lcv: str, default_view: Optional[str], lib_paths: Dict[str, str],
+                cv_context: Optional[Dict[str, str]]) -> bool:
+    """True if resolve_many accepts lcv, a well formed string of a cds.lib library."""
+    try:
+        triple = _split_lcv(lcv, default_view)
+        if cv_context:
+            triple = _apply_context(cv_context, *triple)
+        _check_lcv(*triple)
+    except ValueError:
+        return False
+    return triple[0] in lib_paths
+
+def find(pattern: str, cdslib: CdsLib = DEFAULT_CDSLIB) -> Iterator[str]:
+    """
+    Libraries, cells or views matching a glob pattern, generated in
+    sorted order as they are found.
+
+    Args:
+        pattern: "lib", "lib/cell" or "lib/cell/view" with shell wildcards
+                 in any component, e.g. "std*/inv_*/layout"
+        cdslib: cds.lib path, several joined with os.pathsep, or a CadContext
+
+    Returns:
+        Generator of the matching "lib", "lib/cell" or "lib/cell/view"
+        strings, as many components as the pattern has, walked over the
+        catalog as oalcv.glob does
+
+    Raises:
+        ValueError: If pattern has no or more than three components
+    """
+    parts = pattern.split('/')
+    if not 1 <= len(parts) <= 3 or not all(parts):
+        raise ValueError(f"Expected 'lib', 'lib/cell' or 'lib/cell/view', got '{pattern}'")
+    walk = catalog().walk(_context(cdslib).libraries(), [_NamePattern(part) for part in parts])
+    return ('/'.join(names) for names in walk)
@@ -11,11 +11,20 @@ Basics of Cad tool Support
 
 import os
 import re
+import fnmatch
+from bisect import bisect_left
 from pathlib import Path
-from functools import lru_cache
-from typing import Dict, Set, Optional, Union
-import inspect
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import sys
 import importlib.util
+import threading
+
+from .fsguard import FsUnresponsive, guard
+from .instrument import fs, traced
+from .scanner import (XschemScanner, oaCells, oaCellViews, scanOaLibrary,
+                      xschem_scanner)
 
 def full(path):
     """
@@ -39,151 +48,288 @@ def full(path):
     
     return expanded
 
-def expand_env_vars(path: str) -> str:
-    """Expand environment variables in a path string."""
+def expand_env_vars(path: str, used: Optional[Dict[str, Optional[str]]] = None) -> str:
+    """
+    Expand environment variables in a path string.
+    
+    Args:
+        path: Path possibly containing $VAR or ${VAR} references
+        used: Optional dictionary that receives the value of every
+              variable referenced (None if it was unset)
+    """
+    def lookup(m):
+        name = m.group(1)
+        value = os.environ.get(name)
+        if used is not None:
+            used[name] = value
+        return m.group(0) if value is None else value
     # Handle ${VAR} and $VAR format
-    path = re.sub(r'\${([^}]+)}', lambda m: os.environ.get(m.group(1), m.group(0)), path)
-    path = re.sub(r'\$([A-Za-z0-9_]+)', lambda m: os.environ.get(m.group(1), m.group(0)), path)
+    path = re.sub(r'\${([^}]+)}', lookup, path)
+    path = re.sub(r'\$([A-Za-z0-9_]+)', lookup, path)
     return path
 
-@lru_cache(maxsize=None)
-def parse_cdslib(cdslib_path: str = "$PROJHOME/cds.lib") -> Dict[str, str]:
+# parse_cdslib caches, updated under _cdslib_lock, the results are read
+# without it by calls that don't revalidate
+# Parsed files: resolved path -> (stat key, env vars used, operations)
+_cdslib_files: Dict[str, Tuple] = {}
+# Composed results: expanded cds.lib path -> (dependencies, libraries), the
+# dependencies map every file visited to its stat key and env vars used
+_cdslib_results: Dict[str, Tuple] = {}
+_cdslib_lock = threading.RLock()
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime, size) of a file, None if it can't be stat'ed."""
+    try:
+        st = fs.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _env_unchanged(env: Dict[str, Optional[str]]) -> bool:
+    return all(os.environ.get(name) == value for name, value in env.items())
+
+def _parse_cdslib_file(file_path: str) -> Tuple[Dict[str, Optional[str]], List[Tuple]]:
     """
-    Parse a cds.lib file and return a dictionary of library names to their resolved paths.
-    Uses caching to avoid re-parsing the same file multiple times.
+    Parse a single cds.lib file without following its includes.
     
     Args:
-        cdslib_path: Path to the cds.lib file
+        file_path: Path to the cds.lib file
         
     Returns:
-        Dictionary mapping library names to their full resolved paths
+        Tuple of the environment variables referenced and the list of
+        operations, ('INCLUDE', path), ('DEFINE', lib, path),
+        ('SOFTDEFINE', lib, path) or ('UNDEFINE', lib), in file order
     """
-    libraries = {}
-    processed_files = set()  # Track processed files to prevent circular includes
+    env = {}
+    ops = []
+    current_dir = Path(file_path).parent
     
-    def resolve_path(path: str, relative_to: Path) -> str:
+    def resolve_path(path: str) -> str:
         """Resolve a path, handling both absolute and relative paths."""
-        path = expand_env_vars(path)
-        resolved_path = Path(path)
-        if not resolved_path.is_absolute():
-            resolved_path = (relative_to / path).resolve()
-        return str(resolved_path)
+        path = expand_env_vars(path, env)
+        if os.path.isabs(path):
+            return str(Path(path))
+        # Lexically, current_dir is already resolved. Touching the library
+        # directories is left to their classification, where a hung mount
+        # is timed out once per library rather than per DEFINE
+        return os.path.normpath(os.path.join(current_dir, path))
     
-    def process_file(file_path: str, processed: Set[str]) -> None:
-        """
-        Recursively process a cds.lib file and its includes.
-        
-        Args:
-            file_path: Path to the cds.lib file to process
-            processed: Set of already processed file paths
-        """
-        abs_path = str(Path(file_path).resolve())
+    try:
+        with fs.open(file_path, 'r') as f:
+            for line in f:
+                # Remove comments and strip whitespace
+                line = line.split('#')[0].strip()
+                if not line:
+                    continue
+                
+                parts = line.split()
+                command = parts[0].upper()
+                
+                if command in ('INCLUDE', 'SOFTINCLUDE'):
+                    if len(parts) >= 2:
+                        ops.append(('INCLUDE', resolve_path(parts[1])))
+                
+                elif command in ('DEFINE', 'SOFTDEFINE'):
+                    if len(parts) >= 3:
+                        # Interned, the same PDK is DEFINEd by every project
+                        ops.append((command, sys.intern(parts[1]),
+                                    sys.intern(resolve_path(' '.join(parts[2:])))))
+                
+                elif command == 'UNDEFINE':
+                    if len(parts) >= 2:
+                        ops.append(('UNDEFINE', parts[1]))
+    
+    except FileNotFoundError:
+        print(f"Warning: Could not find file {file_path}")
+    except Exception as e:
+        print(f"Error processing {file_path}: {str(e)}")
+    
+    return env, ops
+
+def _compose_cdslib(cdslib_path: str) -> Tuple[Dict, Dict[str, str]]:
+    """
+    Walk the INCLUDE graph of a cds.lib file, re-parsing only files that
+    changed since they were last parsed, and apply the operations in order.
+    
+    Returns:
+        Tuple of the dependencies and the library dictionary
+    """
+    libraries = {}
+    deps = {}
+    processed = set()  # Track processed files to prevent circular includes
+    
+    def process_file(file_path: str) -> None:
+        abs_path = fs.realpath(file_path)
         if abs_path in processed:
             return
         
         processed.add(abs_path)
-        current_dir = Path(file_path).parent
+        key = _stat_key(abs_path)
+        parsed = _cdslib_files.get(abs_path)
+        if parsed is None or parsed[0] != key or not _env_unchanged(parsed[1]):
+            parsed = (key,) + _parse_cdslib_file(abs_path)
+            _cdslib_files[abs_path] = parsed
+        deps[abs_path] = (key, parsed[1])
         
-        try:
-            with open(file_path, 'r') as f:
-                for line in f:
-                    # Remove comments and strip whitespace
-                    line = line.split('#')[0].strip()
-                    if not line:
-                        continue
-                    
-                    parts = line.split()
-                    command = parts[0].upper()
-                    
-                    if command in ('INCLUDE', 'SOFTINCLUDE'):
-                        if len(parts) >= 2:
-                            include_path = resolve_path(parts[1], current_dir)
-                            if os.path.exists(include_path):
-                                process_file(include_path, processed)
-                    
-                    elif command == 'DEFINE':
-                        if len(parts) >= 3:
-                            lib_name = parts[1]
-                            lib_path = resolve_path(' '.join(parts[2:]), current_dir)
-                            libraries[lib_name] = lib_path
-                    
-                    elif command == 'SOFTDEFINE':
-                        if len(parts) >= 3:
-                            lib_name = parts[1]
-                            if lib_name not in libraries:
-                                lib_path = resolve_path(' '.join(parts[2:]), current_dir)
-                                libraries[lib_name] = lib_path
-                    
-                    elif command == 'UNDEFINE':
-                        if len(parts) >= 2:
-                            lib_name = parts[1]
-                            libraries.pop(lib_name, None)
-        
-        except FileNotFoundError:
-            print(f"Warning: Could not find file {file_path}")
-        except Exception as e:
-            print(f"Error processing {file_path}: {str(e)}")
+        for op in parsed[2]:
+            command = op[0]
+            if command == 'INCLUDE':
+                if fs.exists(op[1]):
+                    process_file(op[1])
+                else:
+                    # Remember it so the include is picked up once it appears
+                    deps.setdefault(op[1], (None, {}))
+            elif command == 'DEFINE':
+                libraries[op[1]] = op[2]
+            elif command == 'SOFTDEFINE':
+                if op[1] not in libraries:
+                    libraries[op[1]] = op[2]
+            elif command == 'UNDEFINE':
+                libraries.pop(op[1], None)
     
-    process_file(expand_env_vars(cdslib_path), processed_files)
-    return libraries
+    process_file(cdslib_path)
+    return deps, libraries
 
-@lru_cache(maxsize=None)
-def isXschem(lib):
-    lD=parse_cdslib()
-    assert lib in lD
-    
-    path = Path(lD[lib])
-    
-    if not path.is_dir():
-        return False
-    
-    # Check for xschemviews directory
-    if (path / "xschemviews").is_dir():
-        return True
+@traced('parse_cdslib', library=None)
+def parse_cdslib(cdslib_path: str = "$PROJHOME/cds.lib", revalidate: bool = False) -> Dict[str, str]:
+    """
+    Parse a cds.lib file and return a dictionary of library names to their resolved paths.
     
-    # Check for files with specific extensions
-    target_extensions = {".sym", ".sch", ".va"}
+    Results are cached, a repeated call returns the same dictionary without
+    touching the filesystem. The cache records the (mtime, size) of the
+    cds.lib file and every file it INCLUDEs and the environment variables
+    they use: a call with revalidate only stats those files, and if any of
+    them changed, only the changed files are re-parsed and the
+    DEFINE/SOFTDEFINE/UNDEFINE result is recomposed. The browser
+    revalidates on Refresh and when a watched cds.lib file changes, other
+    callers can revalidate or clear_cdslib_cache.
     
-    # Iterate through files in the directory
-    for file_path in path.iterdir():
-        if file_path.is_file() and file_path.suffix in target_extensions:
-            return True
+    Args:
+        cdslib_path: Path to the cds.lib file
+        revalidate: Check the cached result against the files first
+        
+    Returns:
+        Dictionary mapping library names to their full resolved paths
+    """
+    cdslib_path = expand_env_vars(cdslib_path)
+    cached = _cdslib_results.get(cdslib_path)
+    if cached is not None and not revalidate:
+        return cached[1]
+    with _cdslib_lock:
+        cached = _cdslib_results.get(cdslib_path)
+        if cached is not None:
+            deps, libraries = cached
+            if not revalidate or all(_stat_key(path) == key and _env_unchanged(env)
+                                     for path, (key, env) in deps.items()):
+                return libraries
+        
+        deps, libraries = _compose_cdslib(cdslib_path)
+        _cdslib_results[cdslib_path] = (deps, libraries)
+        return libraries
+
+def cdslib_files(cdslib_path: str = "$PROJHOME/cds.lib") -> List[str]:
+    """
+    List the files a cds.lib is made of, the file itself and every file it
+    INCLUDEs, as of the last parse.
+    """
+    cdslib_path = expand_env_vars(cdslib_path)
+    with _cdslib_lock:
+        if cdslib_path not in _cdslib_results:
+            parse_cdslib(cdslib_path)
+        deps = _cdslib_results[cdslib_path][0]
+        return [path for path, (key, env) in deps.items() if key is not None]
+
+def clear_cdslib_cache() -> None:
+    """Forget all parsed cds.lib files."""
+    with _cdslib_lock:
+        _cdslib_files.clear()
+        _cdslib_results.clear()
+
+# Kept for callers of the former lru_cache interface
+parse_cdslib.cache_clear = clear_cdslib_cache
+
+@traced('isXschem')
+def isXschemDir(path) -> bool:
+    """
+    Check whether a library directory holds an XSchem library.
     
-    return False
+    Args:
+        path (str or Path): Path to the library directory
+        
+    Returns:
+        bool: True if the directory has an xschemviews folder or any
+        .sym/.sch/.va files
+    """
+    return xschem_scanner.isXschem(path)
 
-def getXschemCells(lib):
+@traced('xschemCells')
+def xschemCellsIn(path):
     """
     Get a list of all cell names in an XSchem library directory.
     
     Args:
-        directory_path (str or Path): Path to the XSchem library directory
+        path (str or Path): Path to the XSchem library directory
         
     Returns:
-        set: Set of unique cell names found in the directory
+        list: Sorted list of unique cell names found in the directory
     """
-    lD=parse_cdslib()
-    assert lib in lD    
-    path = Path(lD[lib])
+    return xschem_scanner.cells(path)
+
+@traced('xschemCellViews')
+def xschemCellViewsIn(lib_path, cell_name):
+    """
+    Get a dictionary of views available for a cell of an XSchem library directory.
     
-    cells = set()  # Using a set to automatically handle duplicates
+    Args:
+        lib_path (str or Path): Path to the XSchem library directory
+        cell_name (str): Name of the cell to find views for
+        
+    Returns:
+        dict: Dictionary mapping view names to their full file paths
+    """
+    return xschem_scanner.cellViews(lib_path, cell_name)
+
+@traced('oaCells')
+def oaCellsIn(path):
+    """
+    Get a sorted list of the cell directories of an OpenAccess library.
     
-    # Check for files with target extensions
-    target_extensions = {".sym", ".sch", ".va"}
-    for file_path in path.iterdir():
-        if file_path.is_file() and file_path.suffix in target_extensions:
-            # Add stem (filename without extension) to the set
-            cells.add(file_path.stem)
+    Args:
+        path (str): Path to the library directory
+        
+    Returns:
+        list: Sorted list of cell names, hidden entries excluded
+    """
+    return oaCells(path)
+
+@traced('oaCellViews')
+def oaCellViewsIn(lib_path, cell_name):
+    """
+    Get a dictionary of the view directories of an OpenAccess cell.
     
-    # Check for xschemviews subdirectories if the folder exists
-    xschemviews_path = path / "xschemviews"
-    if xschemviews_path.is_dir():
-        # Add names of all subdirectories in xschemviews
-        for subdir in xschemviews_path.iterdir():
-            if subdir.is_dir():
-                cells.add(subdir.name)
+    Args:
+        lib_path (str): Path to the library directory
+        cell_name (str): Name of the cell to find views for
+        
+    Returns:
+        dict: Dictionary mapping view names to their view directories
+    """
+    return oaCellViews(os.path.join(lib_path, cell_name))
+
+def isXschem(lib):
+    return context().isXschem(lib)
+
+def getXschemCells(lib):
+    """
+    Get a list of all cell names in an XSchem library.
     
-    # Convert to sorted list for consistent ordering
-    return sorted(list(cells))
+    Args:
+        lib (str): library
+        
+    Returns:
+        list: Sorted list of unique cell names found in the library
+    """
+    return context().getXschemCells(lib)
 
 def getXschemCellViews(lib, cell_name):
     """
@@ -196,33 +342,629 @@ def getXschemCellViews(lib, cell_name):
     Returns:
         dict: Dictionary mapping view names to their full file paths
     """
-    lD=parse_cdslib()
-    assert lib in lD    
-    lib_path = Path(lD[lib])
-    views = {}
-    
-    # Check for standard views (sch, sym, va)
-    standard_views = {
-        'sch': lib_path / f"{cell_name}.sch",
-        'sym': lib_path / f"{cell_name}.sym",
-        'va': lib_path / f"{cell_name}.va"
-    }
-    
-    # Add standard views if they exist
-    for view_name, file_path in standard_views.items():
-        if file_path.is_file():
-            views[view_name] = str(file_path)
-    
-    # Check for additional views in xschemviews directory
-    views_path = lib_path / "xschemviews" / cell_name
-    if views_path.is_dir():
-        for file_path in views_path.iterdir():
-            if file_path.is_file():
-                print(file_path)
-                view_name = file_path.stem  # Get filename without extension
-                views[view_name] = str(file_path)
-    
-    return views
+    return context().getXschemCellViews(lib, cell_name)
+
+XSCHEM_VIEWS = ('sch', 'sym', 'va')
+
+def _split_lcv(lcv_string: str, default_view: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    Split a "library/cell" or "library/cell/view" string.
+    
+    Raises:
+        ValueError: If the string is malformed, or has no view and no
+                    default_view is given
+    """
+    # Convert input to string if it's another oalcv object
+    lcv_string = str(lcv_string)
+    
+    # Split the input string
+    parts = lcv_string.strip().split('/')
+    
+    if len(parts) < 2:
+        raise ValueError(f"Invalid LCV string '{lcv_string}'. Must contain at least library/cell.")
+    
+    if len(parts) > 3:
+        raise ValueError(f"Invalid LCV string '{lcv_string}'. Too many '/' separators.")
+    
+    # Handle view
+    if len(parts) == 3:
+        return parts[0], parts[1], parts[2]
+    if default_view is None:
+        raise ValueError("No view specified and no default_view provided.")
+    return parts[0], parts[1], default_view
+
+def _apply_context(context: Dict[str, str], lib: str, cell: str, view: str) -> Tuple[str, str, str]:
+    """Replace "_" components with the values of a cellview context."""
+    if lib == "_":
+        lib = context["LIB"]
+    if cell == "_":
+        cell = context["CELL"]
+    if view == "_":
+        view = context["VIEW"]
+    return lib, cell, view
+
+def _check_lcv(lib: str, cell: str, view: str) -> None:
+    """Verify no empty components."""
+    if not lib:
+        raise ValueError("Library name cannot be empty")
+    if not cell:
+        raise ValueError("Cell name cannot be empty")
+    if not view:
+        raise ValueError("View name cannot be empty")
+
+_GLOB_SPECIAL = re.compile(r'[*?\[]')
+_REGEX_SPECIAL = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+class _NamePattern:
+    """
+    One component of a glob or regex LCV query, compiled.
+
+    Attributes:
+        match: Called with a name, true if the whole name matches
+        prefix: Literal prefix of every matching name, for pruning sorted
+                listings
+        literal: The only name that matches, None if there are others
+    """
+    def __init__(self, pattern: str, regex: bool = False):
+        if not pattern:
+            raise ValueError("LCV query components cannot be empty")
+        if regex:
+            self.match = re.compile(pattern).fullmatch
+            m = _REGEX_SPECIAL.search(pattern)
+            end = len(pattern) if m is None else m.start()
+            if '|' in pattern:
+                end = 0
+            elif m is not None and m.group() in '*?{' and end > 0:
+                # The last literal character is quantified
+                end -= 1
+            self.literal = pattern if m is None else None
+        else:
+            self.match = re.compile(fnmatch.translate(pattern)).match
+            m = _GLOB_SPECIAL.search(pattern)
+            end = len(pattern) if m is None else m.start()
+            self.literal = pattern if m is None else None
+        self.prefix = pattern[:end]
+
+    @classmethod
+    def exact(cls, name: str) -> '_NamePattern':
+        """Pattern matching name only."""
+        pattern = cls.__new__(cls)
+        pattern.match = name.__eq__
+        pattern.prefix = pattern.literal = name
+        return pattern
+
+    def select(self, names: List[str]) -> Iterator[str]:
+        """Matching names of a sorted list, only the prefix range is tested."""
+        for i in range(bisect_left(names, self.prefix), len(names)):
+            name = names[i]
+            if not name.startswith(self.prefix):
+                break
+            if self.match(name):
+                yield name
+
+@traced('master.tag', library=2)
+def _read_master_tag(view_path: str) -> Optional[str]:
+    """Read master.tag of a view directory, see read_master_tag."""
+    master_tag = f"{view_path}/master.tag"
+    try:
+        with fs.open(master_tag, 'r') as f:
+            # Skip first line (header)
+            next(f, None)
+            # Get first non-empty line after header
+            for line in f:
+                line = line.strip()
+                if line:
+                    return f"{view_path}/{line}"
+            return None  # No viewfile found
+    except FileNotFoundError:
+        return None  # No master.tag found
+    except Exception as e:
+        raise ValueError(f"Error reading master.tag: {str(e)}")
+
+class MasterTagCache:
+    """
+    LRU cache of the viewfiles named by master.tag files.
+    
+    Entries are validated against the (mtime, size) of master.tag, so a
+    hit costs one stat instead of an open and a read, which matters on
+    network filesystems. Thread safe.
+    
+    Args:
+        maxsize: Number of master.tag files to remember
+    """
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, view_path: str) -> Optional[str]:
+        """Viewfile of the view directory view_path, see read_master_tag."""
+        master_tag = f"{view_path}/master.tag"
+        try:
+            st = fs.stat(master_tag)
+        except FileNotFoundError:
+            return None  # No master.tag found
+        except OSError as e:
+            raise ValueError(f"Error reading master.tag: {str(e)}")
+        key = (st.st_mtime_ns, st.st_size)
+        
+        with self._lock:
+            entry = self._entries.get(master_tag)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(master_tag)
+                return entry[1]
+        
+        viewfile = _read_master_tag(view_path)
+        with self._lock:
+            self._entries[master_tag] = (key, viewfile)
+            self._entries.move_to_end(master_tag)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return viewfile
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+# Shared by the contexts returned by context()
+master_tag_cache = MasterTagCache()
+
+def read_master_tag(view_path: str) -> Optional[str]:
+    """
+    Get the viewfile of an OpenAccess view from its master.tag.
+    Served from master_tag_cache while master.tag is unchanged.
+    
+    Args:
+        view_path: Path to the view directory
+        
+    Returns:
+        Full path of the viewfile, None if there is no master.tag or it
+        names no file
+        
+    Raises:
+        ValueError: If master.tag exists but can't be read
+    """
+    return master_tag_cache.get(view_path)
+
+class _CellviewIndex:
+    """
+    Reverse index from library directories to library names for one parse
+    of cds.lib, plus the cellview context found for each calling file.
+    
+    Library paths are indexed as cds.lib gives them and, on the first
+    lookup they don't answer, resolved: a calling file is found through
+    either its own path or its resolved one. Each library is resolved
+    under the filesystem guard, a dead mount leaves it unresolved.
+    """
+    def __init__(self, libraries: Dict[str, str], xschem: XschemScanner):
+        self.libraries = libraries
+        self.xschem = xschem
+        self.libDirs = {}
+        for lib_name, lib_path in libraries.items():
+            # First definition wins, as in a scan of cds.lib in order
+            self.libDirs.setdefault(str(Path(lib_path)), lib_name)
+        self._resolvedDirs: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+        self.files: Dict[str, Optional[Dict[str, str]]] = {}
+    
+    def resolvedDirs(self) -> Dict[str, str]:
+        """Resolved library directories mapped to library names, built once."""
+        with self._lock:
+            if self._resolvedDirs is None:
+                def resolve(lib_path):
+                    try:
+                        return guard.call(lib_path, fs.realpath, lib_path)
+                    except FsUnresponsive:
+                        return lib_path
+                
+                with ThreadPoolExecutor(max_workers=16, thread_name_prefix='eda_explorer-resolve') as pool:
+                    resolved = pool.map(resolve, self.libraries.values())
+                    self._resolvedDirs = {}
+                    for lib_name, lib_dir in zip(self.libraries, resolved):
+                        self._resolvedDirs.setdefault(lib_dir, lib_name)
+            return self._resolvedDirs
+    
+    def lookup(self, filename: str) -> Optional[Dict[str, str]]:
+        """Cellview context of a Python file, None if it isn't in a cellview."""
+        try:
+            filepath = Path(os.path.abspath(filename))
+            resolved = filepath.resolve()
+            
+            # Skip if it's not a file (e.g., interactive console)
+            if not resolved.is_file():
+                return None
+        except (OSError, ValueError):
+            return None
+        
+        # We need at least 3 levels: script.py, view, cell, lib_path
+        if len(resolved.parents) < 3:
+            return None
+        
+        # The script should be in a view directory, the cell directory is
+        # one up and the library directory two up
+        lib_name = None
+        if len(filepath.parents) >= 3:
+            lib_name = self.libDirs.get(str(filepath.parents[2]))
+        if lib_name is None:
+            filepath = resolved
+            lib_name = self.libDirs.get(str(filepath.parents[2]))
+            if lib_name is None:
+                lib_name = self.resolvedDirs().get(str(filepath.parents[2]))
+                if lib_name is None:
+                    return None
+        view_dir, cell_dir = filepath.parents[0], filepath.parents[1]
+        
+        if self.xschem.isXschem(self.libraries[lib_name]):
+            return {
+                "LIB": lib_name,
+                "CELL": view_dir.name,
+                "VIEW": filepath.stem
+            }
+        return {
+            "LIB": lib_name,
+            "CELL": cell_dir.name,
+            "VIEW": view_dir.name
+        }
+
+class CadContext:
+    """
+    Everything derived from one cds.lib: its library table, the reverse
+    index used to detect the calling cellview, a master.tag cache and an
+    XSchem scanner.
+    
+    Contexts don't share anything but the parse of the cds.lib files
+    themselves, so several projects can be used side by side and each
+    context's caches are evicted independently. All methods are thread safe.
+    
+    Args:
+        cdslib_path: Path to the cds.lib file, environment variables are
+                     expanded on every use
+        master_tags: master.tag cache to use, a new one by default
+        xschem: XSchem scanner to use, a new one by default
+    """
+    def __init__(self, cdslib_path: str = "$PROJHOME/cds.lib",
+                 master_tags: Optional[MasterTagCache] = None,
+                 xschem: Optional[XschemScanner] = None):
+        self.cdslibPath = cdslib_path
+        self.masterTags = master_tags if master_tags is not None else MasterTagCache()
+        self.xschem = xschem if xschem is not None else XschemScanner()
+        self._index: Optional[_CellviewIndex] = None
+    
+    def __repr__(self):
+        return f"CadContext('{self.cdslibPath}')"
+    
+    def libraries(self, revalidate: bool = False) -> Dict[str, str]:
+        """Library names mapped to their paths, see parse_cdslib."""
+        return parse_cdslib(self.cdslibPath, revalidate)
+    
+    def files(self) -> List[str]:
+        """Files the cds.lib is made of, see cdslib_files."""
+        return cdslib_files(self.cdslibPath)
+    
+    def readMasterTag(self, view_path: str) -> Optional[str]:
+        """read_master_tag through this context's cache."""
+        return self.masterTags.get(view_path)
+    
+    def isXschem(self, lib) -> bool:
+        lD=self.libraries()
+        assert lib in lD
+        return self.xschem.isXschem(lD[lib])
+    
+    def getXschemCells(self, lib) -> List[str]:
+        """See getXschemCells."""
+        lD=self.libraries()
+        assert lib in lD
+        return self.xschem.cells(lD[lib])
+    
+    def getXschemCellViews(self, lib, cell_name) -> Dict[str, str]:
+        """See getXschemCellViews."""
+        lD=self.libraries()
+        assert lib in lD
+        return self.xschem.cellViews(lD[lib], cell_name)
+    
+    def getCellViewfiles(self, lib, cell_name) -> Dict[str, Optional[str]]:
+        """See getCellViewfiles."""
+        lD=self.libraries()
+        assert lib in lD
+        if self.xschem.isXschem(lD[lib]):
+            return self.xschem.cellViews(lD[lib], cell_name)
+        return {view: self.readMasterTag(view_path)
+                for view, view_path in oaCellViewsIn(lD[lib], cell_name).items()}
+    
+    def getLibraryViewfiles(self, lib, max_workers=8) -> Dict[str, Dict[str, Optional[str]]]:
+        """See getLibraryViewfiles."""
+        lD=self.libraries()
+        assert lib in lD
+        if self.xschem.isXschem(lD[lib]):
+            return self.xschem.library(lD[lib])
+        
+        def viewfile(view_path):
+            try:
+                return self.readMasterTag(view_path)
+            except ValueError:
+                return None
+        
+        return scanOaLibrary(lD[lib], viewfile, max_workers)
+    
+    def oalcv(self, lcv_string: Union[str, 'oalcv'], default_view: Optional[str] = None) -> 'oalcv':
+        """oalcv resolved against this context."""
+        return oalcv(lcv_string, default_view, ctx=self)
+    
+    def resolveMany(self, lcvs: Iterable[Union[str, 'oalcv']], default_view: Optional[str] = None,
+                    max_workers: Optional[int] = None) -> List[Optional[str]]:
+        """See resolve_many."""
+        triples = [_split_lcv(lcv, default_view) for lcv in lcvs]
+        lib_paths = self.libraries()
+        if any('_' in triple for triple in triples):
+            context = self._detectCellviewContext(lib_paths)
+            if context:
+                triples = [_apply_context(context, *triple) for triple in triples]
+        
+        cells: Dict[Tuple[str, str], Set[str]] = {}
+        for lib, cell, view in triples:
+            if lib not in lib_paths:
+                raise ValueError(f"Library '{lib}' not found in cds.lib")
+            _check_lcv(lib, cell, view)
+            cells.setdefault((lib, cell), set()).add(view)
+        xschem = {lib: self.xschem.isXschem(lib_paths[lib]) for lib, cell in cells}
+        
+        def resolve_cell(key):
+            lib, cell = key
+            lib_path = lib_paths[lib]
+            if not xschem[lib]:
+                return key, {view: self.readMasterTag(f"{lib_path}/{cell}/{view}") for view in cells[key]}
+            viewfiles = {}
+            viewD = None
+            for view in cells[key]:
+                if view in XSCHEM_VIEWS:
+                    viewfiles[view] = f'{lib_path}/{cell}.{view}'
+                else:
+                    if viewD is None:
+                        viewD = self.xschem.cellViews(lib_path, cell)
+                    viewfiles[view] = viewD.get(view)
+            return key, viewfiles
+        
+        if max_workers and max_workers > 1 and len(cells) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='eda_explorer-resolve') as pool:
+                resolved = dict(pool.map(resolve_cell, cells))
+        else:
+            resolved = dict(map(resolve_cell, cells))
+        
+        return [resolved[lib, cell][view] for lib, cell, view in triples]
+
+    def glob(self, pattern: str, default_view: Optional[str] = None) -> Iterator['oalcv']:
+        """See oalcv.glob."""
+        return self._query(pattern, default_view, False)
+
+    def regex(self, pattern: str, default_view: Optional[str] = None) -> Iterator['oalcv']:
+        """See oalcv.regex."""
+        return self._query(pattern, default_view, True)
+
+    def _query(self, pattern: str, default_view: Optional[str], regex: bool) -> Iterator['oalcv']:
+        """Compile an LCV query, the returned generator walks the libraries."""
+        parts = _split_lcv(pattern, default_view)
+        patterns = [_NamePattern(part, regex) for part in parts]
+        if pattern.strip().count('/') == 1:
+            patterns[2] = _NamePattern.exact(default_view)
+        if '_' in parts:
+            context = self._detectCellviewContext()
+            if context:
+                for i, key in enumerate(('LIB', 'CELL', 'VIEW')):
+                    if parts[i] == '_':
+                        patterns[i] = _NamePattern.exact(context[key])
+        return self._walk(*patterns)
+
+    def _walk(self, lib_pattern: _NamePattern, cell_pattern: _NamePattern,
+              view_pattern: _NamePattern) -> Iterator['oalcv']:
+        # The catalog module is built on this one
+        from .catalog import shared_catalog
+        walk = shared_catalog().walk(self.libraries(), (lib_pattern, cell_pattern, view_pattern))
+        for lib, cell, view in walk:
+            yield oalcv(f"{lib}/{cell}/{view}", ctx=self)
+
+    def _cellviewIndex(self, libraries: Optional[Dict[str, str]] = None) -> _CellviewIndex:
+        """
+        Index for the current cds.lib, rebuilt when the library table
+        changes. libraries is the table if the caller has it already.
+        """
+        if libraries is None:
+            libraries = self.libraries()
+        index = self._index
+        if index is None or index.libraries is not libraries:
+            # Racing threads build equal indexes, the last one is kept
+            index = self._index = _CellviewIndex(libraries, self.xschem)
+        return index
+    
+    def _detectCellviewContext(self, libraries: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+        """
+        Detect if the caller is running from within a Cadence cellview.
+        Returns dictionary with LIB, CELL, VIEW if found, None otherwise.
+        
+        Walks the raw frames without loading any source and looks each
+        calling file up in a cache, so only the first call from a given
+        file touches the filesystem. libraries is the library table if the
+        caller has it already.
+        """
+        index = self._cellviewIndex(libraries)
+        
+        frame = sys._getframe(1)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if not os.path.isabs(filename):
+                filename = os.path.join(os.getcwd(), filename)
+            try:
+                context = index.files[filename]
+            except KeyError:
+                context = index.files[filename] = index.lookup(filename)
+            if context is not None:
+                return dict(context)
+            frame = frame.f_back
+        
+        # If we get here, we didn't find a matching cellview context
+        return None
+
+class Workspace(CadContext):
+    """
+    Several cds.lib files used together through one library table.
+    
+    A library defined with the same path by several projects is listed
+    once. A name defined with different paths is listed once per path as
+    "name (project)", project being the directory name of the cds.lib.
+    The caches are keyed on library paths, so a site wide library shared
+    by every project is scanned and cached once.
+    
+    Args:
+        cdslib_paths: cds.lib files, in order
+        master_tags: As for CadContext
+        xschem: As for CadContext
+    """
+    def __init__(self, cdslib_paths: Iterable[str],
+                 master_tags: Optional[MasterTagCache] = None,
+                 xschem: Optional[XschemScanner] = None):
+        self.cdslibPaths = list(cdslib_paths)
+        super().__init__(os.pathsep.join(self.cdslibPaths), master_tags, xschem)
+        self._lock = threading.Lock()
+        # Tables of the projects and their merge
+        self._merged: Tuple[List[Dict[str, str]], Dict[str, str]] = ([], {})
+    
+    def __repr__(self):
+        return f"Workspace({self.cdslibPaths!r})"
+    
+    def labels(self) -> List[str]:
+        """Names of the projects used to tell conflicting libraries apart."""
+        labels = []
+        for path in self.cdslibPaths:
+            label = os.path.basename(os.path.dirname(expand_env_vars(path))) or path
+            if label in labels:
+                label = f"{label}-{len(labels) + 1}"
+            labels.append(label)
+        return labels
+    
+    def libraries(self, revalidate: bool = False) -> Dict[str, str]:
+        """
+        Merged library table, the same dictionary is returned for as long
+        as the projects' tables are unchanged.
+        """
+        tables = [parse_cdslib(path, revalidate) for path in self.cdslibPaths]
+        with self._lock:
+            parts, merged = self._merged
+            if len(parts) == len(tables) and all(a is b for a, b in zip(parts, tables)):
+                return merged
+        
+        labels = self.labels()
+        definitions: Dict[str, Dict[str, int]] = {}
+        for project, table in enumerate(tables):
+            for lib, lib_path in table.items():
+                definitions.setdefault(lib, {}).setdefault(lib_path, project)
+        merged = {}
+        for lib, paths in definitions.items():
+            if len(paths) == 1:
+                merged[lib] = next(iter(paths))
+            else:
+                for lib_path, project in paths.items():
+                    merged[sys.intern(f"{lib} ({labels[project]})")] = lib_path
+        with self._lock:
+            self._merged = (tables, merged)
+        return merged
+    
+    def files(self) -> List[str]:
+        """Files the cds.lib files are made of."""
+        return list(dict.fromkeys(f for path in self.cdslibPaths for f in cdslib_files(path)))
+
+_contexts: Dict[str, CadContext] = {}
+_contexts_lock = threading.Lock()
+
+def context(cdslib_path: str = "$PROJHOME/cds.lib") -> CadContext:
+    """
+    Get the shared context of a cds.lib, created on first use.
+    
+    Shared contexts are keyed on the expanded cds.lib path and use the
+    process wide master_tag_cache and xschem_scanner. The module level
+    functions and oalcv without ctx use the one of $PROJHOME/cds.lib.
+    
+    Args:
+        cdslib_path: Path to the cds.lib file, or several separated by
+                     os.pathsep for a Workspace
+    """
+    cdslib_path = expand_env_vars(cdslib_path)
+    with _contexts_lock:
+        ctx = _contexts.get(cdslib_path)
+        if ctx is None:
+            paths = [path for path in cdslib_path.split(os.pathsep) if path]
+            if len(paths) > 1:
+                ctx = Workspace(paths, master_tag_cache, xschem_scanner)
+            else:
+                ctx = CadContext(cdslib_path, master_tag_cache, xschem_scanner)
+            _contexts[cdslib_path] = ctx
+        return ctx
+
+def getCellViewfiles(lib, cell_name):
+    """
+    Get the viewfiles of all views of a cell.
+    
+    Args:
+        lib (str): library
+        cell_name (str): Name of the cell
+        
+    Returns:
+        dict: Dictionary mapping view names to their viewfiles, None for
+        OpenAccess views without one
+    """
+    return context().getCellViewfiles(lib, cell_name)
+
+def getLibraryViewfiles(lib, max_workers=8):
+    """
+    Get the viewfiles of every view of every cell of a library, OpenAccess
+    cells are scanned in parallel.
+    
+    Args:
+        lib (str): library
+        max_workers (int): Number of OpenAccess cells scanned at the same time
+        
+    Returns:
+        dict: Dictionary mapping cell names to {view: viewfile}, None for
+        OpenAccess views without a readable master.tag
+    """
+    return context().getLibraryViewfiles(lib, max_workers)
+
+def _detect_cellview_context() -> Optional[Dict[str, str]]:
+    """
+    Detect if the caller is running from within a Cadence cellview.
+    Returns dictionary with LIB, CELL, VIEW if found, None otherwise.
+    """
+    return context()._detectCellviewContext()
+
+def resolve_many(lcvs: Iterable[Union[str, 'oalcv']], default_view: Optional[str] = None,
+                 max_workers: Optional[int] = None, ctx: Optional[CadContext] = None) -> List[Optional[str]]:
+    """
+    Resolve many library/cell/view strings to their viewfiles at once.
+    
+    Gives the same viewfiles as oalcv(lcv, default_view).viewfile, but the
+    requests are grouped by library and cell: cds.lib is parsed once, each
+    library is classified once, each XSchem cell's views are listed once
+    and each OpenAccess master.tag is read once, however often it appears.
+    "_" components are filled in from the calling cellview as for oalcv.
+    
+    Args:
+        lcvs: "library/cell/view" strings or oalcv objects
+        default_view: Default view for strings without one
+        max_workers: Resolve cells on a thread pool of this size, useful
+                     on network filesystems
+        ctx: CadContext to resolve against, defaults to context()
+        
+    Returns:
+        List of viewfile paths, None where there is no viewfile, in the
+        order of lcvs
+        
+    Raises:
+        ValueError: As oalcv, for malformed strings and unknown libraries
+    """
+    if ctx is None:
+        ctx = context()
+    return ctx.resolveMany(lcvs, default_view, max_workers)
 
 class oalcv:
     """
@@ -234,157 +976,102 @@ class oalcv:
     Args:
         lcv_string: String in format "library/cell" or "library/cell/view"
         default_view: Default view to use if not specified in lcv_string
+        ctx: CadContext to resolve against, defaults to the one of
+             lcv_string if it is an oalcv, otherwise to context()
     """
-    def __init__(self, lcv_string: Union[str, 'oalcv'], default_view: Optional[str] = None):
-        # Convert input to string if it's another oalcv object
-        lcv_string = str(lcv_string)
-        
-        # Split the input string
-        parts = lcv_string.strip().split('/')
-        
-        if len(parts) < 2:
-            raise ValueError(f"Invalid LCV string '{lcv_string}'. Must contain at least library/cell.")
-        
-        if len(parts) > 3:
-            raise ValueError(f"Invalid LCV string '{lcv_string}'. Too many '/' separators.")
-            
-        # Assign library and cell
-        self.lib = parts[0]
-        self.cell = parts[1]
+    def __init__(self, lcv_string: Union[str, 'oalcv'], default_view: Optional[str] = None,
+                 ctx: Optional[CadContext] = None):
+        if ctx is None:
+            ctx = lcv_string.ctx if isinstance(lcv_string, oalcv) else context()
+        self.ctx = ctx
+        self.lib, self.cell, self.view = _split_lcv(lcv_string, default_view)
         
-        # Handle view
-        if len(parts) == 3:
-            self.view = parts[2]
-        else:
-            if default_view is None:
-                raise ValueError("No view specified and no default_view provided.")
-            self.view = default_view
+        # Get library paths from cds.lib, once for the context detection too
+        lib_paths = self.ctx.libraries()
                 
         # Try to detect if we're being called from within a cellview
-        self.scriptInfo = self._detect_cellview_context()
+        self.scriptInfo = self._detect_cellview_context(lib_paths)
         
         # print(self.scriptInfo)
 
         # Replace "_" with values from scriptInfo if available
         if self.scriptInfo:
-            if self.lib == "_":
-                self.lib = self.scriptInfo["LIB"]
-            if self.cell == "_":
-                self.cell = self.scriptInfo["CELL"]
-            if self.view == "_":
-                self.view = self.scriptInfo["VIEW"]
-
-        self.isXschem=isXschem(self.lib)
-        # Get library path from cds.lib
-        lib_paths = parse_cdslib()
+            self.lib, self.cell, self.view = _apply_context(self.scriptInfo, self.lib, self.cell, self.view)
+
         if self.lib not in lib_paths:
             raise ValueError(f"Library '{self.lib}' not found in cds.lib")
         
         # Set up paths
         self.libPath = lib_paths[self.lib]
+        self.isXschem=self.ctx.xschem.isXschem(self.libPath)
         
         if self.isXschem:
-            if self.view in ['sch','sym','va']:
+            if self.view in XSCHEM_VIEWS:
                 self.cellPath=str(self.libPath)
                 self.viewPath=str(self.libPath)
                 self.viewfile=f'{self.libPath}/{self.cell}.{self.view}'
             else:
                 self.cellPath=f'{self.libPath}/xschemviews/{self.cell}'
                 self.viewPath=f'{self.cellPath}'
-                viewD=getXschemCellViews(self.lib, self.cell)
+                viewD=self.ctx.xschem.cellViews(self.libPath, self.cell)
                 self.viewfile=viewD.get(self.view,None)
         else:
             self.cellPath = f"{self.libPath}/{self.cell}"
             self.viewPath = f"{self.cellPath}/{self.view}"
             
             # Read master.tag to get viewfile
-            master_tag = f"{self.viewPath}/master.tag"
-            try:
-                with open(master_tag, 'r') as f:
-                    # Skip first line (header)
-                    next(f)
-                    # Get first non-empty line after header
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            self.viewfile = f"{self.viewPath}/{line}"
-                            break
-                    else:
-                        self.viewfile = None  # No viewfile found
-            except FileNotFoundError:
-                self.viewfile = None  # No master.tag found
-            except Exception as e:
-                raise ValueError(f"Error reading master.tag: {str(e)}")
+            self.viewfile = self.ctx.readMasterTag(self.viewPath)
 
         # Verify no empty components
-        if not self.lib:
-            raise ValueError("Library name cannot be empty")
-        if not self.cell:
-            raise ValueError("Cell name cannot be empty")
-        if not self.view:
-            raise ValueError("View name cannot be empty")
-
-    def _detect_cellview_context(self) -> Optional[Dict[str, str]]:
+        _check_lcv(self.lib, self.cell, self.view)
+
+    def _detect_cellview_context(self, libraries: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
         """
         Detect if this class is being instantiated from within a Cadence cellview.
         Returns dictionary with LIB, CELL, VIEW if found, None otherwise.
         """
-        # Get the library paths from cds.lib
-        lib_paths = parse_cdslib()
-        
-        # Get the call stack
-        stack = inspect.stack()
-        
-        # Examine each frame in the stack
-        for frame in stack:
-            try:
-                # Get the full path of the Python file
-                filepath = Path(frame.filename).resolve()
-                
-                # Skip if it's not a file (e.g., interactive console)
-                if not filepath.is_file():
-                    continue
-                
-                # Get the parent directories
-                parts = list(filepath.parents)
-                
-                # We need at least 3 levels: script.py, view, cell, lib_path
-                if len(parts) < 3:
-                    continue
-                
-                # The script should be in a view directory
-                view_dir = parts[0]
-                # Cell directory is one up
-                cell_dir = parts[1]
-                # Library directory is two up
-                lib_dir = parts[2]
-                
-                # Check if this lib_dir matches any in our cds.lib
-                for lib_name, lib_path in lib_paths.items():
-                    if lib_dir == Path(lib_path):
-                        # We found a match! This script is in a cellview
-                        
-                        isXsch=isXschem(lib_name)
-                        
-                        if isXsch:
-                            return {
-                                "LIB": lib_name,
-                                "CELL": view_dir.name,
-                                "VIEW": filepath.stem
-                            }
-                        else:
-                            return {
-                                "LIB": lib_name,
-                                "CELL": cell_dir.name,
-                                "VIEW": view_dir.name
-                            }
-            
-            except (AttributeError, IndexError, TypeError):
-                # Skip any frames that don't have the info we need
-                continue
-        
-        # If we get here, we didn't find a matching cellview context
-        return None
+        return self.ctx._detectCellviewContext(libraries)
+
+    @staticmethod
+    def glob(pattern: str, default_view: Optional[str] = None,
+             ctx: Optional[CadContext] = None) -> Iterator['oalcv']:
+        """
+        Cellviews matching a "library/cell/view" glob, e.g.
+        oalcv.glob("stdcell*/inv_*/layout").
+
+        The pattern is compiled once and the libraries, cells and views are
+        walked in sorted order over the on-disk catalog, as api.find does,
+        listing only what the pattern leaves open: literal components are
+        looked up directly and listings are cut to the range of the
+        component's literal prefix. Matches are generated library by
+        library.
+
+        Args:
+            pattern: Shell wildcards (*, ?, [...]) in any component, "_"
+                     components are filled in from the calling cellview
+            default_view: View of patterns without one, taken literally
+            ctx: CadContext to search, defaults to context()
+
+        Returns:
+            Generator of oalcv objects
+
+        Raises:
+            ValueError: If the pattern is malformed, checked on the call
+        """
+        return (ctx if ctx is not None else context()).glob(pattern, default_view)
+
+    @staticmethod
+    def regex(pattern: str, default_view: Optional[str] = None,
+              ctx: Optional[CadContext] = None) -> Iterator['oalcv']:
+        """
+        As glob, each component of the pattern being a regular expression
+        the whole name has to match, e.g. oalcv.regex(r"std.*/inv_\\d+/layout").
+
+        Raises:
+            ValueError: If the pattern is malformed
+            re.error: If a component is not a valid regular expression
+        """
+        return (ctx if ctx is not None else context()).regex(pattern, default_view)
 
     def __str__(self):
         """String representation in library/cell/view format."""
@@ -399,7 +1086,7 @@ class oalcv:
         Check if the cellview exists by verifying viewfile exists.
         Returns False if viewfile is None or doesn't exist.
         """
-        return self.viewfile is not None and os.path.exists(self.viewfile)
+        return self.viewfile is not None and fs.exists(self.viewfile)
         
     def modDate(self) -> float | None:
         """
@@ -408,7 +1095,7 @@ class oalcv:
         """
         if not self.exists():
             return None
-        return os.path.getmtime(self.viewfile)
+        return fs.getmtime(self.viewfile)
         
     def read(self) -> str | None:
         """
@@ -418,7 +1105,7 @@ class oalcv:
         if not self.exists():
             return None
         try:
-            with open(self.viewfile, 'r') as f:
+            with fs.open(self.viewfile, 'r') as f:
                 return f.read()
         except Exception as e:
             raise ValueError(f"Error reading viewfile {self.viewfile}: {str(e)}")
@@ -463,7 +1150,7 @@ class oalcv:
             
             # Write the content
             try:
-                with open(self.viewfile, 'w') as f:
+                with fs.open(self.viewfile, 'w') as f:
                     f.write(content)
             except Exception as e:
                 raise ValueError(f"Error writing to viewfile {self.viewfile}: {str(e)}")
@@ -481,7 +1168,7 @@ class oalcv:
             
             # Create master.tag
             try:
-                with open(f"{self.viewPath}/master.tag", 'w') as f:
+                with fs.open(f"{self.viewPath}/master.tag", 'w') as f:
                     f.write("-- Master.tag File, Rev:1.0\n")
                     f.write(f"{viewfile}\n")
             except Exception as e:
@@ -490,7 +1177,7 @@ class oalcv:
             # Set and create viewfile
             self.viewfile = f"{self.viewPath}/{viewfile}"
             try:
-                with open(self.viewfile, 'w') as f:
+                with fs.open(self.viewfile, 'w') as f:
                     f.write(content)
             except Exception as e:
                 raise ValueError(f"Error writing to viewfile {self.viewfile}: {str(e)}")
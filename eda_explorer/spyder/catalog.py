@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer Catalog.
+
+Persistent on-disk index of the cells and views of every library directory,
+so the browser lists can be filled without walking the filesystem again.
+Listings are validated against directory fingerprints (mtime and link
+count) and only the directories that changed since the last scan are
+rescanned.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .cadStuff import (_NamePattern, isXschemDir, xschemCellsIn, xschemCellViewsIn,
+                       oaCellsIn, oaCellViewsIn)
+from .instrument import fs
+
+# Bump when the table layout changes, older databases are then rebuilt
+SCHEMA_VERSION = 3
+
+# Library kinds returned by Catalog.kind
+MISSING = 'missing'
+OA = 'oa'
+XSCHEM = 'xschem'
+
+# Filesystems the catalog is not put in WAL mode on: WAL needs memory shared
+# by the processes using the database, which a network filesystem can't give
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', 'lustre',
+                       'gpfs', 'ceph', 'fuse.sshfs', '9p'}
+MOUNTS = '/proc/self/mounts'
+
+
+def cache_dir() -> str:
+    """
+    Directory holding the EDA Explorer caches.
+
+    Uses $EDA_EXPLORER_CACHE if set, otherwise eda_explorer under
+    $XDG_CACHE_HOME (default ~/.cache). Best on a local disk, the catalog
+    is slower to share between Spyder instances on a network filesystem.
+    """
+    path = os.environ.get('EDA_EXPLORER_CACHE')
+    if not path:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(base, 'eda_explorer')
+    return path
+
+def _network_fs(path: str) -> bool:
+    """
+    True if the directory path is on one of NETWORK_FILESYSTEMS according
+    to the mount table. Paths are taken to be local without one.
+    """
+    try:
+        with fs.open(MOUNTS) as mounts:
+            entries = [line.split()[1:3] for line in mounts]
+    except OSError:
+        return False
+    path = fs.realpath(path)
+    mountpoint, fstype = '', None
+    for mount, kind in entries:
+        # Spaces in mount points are escaped
+        mount = mount.replace('\\040', ' ')
+        inside = path == mount or path.startswith(mount.rstrip('/') + '/')
+        if inside and len(mount) >= len(mountpoint):
+            mountpoint, fstype = mount, kind
+    return fstype in NETWORK_FILESYSTEMS
+
+def _fingerprint(path: str) -> Optional[str]:
+    """
+    Fingerprint of a directory, its mtime in ns and link count, None if it
+    does not exist. The link count tracks the number of subdirectories, so
+    it catches changes that fall within the mtime granularity of NFS.
+    """
+    try:
+        st = fs.stat(path)
+    except OSError:
+        return None
+    return f'{st.st_mtime_ns}/{st.st_nlink}'
+
+def _stamp(*paths: str) -> Optional[str]:
+    """
+    Validation stamp for a listing depending on the given directories.
+    Returns None if the first directory does not exist.
+    """
+    fingerprints = [_fingerprint(p) for p in paths]
+    if fingerprints[0] is None:
+        return None
+    return ':'.join('-' if f is None else f for f in fingerprints)
+
+
+_shared: Optional['Catalog'] = None
+_shared_lock = threading.Lock()
+
+def shared_catalog() -> 'Catalog':
+    """The catalog in cache_dir() of the API and LCV queries, opened on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Catalog()
+        return _shared
+
+
+class LibraryChanges(NamedTuple):
+    """Cells that changed in a library since it was last scanned."""
+    added: List[str]
+    removed: List[str]
+    # Cells whose view listing changed
+    changed: List[str]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+
+class Catalog:
+    """
+    SQLite backed index of library, cell and view listings.
+
+    Rows are keyed on the library directory rather than the library name
+    so one database serves every cds.lib that points at the same library.
+    All methods are thread safe. Filesystem access happens outside the
+    database lock, so a hung directory only blocks its own caller.
+
+    Args:
+        path: Database file, defaults to catalog.sqlite in cache_dir().
+              Falls back to an in-memory database if it can't be opened.
+    """
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.path.join(cache_dir(), 'catalog.sqlite')
+        self._lock = threading.RLock()
+        try:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = self._connect(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: Could not open catalog {path}: {str(e)}")
+            path = ':memory:'
+            self._db = self._connect(path)
+        self.path = path
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if path != ':memory:':
+            # Several Spyder instances may share the same catalog, through
+            # a rollback journal on a network filesystem
+            mode = 'DELETE' if _network_fs(os.path.dirname(path)) else 'WAL'
+            db.execute(f'PRAGMA journal_mode={mode}')
+            db.execute('PRAGMA synchronous=NORMAL')
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        with db:
+            if version != SCHEMA_VERSION:
+                for table in ('libraries', 'cells', 'views'):
+                    db.execute(f'DROP TABLE IF EXISTS {table}')
+                db.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            db.execute('CREATE TABLE IF NOT EXISTS libraries ('
+                       'path TEXT PRIMARY KEY, stamp TEXT NOT NULL, xschem INTEGER NOT NULL)')
+            db.execute('CREATE TABLE IF NOT EXISTS cells ('
+                       'lib TEXT NOT NULL, name TEXT NOT NULL, stamp TEXT, '
+                       'PRIMARY KEY (lib, name))')
+            db.execute('CREATE TABLE IF NOT EXISTS views ('
+                       'lib TEXT NOT NULL, cell TEXT NOT NULL, name TEXT NOT NULL, path TEXT NOT NULL, '
+                       'PRIMARY KEY (lib, cell, name))')
+        return db
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    # --- Queries
+    # ------------------------------------------------------------------------
+    def kind(self, lib_path: str) -> str:
+        """
+        Kind of the library at lib_path, one of MISSING, OA or XSCHEM.
+        Rescans the cell listing if the library directory changed.
+        """
+        return self._library(lib_path)
+
+    def cells(self, lib_path: str, scan: bool = True) -> Optional[List[str]]:
+        """
+        Sorted cell names of the library at lib_path.
+
+        Args:
+            scan: False to get None rather than have a missing or out of
+                  date listing scanned, the check costs two stats
+        """
+        kind = self._library(lib_path, scan)
+        if kind is None:
+            return None
+        if kind == MISSING:
+            return []
+        return self._cellNames(lib_path)
+
+    def views(self, lib_path: str, cell: str, scan: bool = True) -> Optional[Dict[str, str]]:
+        """
+        Views of a cell of the library at lib_path.
+
+        Args:
+            scan: False to get None rather than have a missing or out of
+                  date listing scanned
+
+        Returns:
+            Dictionary mapping view names to the view file (XSchem) or
+            view directory (OpenAccess)
+        """
+        kind, lib_stamp = self._libraryStamp(lib_path, scan)
+        if kind is None:
+            return None
+        if kind == MISSING:
+            return {}
+        return self._cellViews(lib_path, cell, kind, lib_stamp, scan)
+
+    def walk(self, lib_paths: Dict[str, str],
+             patterns: Sequence[_NamePattern]) -> Iterator[Tuple[str, ...]]:
+        """
+        Walk the libraries, cells and views matching a query in sorted
+        order, for api.find and oalcv.glob. Literal library and cell names
+        are looked up rather than listed, and listings are cut to the
+        range of a component's literal prefix.
+
+        Args:
+            lib_paths: Library names mapped to their paths
+            patterns: Library, cell and view components, one to three
+
+        Returns:
+            Generator of (lib,), (lib, cell) or (lib, cell, view) tuples,
+            one name per pattern
+        """
+        depth = len(patterns)
+        if patterns[0].literal is not None:
+            libs = [patterns[0].literal] if patterns[0].literal in lib_paths else []
+        else:
+            libs = patterns[0].select(sorted(lib_paths))
+        for lib in libs:
+            if depth == 1:
+                yield (lib,)
+                continue
+            lib_path = lib_paths[lib]
+            kind, lib_stamp = self._libraryStamp(lib_path)
+            if kind == MISSING:
+                continue
+            cells = list(patterns[1].select(self._cellNames(lib_path, patterns[1].literal)))
+            if depth == 2:
+                yield from ((lib, cell) for cell in cells)
+                continue
+            views = self._cellsViews(lib_path, cells, kind, lib_stamp)
+            for cell in cells:
+                for view in patterns[2].select(sorted(views[cell])):
+                    yield lib, cell, view
+
+    def contents(self, lib_path: str) -> Dict[str, Optional[Dict[str, str]]]:
+        """
+        Everything stored for the library at lib_path, without checking
+        it against the filesystem: the cells, each mapped to its views as
+        views would return them, or None if they have not been listed.
+        """
+        with self._lock:
+            cells = {sys.intern(name): None if stamp is None else {}
+                     for name, stamp in self._db.execute('SELECT name, stamp FROM cells WHERE lib=?',
+                                                         (lib_path,))}
+            for cell, name, path in self._db.execute('SELECT cell, name, path FROM views WHERE lib=?',
+                                                     (lib_path,)):
+                if cells.get(cell) is not None:
+                    cells[cell][sys.intern(name)] = path
+        return cells
+
+    def rescan(self, lib_path: str) -> LibraryChanges:
+        """
+        Poll a library for changes, for filesystems without notifications.
+
+        Walks the fingerprint tree: the library and xschemviews directories
+        are always stat'ed, but cells are only visited if their views have
+        been listed before, and only cells whose fingerprint changed are
+        rescanned. A rescan that finds nothing costs two stats plus one
+        per listed cell, XSchem cells included: their stamps reuse the
+        library fingerprint.
+        """
+        with self._lock:
+            before = {name for name, in self._db.execute('SELECT name FROM cells WHERE lib=?',
+                                                         (lib_path,))}
+        kind, stamp = self._libraryStamp(lib_path)
+        with self._lock:
+            rows = self._db.execute('SELECT name, stamp FROM cells WHERE lib=?',
+                                    (lib_path,)).fetchall()
+        after = {name for name, _ in rows}
+        changed = []
+        if kind != MISSING:
+            for cell, cell_stamp in rows:
+                if cell_stamp is None:
+                    continue
+                new = self._cellStamp(lib_path, cell, kind, stamp)
+                if new != cell_stamp and new is not None:
+                    self._scanViews(lib_path, cell, kind, new)
+                    changed.append(cell)
+        return LibraryChanges(sorted(after - before), sorted(before - after), sorted(changed))
+
+    def invalidate(self, lib_path: Optional[str] = None) -> None:
+        """Forget the listings of lib_path, or of every library if None."""
+        with self._lock, self._db:
+            if lib_path is None:
+                for table in ('libraries', 'cells', 'views'):
+                    self._db.execute(f'DELETE FROM {table}')
+            else:
+                self._db.execute('DELETE FROM libraries WHERE path=?', (lib_path,))
+                self._db.execute('DELETE FROM cells WHERE lib=?', (lib_path,))
+                self._db.execute('DELETE FROM views WHERE lib=?', (lib_path,))
+
+    # --- Scanning
+    # ------------------------------------------------------------------------
+    def _library(self, lib_path: str, scan: bool = True) -> Optional[str]:
+        """
+        Make sure the cell listing of lib_path is current and return its
+        kind, None if it isn't and scan is False.
+        """
+        return self._libraryStamp(lib_path, scan)[0]
+
+    def _libraryStamp(self, lib_path: str, scan: bool = True) -> Tuple[Optional[str], Optional[str]]:
+        """_library, and the stamp the listing was validated against."""
+        stamp = _stamp(lib_path, os.path.join(lib_path, 'xschemviews'))
+        if stamp is None:
+            return MISSING, None
+        with self._lock:
+            row = self._db.execute('SELECT stamp, xschem FROM libraries WHERE path=?',
+                                   (lib_path,)).fetchone()
+        if row is not None and row[0] == stamp:
+            return XSCHEM if row[1] else OA, stamp
+        if not scan:
+            return None, stamp
+
+        xschem = isXschemDir(lib_path)
+        try:
+            cells = set(xschemCellsIn(lib_path) if xschem else oaCellsIn(lib_path))
+        except OSError:
+            return MISSING, None
+        with self._lock, self._db:
+            if row is not None and bool(row[1]) != xschem:
+                # Library changed kind, none of the view listings are valid
+                self._db.execute('DELETE FROM cells WHERE lib=?', (lib_path,))
+                self._db.execute('DELETE FROM views WHERE lib=?', (lib_path,))
+            known = {name for name, in self._db.execute('SELECT name FROM cells WHERE lib=?',
+                                                        (lib_path,))}
+            gone = [(lib_path, name) for name in known - cells]
+            self._db.executemany('DELETE FROM cells WHERE lib=? AND name=?', gone)
+            self._db.executemany('DELETE FROM views WHERE lib=? AND cell=?', gone)
+            self._db.executemany('INSERT INTO cells (lib, name, stamp) VALUES (?, ?, NULL)',
+                                 [(lib_path, name) for name in cells - known])
+            self._db.execute('INSERT OR REPLACE INTO libraries (path, stamp, xschem) '
+                             'VALUES (?, ?, ?)', (lib_path, stamp, int(xschem)))
+        return XSCHEM if xschem else OA, stamp
+
+    def _cellNames(self, lib_path: str, name: Optional[str] = None) -> List[str]:
+        """Sorted cells stored for lib_path, only name if given."""
+        with self._lock:
+            if name is not None:
+                rows = self._db.execute('SELECT name FROM cells WHERE lib=? AND name=?',
+                                        (lib_path, name))
+            else:
+                rows = self._db.execute('SELECT name FROM cells WHERE lib=? ORDER BY name',
+                                        (lib_path,))
+            return [sys.intern(name) for name, in rows]
+
+    def _cellViews(self, lib_path: str, cell: str, kind: str, lib_stamp: Optional[str],
+                   scan: bool = True) -> Optional[Dict[str, str]]:
+        """As views, once the library listing was found current with lib_stamp."""
+        stamp = self._cellStamp(lib_path, cell, kind, lib_stamp)
+        with self._lock:
+            row = self._db.execute('SELECT stamp FROM cells WHERE lib=? AND name=?',
+                                   (lib_path, cell)).fetchone()
+        if row is None or stamp is None:
+            return {}
+        if row[0] != stamp:
+            if not scan:
+                return None
+            self._scanViews(lib_path, cell, kind, stamp)
+        with self._lock:
+            rows = self._db.execute('SELECT name, path FROM views WHERE lib=? AND cell=?',
+                                    (lib_path, cell))
+            return {sys.intern(name): path for name, path in rows}
+
+    def _cellsViews(self, lib_path: str, cells: List[str], kind: str,
+                    lib_stamp: Optional[str]) -> Dict[str, Dict[str, str]]:
+        """_cellViews of each of a sorted list of cells, stored ones read at once."""
+        if len(cells) < 2:
+            return {cell: self._cellViews(lib_path, cell, kind, lib_stamp) for cell in cells}
+        bounds = (lib_path, cells[0], cells[-1])
+        with self._lock:
+            stored = dict(self._db.execute('SELECT name, stamp FROM cells WHERE lib=? '
+                                           'AND name BETWEEN ? AND ?', bounds))
+            rows = self._db.execute('SELECT cell, name, path FROM views WHERE lib=? '
+                                    'AND cell BETWEEN ? AND ?', bounds).fetchall()
+        views = {cell: {} for cell in cells}
+        for cell, name, path in rows:
+            if cell in views:
+                views[cell][sys.intern(name)] = path
+        for cell in cells:
+            stamp = self._cellStamp(lib_path, cell, kind, lib_stamp)
+            if stamp is None or cell not in stored:
+                views[cell] = {}
+            elif stored[cell] != stamp:
+                self._scanViews(lib_path, cell, kind, stamp)
+                views[cell] = self._cellViews(lib_path, cell, kind, lib_stamp)
+        return views
+
+    def _cellStamp(self, lib_path: str, cell: str, kind: str,
+                   lib_stamp: Optional[str] = None) -> Optional[str]:
+        """
+        Stamp of the directories the view listing of a cell depends on.
+
+        Args:
+            lib_stamp: Current stamp of the library, saves an XSchem cell
+                       the stat of the library directory
+        """
+        if kind == XSCHEM:
+            cell_stamp = _stamp(os.path.join(lib_path, 'xschemviews', cell))
+            if lib_stamp is None:
+                lib_fingerprint = _fingerprint(lib_path)
+                if lib_fingerprint is None:
+                    return None
+            else:
+                lib_fingerprint = lib_stamp.split(':')[0]
+            return f"{lib_fingerprint}:{'-' if cell_stamp is None else cell_stamp}"
+        return _stamp(os.path.join(lib_path, cell))
+
+    def _scanViews(self, lib_path: str, cell: str, kind: str, stamp: str) -> None:
+        """Rescan the views of a cell and store them with their stamp."""
+        if kind == XSCHEM:
+            views = xschemCellViewsIn(lib_path, cell)
+        else:
+            views = oaCellViewsIn(lib_path, cell)
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM views WHERE lib=? AND cell=?', (lib_path, cell))
+            self._db.executemany('INSERT INTO views (lib, cell, name, path) VALUES (?, ?, ?, ?)',
+                                 [(lib_path, cell, name, path) for name, path in views.items()])
+            self._db.execute('UPDATE cells SET stamp=? WHERE lib=? AND name=?',
+                             (stamp, lib_path, cell))
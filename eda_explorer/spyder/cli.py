@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer command line tool.
+
+    eda-explorer ls [lib[/cell]]
+    eda-explorer resolve lib/cell/view ...    (or one per line on stdin)
+    eda-explorer find 'std*/inv_*/layout'
+    eda-explorer latency [--probe]            (slowest library roots)
+
+Results are written to stdout as JSON, see api for the queries.
+"""
+
+import argparse
+import json
+import sys
+
+from . import api
+from .latency import LatencyHistory
+
+
+def _lines(stream) -> list:
+    return [line.strip() for line in stream if line.strip()]
+
+def _dumpIter(items, out) -> None:
+    """Write an iterable as a JSON array, item by item."""
+    out.write('[')
+    for i, item in enumerate(items):
+        out.write(', ' if i else '')
+        out.write(json.dumps(item))
+        out.flush()
+    out.write(']\n')
+
+
+def _probe(history: LatencyHistory, cdslib: str, workers: int, timeout: float) -> None:
+    """Add a latency sample of each library of cdslib, skipping those not answering."""
+    from concurrent.futures import ThreadPoolExecutor
+    from .fsguard import FsUnresponsive, guard
+
+    def probe(lib_path):
+        try:
+            guard.call(lib_path, history.probe, lib_path)
+        except FsUnresponsive:
+            pass
+    guard.configure(timeout=timeout)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(probe, set(api.libraries(cdslib).values())))
+    history.save()
+
+def _latencyReport(history: LatencyHistory, limit: int) -> list:
+    return [dict(root=root, **stats) for root, stats in history.slowest(limit)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='eda-explorer',
+        description="Query the libraries, cells and views of a cds.lib, results as JSON.")
+    parser.add_argument('--cdslib', default=api.DEFAULT_CDSLIB,
+                        help="cds.lib file, or several joined with the path separator, "
+                             "default %(default)s")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ls = commands.add_parser('ls', help="list the libraries, the cells of a library "
+                                        "or the views of a cell")
+    ls.add_argument('path', nargs='?', default='', help="'lib' or 'lib/cell'")
+
+    resolve = commands.add_parser('resolve', help="map library/cell/view strings to their viewfiles")
+    resolve.add_argument('lcvs', nargs='*', metavar='lcv',
+                         help="'lib/cell/view', read one per line from stdin if none or '-'")
+    resolve.add_argument('--view', help="view of strings without one")
+    resolve.add_argument('--workers', type=int, default=8,
+                         help="cells resolved in parallel, default %(default)s")
+    resolve.add_argument('--strict', action='store_true',
+                         help="fail on malformed strings and unknown libraries instead of "
+                              "mapping them to null")
+
+    find = commands.add_parser('find', help="libraries, cells or views matching a glob pattern")
+    find.add_argument('pattern', help="'lib', 'lib/cell' or 'lib/cell/view', e.g. 'std*/inv_*/layout'")
+
+    latency = commands.add_parser('latency', help="slowest library roots, from the stat and scandir "
+                                                  "latencies recorded by the browser")
+    latency.add_argument('--limit', type=int, default=20,
+                         help="number of roots listed, default %(default)s")
+    latency.add_argument('--probe', action='store_true',
+                         help="time each library of the cds.lib first, and save the samples")
+    latency.add_argument('--workers', type=int, default=8,
+                         help="libraries probed in parallel, default %(default)s")
+    latency.add_argument('--timeout', type=float, default=2.0,
+                         help="seconds before a library is skipped as not responding, "
+                              "default %(default)s")
+
+    args = parser.parse_args(argv)
+    try:
+        match args.command:
+            case 'ls':
+                json.dump(api.ls(args.path, args.cdslib), sys.stdout)
+                sys.stdout.write('\n')
+            case 'resolve':
+                lcvs = args.lcvs
+                if not lcvs or lcvs == ['-']:
+                    lcvs = _lines(sys.stdin)
+                json.dump(api.resolve(lcvs, args.view, args.cdslib, args.workers, args.strict),
+                          sys.stdout)
+                sys.stdout.write('\n')
+            case 'find':
+                _dumpIter(api.find(args.pattern, args.cdslib), sys.stdout)
+            case 'latency':
+                history = LatencyHistory()
+                history.load()
+                if args.probe:
+                    _probe(history, args.cdslib, args.workers, args.timeout)
+                json.dump(_latencyReport(history, args.limit), sys.stdout)
+                sys.stdout.write('\n')
+    except (ValueError, OSError) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
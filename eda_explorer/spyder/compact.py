@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer compact catalog.
+
+In-memory library/cell/view catalog for projects with millions of
+cellviews. Names are stored once in a name table and everything else in
+integer arrays, libraries, cells and views each in their own table with
+the children of a row in a contiguous range. Paths are not stored but
+rebuilt from the names, so a cellview costs a few dozen bytes instead of
+the dictionaries and path strings of the scanner results.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional
+
+from .instrument import fs
+
+# How the viewfile of a view is located, stored per view
+OA = 0            # relative to lib/cell/view
+XSCHEM = 1        # lib/cell.view, not stored
+XSCHEM_VIEWS = 2  # relative to lib/xschemviews/cell
+ABSOLUTE = 3      # absolute path
+
+# Name id of views without a viewfile
+NO_FILE = -1
+
+
+class NameTable:
+    """Interned strings, each stored once and referred to by index."""
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def id(self, name: str) -> int:
+        """Index of name, added if new."""
+        try:
+            return self._ids[name]
+        except KeyError:
+            self._ids[name] = len(self.names)
+            self.names.append(name)
+            return len(self.names) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.names[index]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class MappedNameTable:
+    """
+    Read-only name table over a buffer of UTF-8 names and their offsets,
+    names are decoded on access.
+    """
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def id(self, name: str) -> int:
+        raise TypeError("Mapped catalogs are read-only")
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+class LibraryRecord:
+    """View of a library row of a CompactCatalog."""
+    __slots__ = ('catalog', 'index')
+
+    def __init__(self, catalog: 'CompactCatalog', index: int):
+        self.catalog = catalog
+        self.index = index
+
+    def __repr__(self):
+        return f"LibraryRecord('{self.name}')"
+
+    @property
+    def name(self) -> str:
+        return self.catalog.names[self.catalog.libName[self.index]]
+
+    @property
+    def path(self) -> str:
+        return self.catalog.names[self.catalog.libPath[self.index]]
+
+    @property
+    def xschem(self) -> bool:
+        return bool(self.catalog.libXschem[self.index])
+
+    def cells(self) -> Iterator['CellRecord']:
+        start = self.catalog.libCells[self.index]
+        for cell in range(start, start + self.catalog.libCellCount[self.index]):
+            yield CellRecord(self.catalog, cell)
+
+    def cellNames(self) -> List[str]:
+        names = self.catalog.names
+        cellName = self.catalog.cellName
+        start = self.catalog.libCells[self.index]
+        return [names[cellName[cell]]
+                for cell in range(start, start + self.catalog.libCellCount[self.index])]
+
+    def cell(self, name: str) -> Optional['CellRecord']:
+        """Cell called name, None if there is none. Binary search."""
+        catalog = self.catalog
+        start = catalog.libCells[self.index]
+        end = start + catalog.libCellCount[self.index]
+        row = bisect_left(catalog.cellName, name, start, end,
+                          key=catalog.names.__getitem__)
+        if row < end and catalog.names[catalog.cellName[row]] == name:
+            return CellRecord(catalog, row)
+        return None
+
+
+class CellRecord:
+    """View of a cell row of a CompactCatalog."""
+    __slots__ = ('catalog', 'index')
+
+    def __init__(self, catalog: 'CompactCatalog', index: int):
+        self.catalog = catalog
+        self.index = index
+
+    def __repr__(self):
+        return f"CellRecord('{self.library.name}/{self.name}')"
+
+    @property
+    def viewsKnown(self) -> bool:
+        """False if the cell was added without its views."""
+        return self.catalog.cellViewCount[self.index] >= 0
+
+    @property
+    def name(self) -> str:
+        return self.catalog.names[self.catalog.cellName[self.index]]
+
+    @property
+    def library(self) -> LibraryRecord:
+        return LibraryRecord(self.catalog, self.catalog.cellLib[self.index])
+
+    def views(self) -> Iterator['ViewRecord']:
+        start = self.catalog.cellViews[self.index]
+        for view in range(start, start + max(0, self.catalog.cellViewCount[self.index])):
+            yield ViewRecord(self.catalog, view)
+
+    def view(self, name: str) -> Optional['ViewRecord']:
+        """View called name, None if there is none."""
+        for view in self.views():
+            if view.name == name:
+                return view
+        return None
+
+
+class ViewRecord:
+    """View of a view row of a CompactCatalog."""
+    __slots__ = ('catalog', 'index')
+
+    def __init__(self, catalog: 'CompactCatalog', index: int):
+        self.catalog = catalog
+        self.index = index
+
+    def __repr__(self):
+        cell = self.cell
+        return f"ViewRecord('{cell.library.name}/{cell.name}/{self.name}')"
+
+    @property
+    def name(self) -> str:
+        return self.catalog.names[self.catalog.viewName[self.index]]
+
+    @property
+    def cell(self) -> CellRecord:
+        return CellRecord(self.catalog, self.catalog.viewCell[self.index])
+
+    @property
+    def path(self) -> Optional[str]:
+        """View directory (OpenAccess) or view file (XSchem), as the catalog."""
+        if self.catalog.viewKind[self.index] == OA:
+            cell = self.cell
+            return f"{cell.library.path}/{cell.name}/{self.name}"
+        return self.viewfile
+
+    @property
+    def viewfile(self) -> Optional[str]:
+        catalog = self.catalog
+        kind = catalog.viewKind[self.index]
+        if kind == XSCHEM:
+            cell = self.cell
+            return f"{cell.library.path}/{cell.name}.{self.name}"
+        file = catalog.viewFile[self.index]
+        if file == NO_FILE:
+            return None
+        file = catalog.names[file]
+        if kind == ABSOLUTE:
+            return file
+        cell = self.cell
+        if kind == OA:
+            return f"{cell.library.path}/{cell.name}/{self.name}/{file}"
+        return f"{cell.library.path}/xschemviews/{cell.name}/{file}"
+
+    @property
+    def mtime(self) -> Optional[float]:
+        """Modification time of the viewfile, None if it was not recorded."""
+        mtime = self.catalog.viewMtime[self.index]
+        return None if mtime < 0 else mtime / 1e9
+
+    @property
+    def size(self) -> Optional[int]:
+        size = self.catalog.viewSize[self.index]
+        return None if size < 0 else size
+
+
+class CompactCatalog:
+    """
+    Array backed catalog of libraries, cells and views.
+
+    Libraries are added whole with addLibrary, the cells of a library
+    and the views of a cell occupy contiguous, name sorted rows, so a
+    library is a range of cell rows and a cell a range of view rows.
+    Records returned by library, cell and view are __slots__ views on
+    those rows, created on access.
+    """
+    # The row tables, in the order they are serialized
+    ARRAYS = ('libName', 'libPath', 'libXschem', 'libCells', 'libCellCount',
+              'cellLib', 'cellName', 'cellViews', 'cellViewCount',
+              'viewCell', 'viewName', 'viewKind', 'viewFile', 'viewMtime', 'viewSize')
+
+    def __init__(self):
+        self.names = NameTable()
+        self._libraries: Dict[str, int] = {}
+        # Library rows
+        self.libName = array('i')
+        self.libPath = array('i')
+        self.libXschem = array('B')
+        self.libCells = array('i')
+        self.libCellCount = array('i')
+        # Cell rows
+        self.cellLib = array('i')
+        self.cellName = array('i')
+        self.cellViews = array('i')
+        self.cellViewCount = array('i')
+        # View rows
+        self.viewCell = array('i')
+        self.viewName = array('i')
+        self.viewKind = array('B')
+        self.viewFile = array('i')
+        self.viewMtime = array('q')
+        self.viewSize = array('q')
+
+    def __len__(self):
+        """Number of cellviews."""
+        return len(self.viewCell)
+
+    @classmethod
+    def frombuffers(cls, names, arrays: Dict[str, object]) -> 'CompactCatalog':
+        """
+        Catalog over existing tables, such as memoryviews of a mapped
+        file, which is read-only if they are.
+
+        Args:
+            names: Name table, a NameTable or MappedNameTable
+            arrays: Sequence for each of ARRAYS
+        """
+        catalog = cls.__new__(cls)
+        catalog.names = names
+        for name in cls.ARRAYS:
+            setattr(catalog, name, arrays[name])
+        catalog._libraries = {names[lib_name]: lib for lib, lib_name in enumerate(catalog.libName)}
+        return catalog
+
+    def addLibrary(self, name: str, path: str, cells: Dict[str, Dict[str, Optional[str]]],
+                   xschem: bool = False, stat: bool = False) -> LibraryRecord:
+        """
+        Add a library from a cell -> {view: viewfile} map, as returned by
+        getLibraryViewfiles.
+
+        Args:
+            name: Library name
+            path: Library directory
+            cells: Viewfiles of the views of each cell, None if a view
+                   has none. A cell mapped to None is added without its
+                   views, see CellRecord.viewsKnown
+            xschem: True for an XSchem library
+            stat: Record the mtime and size of every viewfile
+
+        Raises:
+            ValueError: If there already is a library called name
+        """
+        if name in self._libraries:
+            raise ValueError(f"Library '{name}' already in catalog")
+        names = self.names
+        lib = len(self.libName)
+        self._libraries[name] = lib
+        self.libName.append(names.id(name))
+        self.libPath.append(names.id(path))
+        self.libXschem.append(int(xschem))
+        self.libCells.append(len(self.cellLib))
+        self.libCellCount.append(len(cells))
+
+        for cell_name in sorted(cells):
+            views = cells[cell_name]
+            self.cellLib.append(lib)
+            self.cellName.append(names.id(cell_name))
+            self.cellViews.append(len(self.viewCell))
+            self.cellViewCount.append(-1 if views is None else len(views))
+            cell = len(self.cellLib) - 1
+            if views is None:
+                continue
+            for view_name in sorted(views):
+                viewfile = views[view_name]
+                if viewfile is None:
+                    kind, file = OA, NO_FILE
+                elif xschem and viewfile == f"{path}/{cell_name}.{view_name}":
+                    kind, file = XSCHEM, NO_FILE
+                else:
+                    if xschem:
+                        prefix, kind = f"{path}/xschemviews/{cell_name}/", XSCHEM_VIEWS
+                    else:
+                        prefix, kind = f"{path}/{cell_name}/{view_name}/", OA
+                    if viewfile.startswith(prefix):
+                        viewfile = viewfile[len(prefix):]
+                    else:
+                        kind = ABSOLUTE
+                    file = names.id(viewfile)
+                mtime = size = -1
+                if stat and views[view_name] is not None:
+                    try:
+                        st = fs.stat(views[view_name])
+                        mtime, size = st.st_mtime_ns, st.st_size
+                    except OSError:
+                        pass
+                self.viewCell.append(cell)
+                self.viewName.append(names.id(view_name))
+                self.viewKind.append(kind)
+                self.viewFile.append(file)
+                self.viewMtime.append(mtime)
+                self.viewSize.append(size)
+        return LibraryRecord(self, lib)
+
+    def addContext(self, ctx, libs: Optional[List[str]] = None, max_workers: int = 8,
+                   stat: bool = False) -> None:
+        """
+        Add the libraries of a CadContext, all existing ones by default.
+        Libraries whose directory can't be listed are skipped.
+        """
+        lib_paths = ctx.libraries()
+        for lib in (lib_paths if libs is None else libs):
+            try:
+                cells = ctx.getLibraryViewfiles(lib, max_workers)
+            except OSError:
+                continue
+            self.addLibrary(lib, lib_paths[lib], cells, ctx.isXschem(lib), stat)
+
+    def libraries(self) -> List[str]:
+        """Library names, in the order they were added."""
+        return list(self._libraries)
+
+    def library(self, name: str) -> Optional[LibraryRecord]:
+        lib = self._libraries.get(name)
+        return None if lib is None else LibraryRecord(self, lib)
+
+    def cell(self, lib: str, cell: str) -> Optional[CellRecord]:
+        library = self.library(lib)
+        return None if library is None else library.cell(cell)
+
+    def view(self, lib: str, cell: str, view: str) -> Optional[ViewRecord]:
+        record = self.cell(lib, cell)
+        return None if record is None else record.view(view)
+
+    def viewfiles(self, lib: str, cell: str) -> Dict[str, Optional[str]]:
+        """Viewfiles of the views of a cell, as getCellViewfiles."""
+        record = self.cell(lib, cell)
+        if record is None:
+            return {}
+        return {view.name: view.viewfile for view in record.views()}
@@ -7,6 +7,8 @@
 """
 EDA Explorer Preferences Page.
 """
+from qtpy.QtWidgets import QGroupBox, QVBoxLayout
+
 from spyder.api.preferences import PluginConfigPage
 from spyder.api.translations import get_translation
 
@@ -18,4 +20,64 @@ class EDAExplorerConfigPage(PluginConfigPage):
     # --- PluginConfigPage API
     # ------------------------------------------------------------------------
     def setup_page(self):
-        pass
+        fs_group = QGroupBox(_("Unresponsive libraries"))
+        timeout_spin = self.create_spinbox(
+            _("Filesystem timeout:"), _("ms"), 'fs_timeout',
+            min_=100, max_=60000, step=100,
+            tip=_("Libraries whose directory doesn't answer a quick probe "
+                  "within this time are marked as not responding. Listing "
+                  "a large library is not timed"))
+        cooldown_spin = self.create_spinbox(
+            _("Skip unresponsive libraries for:"), _("s"), 'fs_cooldown',
+            min_=1, max_=3600)
+
+        fs_layout = QVBoxLayout()
+        fs_layout.addWidget(timeout_spin)
+        fs_layout.addWidget(cooldown_spin)
+        fs_group.setLayout(fs_layout)
+
+        latency_group = QGroupBox(_("Slow libraries"))
+        slow_spin = self.create_spinbox(
+            _("Highlight libraries slower than:"), _("ms"), 'latency_slow',
+            min_=1, max_=10000,
+            tip=_("95th percentile of the library directory stat and "
+                  "listing times over the last days"))
+        very_slow_spin = self.create_spinbox(
+            _("Highlight as very slow from:"), _("ms"), 'latency_very_slow',
+            min_=1, max_=10000)
+        latency_layout = QVBoxLayout()
+        latency_layout.addWidget(slow_spin)
+        latency_layout.addWidget(very_slow_spin)
+        latency_group.setLayout(latency_layout)
+
+        poll_group = QGroupBox(_("Updates"))
+        poll_spin = self.create_spinbox(
+            _("Poll the selected library every:"), _("s"), 'poll_interval',
+            min_=0, max_=3600,
+            tip=_("Picks up changes on network filesystems that don't "
+                  "send change notifications, 0 disables polling"))
+        prefetch_box = self.create_checkbox(
+            _("Prefetch neighbouring and recent libraries while idle"), 'prefetch',
+            tip=_("Lists their cells and views in the background so "
+                  "clicking them doesn't wait on the file server"))
+        poll_layout = QVBoxLayout()
+        poll_layout.addWidget(poll_spin)
+        poll_layout.addWidget(prefetch_box)
+        poll_group.setLayout(poll_layout)
+
+        diagnostics_group = QGroupBox(_("Diagnostics"))
+        instrument_box = self.create_checkbox(
+            _("Record operation timings and filesystem calls"), 'instrument',
+            tip=_("Shown by Show timings in the options menu, with a small "
+                  "cost on every filesystem call while enabled"))
+        diagnostics_layout = QVBoxLayout()
+        diagnostics_layout.addWidget(instrument_box)
+        diagnostics_group.setLayout(diagnostics_layout)
+
+        vlayout = QVBoxLayout()
+        vlayout.addWidget(fs_group)
+        vlayout.addWidget(latency_group)
+        vlayout.addWidget(poll_group)
+        vlayout.addWidget(diagnostics_group)
+        vlayout.addStretch(1)
+        self.setLayout(vlayout)
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer filesystem guard.
+
+Runs filesystem probes with a timeout so a dead automount can't hang the
+caller. A library whose probe times out is tripped: further probes fail
+straight away until its cool-down has passed and the hung call returned.
+
+Only cheap calls should be guarded, a probe or a stat, not scans whose
+duration grows with the library: a large but healthy library would
+otherwise be taken for a hung one. Scan once the probe has answered.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+from .instrument import fs, recorder
+
+# Library state for libraries that did not answer in time, distinct from
+# the catalog MISSING state
+UNRESPONSIVE = 'unresponsive'
+
+
+class FsUnresponsive(TimeoutError):
+    """Raised when a guarded call timed out or its key is cooling down."""
+
+
+class FsGuard:
+    """
+    Per-key timeout and circuit breaker for filesystem calls.
+
+    Calls run on daemon threads, at most max_workers at a time, so a call
+    stuck in the kernel is abandoned rather than blocking the caller or
+    interpreter exit. A key stays tripped while its abandoned call is
+    still hung, so a dead server costs at most one thread. A call that
+    returns after its timeout closes the breaker again, one that fails
+    leaves it open for the cool-down.
+
+    Args:
+        timeout: Seconds to wait for a call
+        cooldown: Seconds a key is skipped after a timeout
+        max_workers: Maximum number of calls in flight
+    """
+    def __init__(self, timeout: float = 2.0, cooldown: float = 60.0, max_workers: int = 16):
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        # key -> (monotonic time the cool-down ends, hung thread)
+        self._tripped: Dict[Hashable, tuple] = {}
+
+    def configure(self, timeout: Optional[float] = None, cooldown: Optional[float] = None) -> None:
+        """Change the timeout and/or cool-down of subsequent calls."""
+        if timeout is not None:
+            self.timeout = timeout
+        if cooldown is not None:
+            self.cooldown = cooldown
+
+    def isTripped(self, key: Hashable) -> bool:
+        """True if calls for key are currently skipped."""
+        with self._lock:
+            tripped = self._tripped.get(key)
+            if tripped is None:
+                return False
+            until, thread = tripped
+            if time.monotonic() < until or thread.is_alive():
+                return True
+            del self._tripped[key]
+            return False
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        """Close the breaker of key, or of every key if None."""
+        with self._lock:
+            if key is None:
+                self._tripped.clear()
+            else:
+                self._tripped.pop(key, None)
+
+    def call(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) with the guard's timeout.
+
+        Args:
+            key: What the call is attributed to, usually a library path
+
+        Returns:
+            The result of fn, exceptions raised by fn are re-raised
+
+        Raises:
+            FsUnresponsive: If fn timed out, or key is cooling down
+        """
+        if self.isTripped(key):
+            raise FsUnresponsive(f"{key} is not responding")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise FsUnresponsive(f"No filesystem worker available for {key}")
+
+        done = threading.Event()
+        released = threading.Lock()
+        thread = None
+        outcome = {}
+        # Calls made by fn count towards the caller's instrumentation spans
+        counts = recorder.context()
+
+        def release():
+            # Whichever of the worker and the timeout comes first frees the slot
+            if released.acquire(blocking=False):
+                self._slots.release()
+
+        def run():
+            recorder.attach(counts)
+            try:
+                outcome['result'] = fn(*args, **kwargs)
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                with self._lock:
+                    done.set()
+                    tripped = self._tripped.get(key)
+                    if tripped is not None and tripped[1] is thread and 'error' not in outcome:
+                        # Slow rather than hung
+                        del self._tripped[key]
+                release()
+
+        thread = threading.Thread(target=run, name='eda_explorer-fsguard', daemon=True)
+        thread.start()
+        if not done.wait(self.timeout):
+            with self._lock:
+                # Unless it completed in the meantime
+                hung = not done.is_set()
+                if hung:
+                    self._tripped[key] = (time.monotonic() + self.cooldown, thread)
+            if hung:
+                release()
+                raise FsUnresponsive(f"{key} did not respond within {self.timeout:g}s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+
+    def probe(self, key: Hashable, path: Optional[str] = None) -> bool:
+        """
+        Check that a directory answers, a stat and the first entry of a
+        scandir, with the guard's timeout.
+
+        Args:
+            key: What the call is attributed to, usually a library path
+            path: Directory probed, key if None
+
+        Returns:
+            False if the directory doesn't exist or can't be read
+
+        Raises:
+            FsUnresponsive: If the probe timed out, or key is cooling down
+        """
+        return self.call(key, _answers, key if path is None else path)
+
+
+def _answers(path: str) -> bool:
+    try:
+        fs.stat(path)
+        with fs.scandir(path) as entries:
+            next(entries, None)
+    except OSError:
+        return False
+    return True
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+# Process wide guard, shared by the command line, the cellview index, the
+# watcher and the widget so a tripped library is skipped everywhere. It
+# only guards quick calls: probes, resolving library paths, up to date
+# checks of catalog listings and master.tag reads. Parsing cds.lib and
+# scanning a library are not timed
+guard = FsGuard(timeout=_env_float('EDA_EXPLORER_FS_TIMEOUT', 2.0),
+                cooldown=_env_float('EDA_EXPLORER_FS_COOLDOWN', 60.0))
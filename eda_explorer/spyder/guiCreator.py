@@ -1,5 +1,5 @@
 from qtpy.QtWidgets import (QHBoxLayout, QVBoxLayout, QTabWidget, QSizePolicy,
-                          QPushButton, QListWidget, QLineEdit, QComboBox,
+                          QPushButton, QListWidget, QListView, QLineEdit, QComboBox,
                           QLabel, QMainWindow, QGroupBox)
 # from qtpy.QtCore import Qt
 from qtpy.QtWidgets import QApplication, QWidget
@@ -76,6 +76,20 @@ def createListbox(obj, data):
     obj.widgets[data]=listBox
     return listBox
 
+def createListView(obj, data):
+    # Model based list, the model comes from the m_<name> factory
+    listView=QListView()
+    listView.setUniformItemSizes(True)
+    model_name = f'm_{data}'
+    if hasattr(obj, model_name):
+        listView.setModel(getattr(obj, model_name)())
+        handler_name = f'l_{data}'
+        if hasattr(obj, handler_name):
+            handler=getattr(obj, handler_name)
+            listView.selectionModel().selectionChanged.connect(lambda selected, deselected: handler())
+    obj.widgets[data]=listView
+    return listView
+
 def createEditText(obj, data):
     if ' ' in data:
         data, defaultText = data.split(' ',1)
@@ -108,6 +122,7 @@ def createWidget(obj, line):
     match(wtype):
         case 'b' : return createButton(obj, data)
         case 'l' : return createListbox(obj, data)
+        case 'v' : return createListView(obj, data)
         case 'e' : return createEditText(obj, data)
         case 'c' : return createComboBox(obj, data)
         case _ : raise ValueError(f"Unknown widget type in line : '{line}'")
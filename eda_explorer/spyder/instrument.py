@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer instrumentation.
+
+Opt-in timing of browser operations and of the filesystem calls they
+make, to tell a slow mount from a slow cds.lib or a slow list. While the
+recorder is enabled every span records its duration, its library and the
+stat, lstat, listdir, scandir and open calls made by its thread through
+fs. Only EDA Explorer's own calls go through fs, the os functions used by
+the rest of Spyder are never replaced. Spans are kept in memory for the
+EDA Explorer timings pane and can be exported, or streamed, as JSONL
+traces.
+
+Disabled, a span is a shared no-op context manager and a counted call is
+one attribute check. Setting $EDA_EXPLORER_TRACE to a file enables the
+recorder at import, appending every span to that file.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Counted filesystem calls
+CALLS = ('stat', 'lstat', 'listdir', 'scandir', 'open')
+STAT, LSTAT, LISTDIR, SCANDIR, OPEN = range(len(CALLS))
+
+
+class _NullSpan:
+    """Span of nothing, what span returns while the recorder is disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+    def finish(self, **fields):
+        pass
+
+NO_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    One timed operation. Used as a context manager, or started and
+    finished explicitly for operations completed by later events.
+    """
+    def __init__(self, recorder: 'Recorder', op: str, fields: Dict):
+        self._recorder = recorder
+        self.op = op
+        self.fields = fields
+        self.start = time.time()
+        self._start = time.perf_counter()
+        self._counts = recorder._counts()
+        self._before = list(self._counts)
+        self._done = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.finish()
+        return False
+
+    def set(self, **fields):
+        """Add fields to the recorded event."""
+        self.fields.update(fields)
+
+    def finish(self, **fields):
+        """Record the span, once."""
+        if self._done:
+            return
+        self._done = True
+        self.fields.update(fields)
+        event = {'time': round(self.start, 6), 'op': self.op,
+                 'ms': round(1e3*(time.perf_counter() - self._start), 3),
+                 'thread': threading.current_thread().name}
+        # Calls are counted in the thread the span was started in, spans
+        # finished elsewhere only have a duration
+        if self._counts is self._recorder._counts():
+            event.update((name, after - before) for name, after, before
+                         in zip(CALLS, self._counts, self._before) if after != before)
+        event.update(self.fields)
+        self._recorder._record(event)
+
+
+class Recorder:
+    """
+    Collects spans while enabled. Thread safe.
+
+    Args:
+        maxlen: Number of most recent spans kept in memory
+    """
+    def __init__(self, maxlen: int = 20000):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._events = deque(maxlen=maxlen)
+        self._trace = None
+
+    # --- Control
+    # ------------------------------------------------------------------------
+    def enable(self, trace: Optional[str] = None) -> None:
+        """
+        Start recording, and counting the filesystem calls made through fs.
+
+        Args:
+            trace: JSONL file spans are appended to as they finish
+        """
+        with self._lock:
+            if trace is not None and self._trace is None:
+                self._trace = open(trace, 'a', buffering=1)
+            self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording, the spans kept so far stay available."""
+        with self._lock:
+            self.enabled = False
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    def reset(self) -> None:
+        """Forget the spans kept in memory."""
+        with self._lock:
+            self._events.clear()
+
+    # --- Recording
+    # ------------------------------------------------------------------------
+    def span(self, op: str, **fields):
+        """
+        Context manager timing op, fields are added to its event. The
+        library a span is about is given as path, its directory.
+        """
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, op, fields)
+
+    def start(self, op: str, **fields):
+        """Start a span finished later with its finish method."""
+        return self.span(op, **fields)
+
+    def context(self):
+        """Call counters of this thread, to be shared with a helper thread through attach."""
+        return self._counts() if self.enabled else None
+
+    def attach(self, counts) -> None:
+        """Count this thread's calls with those of the thread counts came from."""
+        if counts is not None:
+            self._local.counts = counts
+
+    def _counts(self):
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = [0] * len(CALLS)
+        return counts
+
+    def _record(self, event: Dict) -> None:
+        self._events.append(event)
+        trace = self._trace
+        if trace is not None:
+            import json
+            line = json.dumps(event) + '\n'
+            with self._lock:
+                if self._trace is not None:
+                    self._trace.write(line)
+
+    # --- Results
+    # ------------------------------------------------------------------------
+    def events(self) -> List[Dict]:
+        """Spans kept in memory, oldest first."""
+        return list(self._events)
+
+    def summary(self, key: str = 'op') -> Dict[str, Dict]:
+        """
+        Spans grouped on one of their fields.
+
+        Args:
+            key: 'op' for operations, 'path' for libraries
+
+        Returns:
+            Field value mapped to the count, total and maximum ms and
+            the total of each counted call of its spans
+        """
+        groups = {}
+        for event in self.events():
+            value = event.get(key)
+            if value is None:
+                continue
+            group = groups.get(value)
+            if group is None:
+                group = groups[value] = dict(count=0, ms=0.0, max_ms=0.0, **dict.fromkeys(CALLS, 0))
+            group['count'] += 1
+            group['ms'] += event['ms']
+            group['max_ms'] = max(group['max_ms'], event['ms'])
+            for name in CALLS:
+                group[name] += event.get(name, 0)
+        return groups
+
+    def export(self, path: str) -> int:
+        """Write the spans kept in memory to a JSONL file, returns their number."""
+        import json
+        events = self.events()
+        with open(path, 'w') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+        return len(events)
+
+
+def traced(op: str, library: Optional[int] = 0) -> Callable:
+    """
+    Decorator recording calls of a function as op spans.
+
+    Args:
+        op: Operation name
+        library: Directory levels from the first argument up to the
+                 library directory, recorded as path, None if the call
+                 isn't about a library
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return fn(*args, **kwargs)
+            path = str(args[0]) if args else None
+            if path is not None and library is not None:
+                for _ in range(library):
+                    path = os.path.dirname(path)
+                fields = {'path': path}
+            else:
+                fields = {'arg': path}
+            with Span(recorder, op, fields):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Process wide, shared by cadStuff, the catalog users and the widget
+recorder = Recorder()
+
+
+class _Fs:
+    """
+    The filesystem calls of EDA Explorer, counted in the spans of the
+    calling thread while the recorder is enabled. exists, isdir and
+    getmtime count as a stat, realpath as an lstat.
+    """
+    def __init__(self, recorder: Recorder):
+        self._recorder = recorder
+
+    def _count(self, index: int) -> None:
+        if self._recorder.enabled:
+            counts = getattr(self._recorder._local, 'counts', None)
+            if counts is not None:
+                counts[index] += 1
+
+    def stat(self, path, *args, **kwargs):
+        self._count(STAT)
+        return os.stat(path, *args, **kwargs)
+
+    def lstat(self, path, *args, **kwargs):
+        self._count(LSTAT)
+        return os.lstat(path, *args, **kwargs)
+
+    def listdir(self, path):
+        self._count(LISTDIR)
+        return os.listdir(path)
+
+    def scandir(self, path):
+        self._count(SCANDIR)
+        return os.scandir(path)
+
+    def open(self, file, *args, **kwargs):
+        self._count(OPEN)
+        return open(file, *args, **kwargs)
+
+    def exists(self, path) -> bool:
+        self._count(STAT)
+        return os.path.exists(path)
+
+    def isdir(self, path) -> bool:
+        self._count(STAT)
+        return os.path.isdir(path)
+
+    def getmtime(self, path) -> float:
+        self._count(STAT)
+        return os.path.getmtime(path)
+
+    def realpath(self, path) -> str:
+        self._count(LSTAT)
+        return os.path.realpath(path)
+
+fs = _Fs(recorder)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer timings pane.
+"""
+
+# Third party imports
+from qtpy.QtCore import Qt, QTimer
+from qtpy.QtWidgets import (QDialog, QFileDialog, QHBoxLayout, QHeaderView, QLabel,
+                            QPushButton, QTableWidget, QTableWidgetItem, QTabWidget,
+                            QVBoxLayout)
+
+# Spyder imports
+from spyder.api.translations import get_translation
+
+from .instrument import CALLS, recorder
+
+# Localization
+_ = get_translation("eda_explorer.spyder")
+
+
+class InstrumentPane(QDialog):
+    """
+    Summary of the recorded spans per operation and per library, updated
+    every second while shown.
+
+    Args:
+        parent: Parent widget
+        libraryNames: Callable mapping a library directory to its name,
+                      None if it isn't one
+    """
+
+    COLUMNS = ['count', 'mean ms', 'max ms'] + list(CALLS)
+
+    def __init__(self, parent=None, libraryNames=None):
+        super().__init__(parent)
+        self.setWindowTitle(_("EDA Explorer timings"))
+        self._libraryNames = libraryNames or (lambda path: None)
+
+        self.operations = self._table(_("Operation"))
+        self.libraries = self._table(_("Library"))
+        tabs = QTabWidget()
+        tabs.addTab(self.operations, _("Operations"))
+        tabs.addTab(self.libraries, _("Libraries"))
+
+        self.status = QLabel()
+        reset = QPushButton(_("Reset"))
+        reset.clicked.connect(self.b_Reset)
+        export = QPushButton(_("Export..."))
+        export.clicked.connect(self.b_Export)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.status, 1)
+        buttons.addWidget(reset)
+        buttons.addWidget(export)
+
+        layout = QVBoxLayout()
+        layout.addWidget(tabs)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+        self.resize(720, 360)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+
+    def _table(self, title):
+        table = QTableWidget(0, len(self.COLUMNS) + 1)
+        table.setHorizontalHeaderLabels([title] + self.COLUMNS)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSortingEnabled(True)
+        return table
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Refill the tables from the recorder."""
+        self._fill(self.operations, recorder.summary('op'), str)
+        self._fill(self.libraries, recorder.summary('path'),
+                   lambda path: self._libraryNames(path) or path)
+        state = _("Recording") if recorder.enabled else _("Not recording")
+        self.status.setText(_("{}, {} spans").format(state, len(recorder.events())))
+
+    def _fill(self, table, groups, label):
+        table.setSortingEnabled(False)
+        table.setRowCount(len(groups))
+        for row, (key, group) in enumerate(sorted(groups.items(), key=lambda item: -item[1]['ms'])):
+            values = [group['count'], round(group['ms']/group['count'], 2),
+                      round(group['max_ms'], 2)] + [group[name] for name in CALLS]
+            table.setItem(row, 0, QTableWidgetItem(label(key)))
+            for column, value in enumerate(values, 1):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value)
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+
+    def b_Reset(self):
+        recorder.reset()
+        self.refresh()
+
+    def b_Export(self):
+        path, _filter = QFileDialog.getSaveFileName(self, _("Export trace"), 'eda_explorer_trace.jsonl',
+                                                    _("JSON lines (*.jsonl)"))
+        if path:
+            count = recorder.export(path)
+            self.status.setText(_("{} spans exported to {}").format(count, path))
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer library latency history.
+
+The browser times a stat and the first entry of a scandir of each library
+directory it classifies or polls. Samples are kept as per-day histograms
+per library root, the last DAYS days of them, in latency.json in the
+cache directory, so a file server getting slower shows over sessions
+rather than only in the one that happened to hit it.
+
+    eda-explorer latency                # slowest library roots, as JSON
+    eda-explorer latency --probe        # probe the cds.lib libraries first
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from .catalog import cache_dir
+from .instrument import fs
+
+# Timed operations
+OPS = ('stat', 'scandir')
+
+# Upper bounds in ms of the histogram buckets, slower samples go in the last
+BOUNDS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Days of samples kept
+DAYS = 7
+
+# Samples a library needs before it gets a tier
+MIN_SAMPLES = 3
+
+# Latency tiers, libraries faster than the slow threshold have none
+SLOW = 'slow'
+VERY_SLOW = 'very slow'
+
+VERSION = 1
+
+# root -> op -> day -> {bucket: count}, bucket and day as str as in JSON
+Histograms = Dict[str, Dict[str, Dict[str, Dict[str, int]]]]
+
+
+def _day(now: Optional[float] = None) -> int:
+    return int((time.time() if now is None else now) // 86400)
+
+def _merge(into: Histograms, other: Histograms) -> None:
+    for root, ops in other.items():
+        for op, days in ops.items():
+            mine = into.setdefault(root, {}).setdefault(op, {})
+            for day, counts in days.items():
+                bucket_counts = mine.setdefault(day, {})
+                for bucket, count in counts.items():
+                    bucket_counts[bucket] = bucket_counts.get(bucket, 0) + count
+
+def _trim(histograms: Histograms, today: int) -> None:
+    """Drop the days older than DAYS and the roots left without samples."""
+    first = today - DAYS + 1
+    for root in list(histograms):
+        ops = histograms[root]
+        for op in list(ops):
+            days = ops[op]
+            for day in [day for day in days if int(day) < first]:
+                del days[day]
+            if not days:
+                del ops[op]
+        if not ops:
+            del histograms[root]
+
+def percentile(counts: List[int], q: float) -> float:
+    """Upper bound in ms of the bucket holding the q quantile, 0 <= q <= 1."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for bucket, count in enumerate(counts):
+        seen += count
+        if seen >= rank and count:
+            return float(BOUNDS[bucket])
+    return float(BOUNDS[-1])
+
+
+class LatencyHistory:
+    """
+    Rolling per-library latency histograms. Thread safe.
+
+    Samples are added in memory and merged into the file by save, with
+    what other sessions saved in the meantime.
+
+    Args:
+        path: History file, defaults to latency.json in cache_dir()
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_dir(), 'latency.json')
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Saved and new samples, and the new ones alone
+        self._histograms: Histograms = {}
+        self._new: Histograms = {}
+
+    # --- Persistence
+    # ------------------------------------------------------------------------
+    def load(self) -> None:
+        """Read the history file, once, an unreadable one is ignored."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            saved = self._read()
+            _merge(saved, self._new)
+            self._histograms = saved
+
+    def save(self) -> None:
+        """Merge the new samples into the history file."""
+        with self._lock:
+            if not self._new:
+                return
+            histograms = self._read()
+            _merge(histograms, self._new)
+            _trim(histograms, _day())
+            try:
+                self._write(histograms)
+            except OSError as e:
+                print(f"Warning: Could not write latency history {self.path}: {str(e)}")
+                return
+            self._histograms = histograms
+            self._new = {}
+            self._loaded = True
+
+    def _read(self) -> Histograms:
+        try:
+            with fs.open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            return {}
+        return data.get('roots', {})
+
+    def _write(self, histograms: Histograms) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.latency-', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': VERSION, 'roots': histograms}, f, separators=(',', ':'))
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    # --- Samples
+    # ------------------------------------------------------------------------
+    def add(self, root: str, op: str, ms: float, now: Optional[float] = None) -> None:
+        """Add a sample of op on the library directory root."""
+        day = str(_day(now))
+        bucket = str(min(bisect_left(BOUNDS, ms), len(BOUNDS) - 1))
+        with self._lock:
+            for histograms in (self._histograms, self._new):
+                counts = histograms.setdefault(root, {}).setdefault(op, {}).setdefault(day, {})
+                counts[bucket] = counts.get(bucket, 0) + 1
+
+    def probe(self, root: str) -> bool:
+        """
+        Time a stat of root and a scandir of it up to its first entry, so
+        large libraries aren't taken for slow ones.
+
+        Returns:
+            False if root could not be read, nothing is recorded then
+        """
+        try:
+            start = time.perf_counter()
+            fs.stat(root)
+            stat_ms = 1e3 * (time.perf_counter() - start)
+            start = time.perf_counter()
+            with fs.scandir(root) as entries:
+                next(entries, None)
+            scandir_ms = 1e3 * (time.perf_counter() - start)
+        except OSError:
+            return False
+        self.add(root, 'stat', stat_ms)
+        self.add(root, 'scandir', scandir_ms)
+        return True
+
+    # --- Queries
+    # ------------------------------------------------------------------------
+    def roots(self) -> List[str]:
+        with self._lock:
+            return list(self._histograms)
+
+    def counts(self, root: str, op: str) -> List[int]:
+        """Samples of op on root per bucket, over the last DAYS days."""
+        first = _day() - DAYS + 1
+        counts = [0] * len(BOUNDS)
+        with self._lock:
+            days = self._histograms.get(root, {}).get(op, {})
+            for day, bucket_counts in days.items():
+                if int(day) >= first:
+                    for bucket, count in bucket_counts.items():
+                        counts[int(bucket)] += count
+        return counts
+
+    def stats(self, root: str) -> Dict[str, Dict[str, float]]:
+        """p50, p95 in ms and number of samples of each operation on root."""
+        stats = {}
+        for op in OPS:
+            counts = self.counts(root, op)
+            stats[op] = {'p50': percentile(counts, 0.5), 'p95': percentile(counts, 0.95),
+                         'samples': sum(counts)}
+        return stats
+
+    def tier(self, root: str, slow: float, very_slow: float) -> Optional[str]:
+        """
+        Latency tier of root from the slowest p95 of its operations.
+
+        Args:
+            root: Library directory
+            slow: p95 in ms from which a library is SLOW
+            very_slow: p95 in ms from which a library is VERY_SLOW
+
+        Returns:
+            SLOW, VERY_SLOW or None if fast or not sampled enough
+        """
+        p95 = _worst(self.stats(root), 'p95', MIN_SAMPLES)
+        if p95 is None or p95 < slow:
+            return None
+        return VERY_SLOW if p95 >= very_slow else SLOW
+
+    def slowest(self, limit: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        """(root, stats) of the sampled roots, slowest p95 first."""
+        ranked = []
+        for root in self.roots():
+            stats = self.stats(root)
+            p95 = _worst(stats, 'p95')
+            if p95 is not None:
+                ranked.append((-p95, -_worst(stats, 'p50'), root, stats))
+        ranked.sort()
+        return [(root, stats) for _, _, root, stats in ranked[:limit]]
+
+
+def _worst(stats: Dict[str, Dict[str, float]], key: str, min_samples: int = 1) -> Optional[float]:
+    """Slowest key over the operations sampled min_samples times, None if none were."""
+    values = [op_stats[key] for op_stats in stats.values() if op_stats['samples'] >= min_samples]
+    return max(values) if values else None
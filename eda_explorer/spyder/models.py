@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer list models.
+"""
+
+# Standard library imports
+from array import array
+from bisect import bisect_left
+
+# Third party imports
+from qtpy.QtCore import QAbstractListModel, QModelIndex, Qt
+from qtpy.QtGui import QBrush, QColor
+
+
+class NameListModel(QAbstractListModel):
+    """
+    Sorted list of names for a QListView.
+
+    Rows are handed to the view BATCH at a time through canFetchMore and
+    fetchMore, so a library with 100k cells costs no more to show than
+    one with a thousand. Each row has a state, stored as a byte in an
+    array next to the sorted names, which selects its colour, tooltip and
+    whether it can be selected, and a mark selecting its background.
+    """
+
+    BATCH = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._states = array('B')
+        self._loaded = 0
+        # State 0 is the plain style
+        self._styles = [(None, True, None)]
+        self._stateCodes = {None: 0}
+        # Mark 0 has no background
+        self._marks = array('B')
+        self._markBrushes = [None]
+        self._markCodes = {None: 0}
+        self._toolTip = None
+
+    # --- Qt API
+    # ------------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self._names[row]
+        brush, selectable, tooltip = self._styles[self._states[row]]
+        if role == Qt.ForegroundRole:
+            return brush
+        if role == Qt.BackgroundRole:
+            return self._markBrushes[self._marks[row]]
+        if role == Qt.ToolTipRole:
+            if tooltip is None and self._toolTip is not None:
+                return self._toolTip(self._names[row])
+            return tooltip
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.row() < self._loaded:
+            if not self._styles[self._states[index.row()]][1]:
+                flags &= ~Qt.ItemIsSelectable
+        return flags
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._names)
+
+    def fetchMore(self, parent=QModelIndex()):
+        self._fetchTo(self._loaded + self.BATCH)
+
+    # --- Public API
+    # ------------------------------------------------------------------------
+    def setStyle(self, state, color=None, selectable=True, tooltip=None):
+        """Register how rows in state are shown."""
+        brush = None if color is None else QBrush(QColor(color))
+        if state in self._stateCodes:
+            self._styles[self._stateCodes[state]] = (brush, selectable, tooltip)
+        else:
+            self._stateCodes[state] = len(self._styles)
+            self._styles.append((brush, selectable, tooltip))
+
+    def setMarkStyle(self, mark, color):
+        """Register the background of rows with mark."""
+        brush = None if color is None else QBrush(QColor(color))
+        if mark in self._markCodes:
+            self._markBrushes[self._markCodes[mark]] = brush
+        else:
+            self._markCodes[mark] = len(self._markBrushes)
+            self._markBrushes.append(brush)
+
+    def setToolTipProvider(self, provider):
+        """
+        Compute tooltips of plain rows on demand with provider(name), for
+        information too costly to gather for every row.
+        """
+        self._toolTip = provider
+
+    def setNames(self, names):
+        """Replace the contents, all rows in the plain state."""
+        self.beginResetModel()
+        self._names = sorted(names)
+        self._states = array('B', bytes(len(self._names)))
+        self._marks = array('B', bytes(len(self._names)))
+        self._loaded = min(self.BATCH, len(self._names))
+        self.endResetModel()
+
+    def clear(self):
+        self.setNames([])
+
+    def names(self):
+        """All names, including those not fetched by the view yet."""
+        return self._names
+
+    def name(self, row):
+        return self._names[row]
+
+    def find(self, name):
+        """
+        Row of name, -1 if absent. Binary search, fetches rows up to the
+        match so it can be selected.
+        """
+        row = bisect_left(self._names, name)
+        if row == len(self._names) or self._names[row] != name:
+            return -1
+        self._fetchTo(row + 1)
+        return row
+
+    def state(self, name):
+        """State of the row holding name."""
+        row = bisect_left(self._names, name)
+        if row == len(self._names) or self._names[row] != name:
+            return None
+        code = self._states[row]
+        return next(state for state, c in self._stateCodes.items() if c == code)
+
+    def setState(self, name, state):
+        """Set the state of the row holding name."""
+        row = bisect_left(self._names, name)
+        if row == len(self._names) or self._names[row] != name:
+            return
+        code = self._stateCodes[state]
+        if self._states[row] == code:
+            return
+        self._states[row] = code
+        if row < self._loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def mark(self, name):
+        """Mark of the row holding name."""
+        row = bisect_left(self._names, name)
+        if row == len(self._names) or self._names[row] != name:
+            return None
+        code = self._marks[row]
+        return next(mark for mark, c in self._markCodes.items() if c == code)
+
+    def setMark(self, name, mark):
+        """Set the mark of the row holding name."""
+        row = bisect_left(self._names, name)
+        if row == len(self._names) or self._names[row] != name:
+            return
+        code = self._markCodes[mark]
+        if self._marks[row] == code:
+            return
+        self._marks[row] = code
+        if row < self._loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.BackgroundRole])
+
+    def sync(self, names):
+        """
+        Update in place to hold the sorted names, with row removals and
+        insertions instead of a reset so views keep selection and scroll
+        position. New rows are in the plain state, without a mark.
+
+        The new rows are found in one merge of the sorted lists. Only the
+        loaded rows are signalled, in runs of consecutive rows, the rows
+        past them are replaced in one go.
+        """
+        names = sorted(names)
+        old = self._names
+        loaded = self._loaded
+        states = array('B')
+        marks = array('B')
+        # Old rows removed and new rows added, and the last loaded old row kept
+        removed = []
+        added = []
+        lastShown = -1
+        i = 0
+        for row, name in enumerate(names):
+            while i < len(old) and old[i] < name:
+                removed.append(i)
+                i += 1
+            if i < len(old) and old[i] == name:
+                states.append(self._states[i])
+                marks.append(self._marks[i])
+                if i < loaded:
+                    lastShown = row
+                i += 1
+            else:
+                states.append(0)
+                marks.append(0)
+                added.append(row)
+        removed.extend(range(i, len(old)))
+        if len(removed) + len(added) > max(len(old), len(names)) // 2 + self.BATCH:
+            # Cheaper to start over than to move rows around
+            self.setNames(names)
+            return
+
+        # New rows are loaded if a loaded row follows them, or if every row was
+        shown = len(names) if loaded == len(old) else lastShown + 1
+
+        # Remove loaded rows from the bottom, in runs of consecutive rows
+        removed = [row for row in removed if row < loaded]
+        while removed:
+            last = removed.pop()
+            first = last
+            while removed and removed[-1] == first - 1:
+                first = removed.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._names[first:last + 1]
+            del self._states[first:last + 1]
+            del self._marks[first:last + 1]
+            self._loaded -= last - first + 1
+            self.endRemoveRows()
+
+        # What is left of the loaded rows precedes the rows past them
+        self._names = self._names[:self._loaded] + names[shown:]
+        self._states = self._states[:self._loaded] + states[shown:]
+        self._marks = self._marks[:self._loaded] + marks[shown:]
+
+        # Insert the loaded new rows from the top, at their final rows
+        added = [row for row in added if row < shown]
+        run = 0
+        while run < len(added):
+            end = run
+            while end + 1 < len(added) and added[end + 1] == added[end] + 1:
+                end += 1
+            first, last = added[run], added[end]
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._names[first:first] = names[first:last + 1]
+            self._states[first:first] = states[first:last + 1]
+            self._marks[first:first] = marks[first:last + 1]
+            self._loaded += last - first + 1
+            self.endInsertRows()
+            run = end + 1
+
+    def _fetchTo(self, count):
+        count = min(count, len(self._names))
+        if count <= self._loaded:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, count - 1)
+        self._loaded = count
+        self.endInsertRows()
@@ -9,6 +9,7 @@ EDA Explorer Plugin.
 """
 
 # Third-party imports
+from qtpy.QtCore import QTimer
 from qtpy.QtGui import QIcon
 
 # Spyder imports
@@ -32,6 +33,28 @@ class EDAExplorer(SpyderDockablePlugin):
     OPTIONAL = []
     WIDGET_CLASS = EDAExplorerWidget
     CONF_SECTION = NAME
+    CONF_DEFAULTS = [
+        (CONF_SECTION, {
+            # Filesystem probes taking longer than this mark the library
+            # unresponsive, it is then skipped for fs_cooldown seconds
+            'fs_timeout': 2000,
+            'fs_cooldown': 60,
+            # Seconds between fingerprint polls of the selected library,
+            # 0 relies on filesystem notifications only
+            'poll_interval': 10,
+            # Warm the catalog for the libraries and cells around the
+            # selection and the recent ones while idle, and the recent
+            # 'lib' and 'lib/cell' selections
+            'prefetch': True,
+            'recent': [],
+            # p95 stat or scandir ms from which libraries are shown as
+            # slow and very slow, see latency
+            'latency_slow': 50,
+            'latency_very_slow': 500,
+            # Record operation timings and filesystem calls, see instrument
+            'instrument': False,
+        }),
+    ]
     CONF_WIDGET_CLASS = EDAExplorerConfigPage
 
     # --- Signals
@@ -50,6 +73,10 @@ class EDAExplorer(SpyderDockablePlugin):
     def on_initialize(self):
         widget = self.get_widget()
         
+    def on_mainwindow_visible(self):
+        # Build the browser once Spyder has processed its start up events,
+        # unless showing the dock already did
+        QTimer.singleShot(0, self.get_widget().build)
 
     def check_compatibility(self):
         valid = True
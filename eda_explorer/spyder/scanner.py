@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer library scanners.
+
+Build the cell and view listings of a library directory with os.scandir,
+taking file types from the directory entries instead of a stat per entry.
+Cell and view names are interned, so libraries shared by several projects
+and the catalog refer to a single copy of each.
+XSchem scans are kept for as long as the directories they came from are
+unchanged, OpenAccess libraries can be scanned a cell per thread.
+"""
+
+import os
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePath
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .instrument import fs
+
+XSCHEM_EXTENSIONS = {".sym", ".sch", ".va"}
+
+Stamp = Optional[Tuple[int, int]]
+
+
+def _dirStamp(path: str) -> Stamp:
+    """mtime in ns and link count of a directory, None if it isn't one."""
+    try:
+        st = fs.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+    return (st.st_mtime_ns, st.st_nlink)
+
+def _filesIn(path: str) -> Dict[str, str]:
+    """Map the stems of the regular files in a directory to their paths."""
+    files = {}
+    try:
+        with fs.scandir(path) as it:
+            for entry in it:
+                if entry.is_file():
+                    files[sys.intern(os.path.splitext(entry.name)[0])] = entry.path
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return files
+
+def oaCells(path: str) -> List[str]:
+    """
+    Sorted names of the cell directories of an OpenAccess library, hidden
+    entries excluded.
+
+    Raises:
+        OSError: If path can't be listed
+    """
+    with fs.scandir(path) as it:
+        return sorted(sys.intern(entry.name) for entry in it
+                      if not entry.name.startswith('.') and entry.is_dir())
+
+def oaCellViews(cell_path: str) -> Dict[str, str]:
+    """Map the view directories of an OpenAccess cell to their paths."""
+    try:
+        with fs.scandir(cell_path) as it:
+            return {sys.intern(entry.name): entry.path for entry in it
+                    if not entry.name.startswith('.') and entry.is_dir()}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def scanOaLibrary(path, viewfile: Optional[Callable[[str], Optional[str]]] = None,
+                  max_workers: int = 8,
+                  cells: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    List the views of every cell of an OpenAccess library, scanning cells
+    in parallel. Each cell costs one directory read, plus a master.tag
+    read per view if viewfile is given, and no stat of its own.
+
+    Args:
+        path: Library directory
+        viewfile: Called with each view directory, the view then maps to
+                  its result instead of the directory
+        max_workers: Number of cells scanned at the same time, latency
+                     rather than bandwidth bound on network filesystems
+        cells: Cells to scan, defaults to all of them
+
+    Returns:
+        Dictionary mapping cell names to {view: directory or viewfile}
+
+    Raises:
+        OSError: If the library directory can't be listed
+    """
+    path = str(PurePath(path))
+    if cells is None:
+        cells = oaCells(path)
+
+    def scanCell(cell):
+        views = oaCellViews(os.path.join(path, cell))
+        if viewfile is not None:
+            views = {view: viewfile(view_path) for view, view_path in views.items()}
+        return cell, views
+
+    if max_workers <= 1:
+        return dict(map(scanCell, cells))
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix='eda_explorer-scan') as pool:
+        return dict(pool.map(scanCell, cells))
+
+
+class _XschemLibrary:
+    """
+    One scan of an XSchem library directory.
+
+    Args:
+        path: Library directory
+        stamp: Stamps of the library and its xschemviews directory
+        previous: Earlier scan of the same directory, the views it listed
+                  are kept and revalidated when next requested
+    """
+    def __init__(self, path: str, stamp: Tuple[Stamp, Stamp],
+                 previous: Optional['_XschemLibrary'] = None):
+        self.stamp = stamp
+        # cell -> {view: path} of the cell.sch/.sym/.va files
+        self.files: Dict[str, Dict[str, str]] = {}
+        # cell -> (stamp, {view: path}) of the xschemviews/<cell> directories,
+        # None until the views of the cell are requested
+        self.viewDirs: Dict[str, Optional[Tuple[Stamp, Dict[str, str]]]] = {}
+
+        with fs.scandir(path) as it:
+            for entry in it:
+                stem, ext = os.path.splitext(entry.name)
+                if ext in XSCHEM_EXTENSIONS and entry.is_file():
+                    self.files.setdefault(sys.intern(stem), {})[ext[1:]] = entry.path
+
+        if stamp[1] is not None:
+            before = previous.viewDirs if previous is not None else {}
+            with fs.scandir(os.path.join(path, "xschemviews")) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        cell = sys.intern(entry.name)
+                        self.viewDirs[cell] = before.get(cell)
+
+    @property
+    def xschem(self) -> bool:
+        return self.stamp[1] is not None or bool(self.files)
+
+    def cells(self) -> List[str]:
+        return sorted(self.files.keys() | self.viewDirs.keys())
+
+    def cellViews(self, path: str, cell: str) -> Dict[str, str]:
+        views = dict(self.files.get(cell, ()))
+        if cell in self.viewDirs:
+            known = self.viewDirs[cell]
+            cell_path = os.path.join(path, "xschemviews", cell)
+            cell_stamp = _dirStamp(cell_path)
+            if known is None or cell_stamp != known[0]:
+                known = self.viewDirs[cell] = (cell_stamp, _filesIn(cell_path))
+            views.update(known[1])
+        return views
+
+
+class XschemScanner:
+    """
+    Cache of XSchem library scans, keyed on the library directory.
+
+    A library is scanned in a single pass over the directory and its
+    xschemviews directory, using the entry types scandir reports. The
+    xschemviews directory of a cell is only read when its views are
+    first requested. The scan is reused while the library and xschemviews
+    directories keep their mtime and link count, a cell's views while its
+    xschemviews directory does. Thread safe.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._libraries: Dict[str, _XschemLibrary] = {}
+
+    def _library(self, path) -> Optional[_XschemLibrary]:
+        """Current scan of the directory path, None if it isn't a directory."""
+        path = str(PurePath(path))
+        stamp = (_dirStamp(path), _dirStamp(os.path.join(path, "xschemviews")))
+        if stamp[0] is None:
+            with self._lock:
+                self._libraries.pop(path, None)
+            return None
+        with self._lock:
+            library = self._libraries.get(path)
+        if library is None or library.stamp != stamp:
+            library = _XschemLibrary(path, stamp, library)
+            with self._lock:
+                self._libraries[path] = library
+        return library
+
+    def isXschem(self, path) -> bool:
+        """True if the directory has an xschemviews folder or any .sym/.sch/.va files."""
+        library = self._library(path)
+        return library is not None and library.xschem
+
+    def cells(self, path) -> List[str]:
+        """
+        Sorted cell names of the library at path.
+
+        Raises:
+            FileNotFoundError: If path is not a directory
+        """
+        library = self._library(path)
+        if library is None:
+            raise FileNotFoundError(f"No library directory {path}")
+        return library.cells()
+
+    def cellViews(self, path, cell: str) -> Dict[str, str]:
+        """Map the views of a cell to their files, empty if there are none."""
+        library = self._library(path)
+        if library is None:
+            return {}
+        return library.cellViews(str(PurePath(path)), cell)
+
+    def library(self, path) -> Dict[str, Dict[str, str]]:
+        """Complete cell -> {view: file} map of the library at path."""
+        library = self._library(path)
+        if library is None:
+            return {}
+        path = str(PurePath(path))
+        return {cell: library.cellViews(path, cell) for cell in library.cells()}
+
+    def clear(self) -> None:
+        """Forget every scan."""
+        with self._lock:
+            self._libraries.clear()
+
+
+# Process wide, shared by the cadStuff helpers and the catalog
+xschem_scanner = XschemScanner()
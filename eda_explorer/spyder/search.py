@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer search.
+
+Type-ahead search over the library, cell and view names of a whole
+cds.lib. Each distinct cell or view name is indexed once, however many
+libraries and cells have it, under its trigrams and its first one to
+three characters. A query only looks at the names in the shortest
+posting list of its trigrams. One shorter than a trigram looks at the
+posting list of its prefix, then finds it inside names in the buffer
+holding all of them. What matches is ranked: exact names first, then
+prefixes, substrings and, for longer queries with few matches, names
+sharing most of their trigrams with the query.
+
+Libraries are added, replaced and removed one at a time, replacing a
+library only touches the cells that came or went. The views of a cell are
+indexed once they are listed, with its library or on their own.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+# Match tiers, best first
+EXACT = 0
+PREFIX = 1
+SUBSTRING = 2
+FUZZY = 3
+
+# Matches gathered per query before ranking, queries matching more names
+# are ranked among the first ones found. Exact matches are looked up, they
+# are never cut
+GATHER = 5000
+# Fuzzy match candidates are found through the query's least common
+# trigrams, up to FUZZY_POSTINGS names, the best FUZZY_CANDIDATES of them
+# are then checked
+FUZZY_POSTINGS = 100000
+FUZZY_CANDIDATES = 2000
+
+# Marks the prefix keys of the posting lists
+_PREFIX = '\0'
+
+# Owner of names no library has, and of names several libraries have
+_NONE = -1
+_SHARED = -2
+# View set of cells whose views are not listed, or have none
+_NO_VIEWS = -1
+
+
+class SearchMatch(NamedTuple):
+    """A library (cell None), cell (view None) or view matching a query."""
+    lib: str
+    cell: Optional[str]
+    tier: int
+    view: Optional[str] = None
+
+    def __str__(self):
+        return '/'.join(name for name in (self.lib, self.cell, self.view) if name is not None)
+
+
+def _trigrams(name: str) -> set:
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+def _tier(name, query) -> int:
+    """Tier of a lower case name for query, -1 if it doesn't contain it, str or bytes."""
+    if name == query:
+        return EXACT
+    if name.startswith(query):
+        return PREFIX
+    if query in name:
+        return SUBSTRING
+    return -1
+
+
+class SearchIndex:
+    """
+    Trigram and prefix index of the cells and views of a set of libraries.
+
+    Names are held in a byte buffer and ids in arrays rather than in
+    Python lists, so a million cells don't add to the garbage collector's
+    work. Not thread safe: the browser's worker pool updates it and its
+    search worker queries it, all under one lock.
+    """
+    def __init__(self):
+        # Name id -> lower case UTF-8 name, at _offsets[id] in _lower, the
+        # names that aren't all lower case are also kept as they are
+        self._lower = bytearray()
+        self._offsets = array('q', [0])
+        self._cased: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}
+        # Lower case name -> ids of the names in _cased, for exact matches
+        self._casedIds: Dict[str, array] = {}
+        # Name id -> id of the library having it, _NONE or _SHARED, the
+        # owners of the few names in several libraries are in _shared
+        self._owners = array('i')
+        self._shared: Dict[int, Tuple[int, ...]] = {}
+        # Trigram or prefix key -> ids of the names having it, ascending
+        self._postings: Dict[str, array] = {}
+        # Library name <-> id, and the name ids of each library's cells
+        self._libs: Dict[str, int] = {}
+        self._libNames: List[Optional[str]] = []
+        self._cells: Dict[int, array] = {}
+        # Library id -> view set id of each of its cells, in _cells order,
+        # _NO_VIEWS for cells without listed views. Cells mostly have the
+        # same views, each distinct set of view name ids is kept once
+        self._cellViews: Dict[int, array] = {}
+        self._viewSets: List[Tuple[int, ...]] = []
+        self._viewSetIds: Dict[Tuple[int, ...], int] = {}
+        # View name id -> library id -> name ids of the cells having it
+        self._viewOwners: Dict[int, Dict[int, array]] = {}
+
+    def __len__(self):
+        """Number of indexed cells, counted once per library."""
+        return sum(len(cells) for cells in self._cells.values())
+
+    def libraries(self) -> List[str]:
+        return list(self._libs)
+
+    # --- Updates
+    # ------------------------------------------------------------------------
+    def setLibrary(self, lib: str, cells: Iterable[str],
+                   views: Optional[Mapping[str, Optional[Iterable[str]]]] = None) -> None:
+        """
+        Add a library or replace its cells.
+
+        Args:
+            views: Cells mapped to their views, None for views that have
+                   not been listed. The indexed views of the other cells
+                   that are kept are left as they are
+        """
+        lib_id = self._libs.get(lib)
+        if lib_id is None:
+            lib_id = self._libs[lib] = len(self._libNames)
+            self._libNames.append(lib)
+        old = self._cells.get(lib_id, array('i'))
+        new = array('i', map(self._id, cells))
+        self._cells[lib_id] = new
+        if old == new and not views:
+            return
+        if old != new:
+            old_ids, new_ids = set(old), set(new)
+            for name_id in old_ids - new_ids:
+                self._removeOwner(name_id, lib_id)
+            for name_id in new_ids - old_ids:
+                self._addOwner(name_id, lib_id)
+
+        # View sets of the cells kept, then of the cells with views given
+        before = dict(zip(old, self._cellViews.get(lib_id, ())))
+        after = dict.fromkeys(new, _NO_VIEWS)
+        after.update((name_id, view_set) for name_id, view_set in before.items()
+                     if name_id in after)
+        if views:
+            for cell, cell_views in views.items():
+                name_id = self._ids.get(cell)
+                if cell_views is not None and name_id in after:
+                    after[name_id] = self._viewSet(cell_views)
+        self._cellViews[lib_id] = array('i', map(after.__getitem__, new))
+        self._updateViewOwners(lib_id, before, after)
+
+    def setViews(self, lib: str, cell: str, views: Iterable[str]) -> None:
+        """Replace the views of a cell of an indexed library."""
+        lib_id = self._libs.get(lib)
+        name_id = self._ids.get(cell)
+        if lib_id is None or name_id is None:
+            return
+        try:
+            row = self._cells[lib_id].index(name_id)
+        except ValueError:
+            return
+        view_sets = self._cellViews[lib_id]
+        view_set = self._viewSet(views)
+        if view_sets[row] != view_set:
+            self._updateViewOwners(lib_id, {name_id: view_sets[row]}, {name_id: view_set})
+            view_sets[row] = view_set
+
+    def removeLibrary(self, lib: str) -> None:
+        lib_id = self._libs.pop(lib, None)
+        if lib_id is None:
+            return
+        for name_id in self._cells.pop(lib_id, ()):
+            self._removeOwner(name_id, lib_id)
+        self._cellViews.pop(lib_id, None)
+        for view_id in list(self._viewOwners):
+            libs = self._viewOwners[view_id]
+            libs.pop(lib_id, None)
+            if not libs:
+                del self._viewOwners[view_id]
+        self._libNames[lib_id] = None
+
+    def retain(self, libs: Iterable[str]) -> None:
+        """Remove the libraries not in libs."""
+        keep = set(libs)
+        for lib in [lib for lib in self._libs if lib not in keep]:
+            self.removeLibrary(lib)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _id(self, name: str) -> int:
+        """Id of a cell or view name, indexed if new."""
+        name_id = self._ids.get(name)
+        if name_id is not None:
+            return name_id
+        name_id = self._ids[name] = len(self._owners)
+        lower = name.lower()
+        if lower != name:
+            self._cased[name_id] = name
+            ids = self._casedIds.get(lower)
+            if ids is None:
+                ids = self._casedIds[lower] = array('i')
+            ids.append(name_id)
+        self._lower += lower.encode()
+        self._offsets.append(len(self._lower))
+        self._owners.append(_NONE)
+        keys = _trigrams(lower)
+        keys.update(_PREFIX + lower[:n] for n in range(1, min(3, len(lower)) + 1))
+        postings = self._postings
+        for key in keys:
+            ids = postings.get(key)
+            if ids is None:
+                ids = postings[key] = array('i')
+            ids.append(name_id)
+        return name_id
+
+    def _name(self, name_id: int) -> str:
+        name = self._cased.get(name_id)
+        if name is None:
+            name = self._lower[self._offsets[name_id]:self._offsets[name_id + 1]].decode()
+        return name
+
+    def _used(self, name_id: int) -> bool:
+        """True if a library has the name as a cell or a view."""
+        return self._owners[name_id] != _NONE or name_id in self._viewOwners
+
+    def _viewSet(self, views: Iterable[str]) -> int:
+        """Id of the set of view names views, _NO_VIEWS if it is empty."""
+        key = tuple(sorted(set(map(self._id, views))))
+        if not key:
+            return _NO_VIEWS
+        view_set = self._viewSetIds.get(key)
+        if view_set is None:
+            view_set = self._viewSetIds[key] = len(self._viewSets)
+            self._viewSets.append(key)
+        return view_set
+
+    def _updateViewOwners(self, lib_id: int, before: Dict[int, int], after: Dict[int, int]) -> None:
+        """Move cells of a library from the view sets before to those after, by cell name id."""
+        sets = self._viewSets
+        removed: Dict[int, set] = {}
+        added: Dict[int, List[int]] = {}
+        for name_id, view_set in before.items():
+            new_set = after.get(name_id, _NO_VIEWS)
+            if view_set != new_set and view_set != _NO_VIEWS:
+                keep = sets[new_set] if new_set != _NO_VIEWS else ()
+                for view_id in sets[view_set]:
+                    if view_id not in keep:
+                        removed.setdefault(view_id, set()).add(name_id)
+        for name_id, new_set in after.items():
+            view_set = before.get(name_id, _NO_VIEWS)
+            if view_set != new_set and new_set != _NO_VIEWS:
+                had = sets[view_set] if view_set != _NO_VIEWS else ()
+                for view_id in sets[new_set]:
+                    if view_id not in had:
+                        added.setdefault(view_id, []).append(name_id)
+        owners = self._viewOwners
+        for view_id, name_ids in removed.items():
+            libs = owners[view_id]
+            kept = array('i', (name_id for name_id in libs[lib_id] if name_id not in name_ids))
+            if kept:
+                libs[lib_id] = kept
+            else:
+                del libs[lib_id]
+                if not libs:
+                    del owners[view_id]
+        for view_id, name_ids in added.items():
+            owners.setdefault(view_id, {}).setdefault(lib_id, array('i')).extend(name_ids)
+
+    def _ownersOf(self, name_id: int) -> Tuple[int, ...]:
+        owner = self._owners[name_id]
+        if owner >= 0:
+            return (owner,)
+        return self._shared[name_id] if owner == _SHARED else ()
+
+    def _setOwners(self, name_id: int, owners: Tuple[int, ...]) -> None:
+        self._shared.pop(name_id, None)
+        if len(owners) > 1:
+            self._shared[name_id] = owners
+        self._owners[name_id] = owners[0] if len(owners) == 1 else \
+            _SHARED if owners else _NONE
+
+    def _addOwner(self, name_id: int, lib_id: int) -> None:
+        if self._owners[name_id] == _NONE:
+            self._owners[name_id] = lib_id
+        else:
+            self._setOwners(name_id, self._ownersOf(name_id) + (lib_id,))
+
+    def _removeOwner(self, name_id: int, lib_id: int) -> None:
+        self._setOwners(name_id, tuple(owner for owner in self._ownersOf(name_id)
+                                       if owner != lib_id))
+
+    # --- Queries
+    # ------------------------------------------------------------------------
+    def search(self, query: str, limit: int = 100) -> List[SearchMatch]:
+        """
+        Best matches of a query, case insensitive.
+
+        Args:
+            query: Part of a library, cell or view name, "lib/name" to
+                   only match cells and views of libraries whose name
+                   contains lib, or "lib/cell/view" to only match views of
+                   the cells whose name contains cell
+            limit: Maximum number of matches
+
+        Returns:
+            Matches ordered by tier, then shorter names first
+        """
+        parts = query.strip().lower().split('/')
+        if len(parts) > 3:
+            return []
+        query = parts[-1]
+        lib_query = parts[0] if len(parts) > 1 else None
+        cell_query = parts[1].encode() if len(parts) > 2 else None
+        if not query:
+            return []
+
+        # (tier, -trigrams shared, name length, library, cell name id or
+        # -1 for the library itself, view name id or -1 for the cell)
+        ranked: List[Tuple] = []
+        if lib_query is None:
+            for lib in self._libs:
+                tier = _tier(lib.lower(), query)
+                if tier >= 0:
+                    ranked.append((tier, 0, len(lib), lib, -1, -1))
+            allowed = None
+        else:
+            allowed = {lib_id for lib, lib_id in self._libs.items() if lib_query in lib.lower()}
+
+        found = self._find(query)
+        if len(found) < limit and len(query) > 3:
+            found += self._fuzzy(query, {name_id for _, _, name_id in found})
+        libNames = self._libNames
+        offsets = self._offsets
+        lower = self._lower
+        views = 0
+        for tier, score, name_id in found:
+            length = offsets[name_id + 1] - offsets[name_id]
+            if cell_query is None:
+                for lib_id in self._ownersOf(name_id):
+                    if allowed is None or lib_id in allowed:
+                        ranked.append((tier, score, length, libNames[lib_id], name_id, -1))
+            # Views are shared by many cells, only the first GATHER are ranked
+            for lib_id, cells in self._viewOwners.get(name_id, {}).items():
+                if views >= GATHER:
+                    break
+                if allowed is not None and lib_id not in allowed:
+                    continue
+                for cell_id in cells:
+                    if cell_query is None or cell_query in lower[offsets[cell_id]:offsets[cell_id + 1]]:
+                        ranked.append((tier, score, length, libNames[lib_id], cell_id, name_id))
+                        views += 1
+        ranked.sort()
+        return [SearchMatch(lib, None if cell_id < 0 else self._name(cell_id), tier,
+                            None if view_id < 0 else self._name(view_id))
+                for tier, _, _, lib, cell_id, view_id in ranked[:limit]]
+
+    def _find(self, query: str) -> List[Tuple[int, int, int]]:
+        """
+        (tier, 0, name id) of the cell and view names containing query, the
+        exact matches and up to GATHER others.
+        """
+        used = self._used
+        exact = list(self._casedIds.get(query, ()))
+        if query in self._ids:
+            exact.append(self._ids[query])
+        found = [(EXACT, 0, name_id) for name_id in exact if used(name_id)]
+        if len(query) < 3:
+            candidates = self._postings.get(_PREFIX + query, ())
+        else:
+            lists = [self._postings.get(trigram) for trigram in _trigrams(query)]
+            candidates = () if None in lists else min(lists, key=len)
+        others = 0
+        key = query.encode()
+        lower = self._lower
+        offsets = self._offsets
+        for name_id in candidates:
+            tier = _tier(lower[offsets[name_id]:offsets[name_id + 1]], key)
+            if tier > EXACT and used(name_id):
+                found.append((tier, 0, name_id))
+                others += 1
+                if others >= GATHER:
+                    return found
+        if len(query) < 3:
+            found += self._substrings(key, GATHER - others)
+        return found
+
+    def _substrings(self, key: bytes, limit: int) -> List[Tuple[int, int, int]]:
+        """
+        (SUBSTRING, 0, name id) of up to limit names containing key other
+        than at their start, found in the name buffer.
+        """
+        used = self._used
+        lower = self._lower
+        offsets = self._offsets
+        found = []
+        start = lower.find(key)
+        while start >= 0 and len(found) < limit:
+            name_id = bisect_right(offsets, start) - 1
+            end = offsets[name_id + 1]
+            # Not across the end of the name, nor one of the prefix matches,
+            # any later match in the name would run across its end too
+            if start + len(key) <= end and start > offsets[name_id] and used(name_id):
+                found.append((SUBSTRING, 0, name_id))
+            start = lower.find(key, end)
+        return found
+
+    def _fuzzy(self, query: str, exclude: set) -> List[Tuple[int, int, int]]:
+        """
+        (FUZZY, -shared, name id) of names sharing half of the query's
+        trigrams. Candidates are the names with most of its less common
+        trigrams, they are then checked for all of them.
+        """
+        trigrams = _trigrams(query)
+        lists = sorted(filter(None, map(self._postings.get, trigrams)), key=len)
+        counts = Counter()
+        total = 0
+        for ids in lists:
+            total += len(ids)
+            if total > FUZZY_POSTINGS and counts:
+                break
+            counts.update(ids)
+        need = max(2, (len(trigrams) + 1) // 2)
+        keys = [trigram.encode() for trigram in trigrams]
+        lower = self._lower
+        offsets = self._offsets
+        used = self._used
+        found = []
+        for name_id, _ in counts.most_common(FUZZY_CANDIDATES):
+            if name_id in exclude or not used(name_id):
+                continue
+            name = lower[offsets[name_id]:offsets[name_id + 1]]
+            shared = sum(key in name for key in keys)
+            if shared >= need:
+                found.append((FUZZY, -shared, name_id))
+        return found
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer project snapshots.
+
+A snapshot is a binary image of a parsed cds.lib, the kind of each of its
+libraries and a CompactCatalog of their cells and views. It is memory
+mapped when the browser starts, so the lists can be shown before anything
+is read from the project, and checked against the filesystem afterwards.
+
+Snapshots are written by the browser after each refresh, or for a whole
+team with:
+
+    python -m eda_explorer.spyder.snapshot --output-dir /proj/snapshots $PROJHOME/cds.lib
+
+Point $EDA_EXPLORER_SNAPSHOT_DIR at that directory to use them.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from .cadStuff import CadContext, Workspace, expand_env_vars
+from .catalog import MISSING, OA, XSCHEM, cache_dir
+from .compact import CompactCatalog, MappedNameTable
+from .instrument import fs
+
+MAGIC = b'EDAXSNAP'
+# Bump when the layout changes, snapshots of other versions are ignored
+VERSION = 1
+
+# Magic, version and header length
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def snapshot_name(cdslib_path: str) -> str:
+    """File name of the snapshot of a cds.lib, from its expanded path."""
+    digest = hashlib.sha1(expand_env_vars(cdslib_path).encode()).hexdigest()
+    return f'{digest[:20]}.snap'
+
+def snapshot_dirs() -> List[str]:
+    """Directories searched for snapshots, the user's first."""
+    dirs = [os.path.join(cache_dir(), 'snapshots')]
+    team = os.environ.get('EDA_EXPLORER_SNAPSHOT_DIR')
+    if team:
+        dirs.append(team)
+    return dirs
+
+
+class Snapshot:
+    """
+    A loaded snapshot, its tables are views of the mapped file.
+
+    Attributes:
+        cdslib: Expanded cds.lib path(s) the snapshot was made from
+        created: Time the snapshot was made, seconds since the epoch
+        libraries: Library names mapped to their paths
+        kinds: Library names mapped to MISSING, OA or XSCHEM, libraries
+               that could not be classified are left out
+        files: The cds.lib files mapped to their (mtime_ns, size)
+        catalog: CompactCatalog of the cells and views
+    """
+    def __init__(self, header: Dict, catalog: CompactCatalog,
+                 mm: Optional[mmap.mmap] = None, views: Sequence[memoryview] = ()):
+        self.cdslib: str = header['cdslib']
+        self.created: float = header['created']
+        self.libraries: Dict[str, str] = header['libraries']
+        self.kinds: Dict[str, str] = header['kinds']
+        self.files: Dict[str, List[int]] = header['files']
+        self.catalog = catalog
+        # The mapped file and the views of it the tables are
+        self._mmap = mm
+        self._views = list(views)
+
+    def close(self) -> None:
+        """Unmap the file, the catalog can't be used afterwards."""
+        if self._mmap is not None:
+            _unmap(self._mmap, self._views)
+            self._mmap = None
+            self._views = []
+
+    def __repr__(self):
+        return f"Snapshot('{self.cdslib}', {len(self.catalog)} cellviews)"
+
+    def filesChanged(self) -> bool:
+        """True if any of the cds.lib files changed since the snapshot."""
+        for path, key in self.files.items():
+            try:
+                st = fs.stat(path)
+            except OSError:
+                return True
+            if [st.st_mtime_ns, st.st_size] != key:
+                return True
+        return False
+
+    def cells(self, lib: str) -> Optional[List[str]]:
+        """Sorted cells of lib, None if the snapshot doesn't have them."""
+        record = self.catalog.library(lib)
+        return None if record is None else record.cellNames()
+
+    def views(self, lib: str, cell: str) -> Optional[Dict[str, str]]:
+        """
+        Views of a cell as Catalog.views returns them, None if the snapshot
+        doesn't have them.
+        """
+        record = self.catalog.cell(lib, cell)
+        if record is None or not record.viewsKnown:
+            return None
+        return {view.name: view.path for view in record.views()}
+
+
+def write(path: str, cdslib: str, libraries: Dict[str, str], kinds: Dict[str, str],
+          catalog: CompactCatalog, files: List[str]) -> None:
+    """
+    Write a snapshot, atomically replacing path.
+
+    Args:
+        path: Snapshot file
+        cdslib: Expanded cds.lib path(s) it is made from
+        libraries: Library names mapped to their paths
+        kinds: Library kinds, see Snapshot.kinds
+        catalog: Cells and views of the libraries
+        files: The cds.lib files, their stat is recorded
+    """
+    stats = {}
+    for file in files:
+        try:
+            st = fs.stat(file)
+        except OSError:
+            continue
+        stats[file] = [st.st_mtime_ns, st.st_size]
+
+    blobs = [catalog.names[i].encode() for i in range(len(catalog.names))]
+    offsets = array('q', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    sections = [(name, getattr(catalog, name)) for name in CompactCatalog.ARRAYS]
+    sections += [('nameOffsets', offsets), ('nameBlob', array('B', b''.join(blobs)))]
+
+    table = {}
+    data = []
+    offset = 0
+    for name, values in sections:
+        values = array(values.typecode, values) if not isinstance(values, array) else values
+        raw = values.tobytes()
+        table[name] = [values.typecode, offset, len(values)]
+        data.append(raw + bytes(_align(len(raw)) - len(raw)))
+        offset += _align(len(raw))
+
+    header = json.dumps({'cdslib': cdslib, 'created': time.time(), 'libraries': libraries,
+                         'kinds': kinds, 'files': stats, 'sections': table,
+                         'byteorder': sys.byteorder}).encode()
+    preamble = _PREAMBLE.pack(MAGIC, VERSION, len(header))
+    start = _align(len(preamble) + len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix='.snapshot-', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(preamble)
+            f.write(header)
+            f.write(bytes(start - len(preamble) - len(header)))
+            for raw in data:
+                f.write(raw)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _unmap(mm: mmap.mmap, views: Sequence[memoryview]) -> None:
+    # The views pin the mapping, they go first
+    for view in reversed(views):
+        view.release()
+    mm.close()
+
+def load(path: str) -> Optional[Snapshot]:
+    """
+    Map a snapshot, None if it is missing, unreadable or of another
+    version. Close it once done with it.
+    """
+    try:
+        with fs.open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    views = []
+    try:
+        magic, version, length = _PREAMBLE.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} snapshot")
+        header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + length])
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError("Snapshot of another byte order")
+        start = _align(_PREAMBLE.size + length)
+        buffer = memoryview(mm)
+        views.append(buffer)
+        tables = {}
+        for name, (typecode, offset, count) in header['sections'].items():
+            size = count * array(typecode).itemsize
+            if start + offset + size > len(mm):
+                raise ValueError("Truncated snapshot")
+            tables[name] = buffer[start + offset:start + offset + size].cast(typecode)
+            views.append(tables[name])
+        names = MappedNameTable(tables.pop('nameBlob'), tables.pop('nameOffsets'))
+        catalog = CompactCatalog.frombuffers(names, tables)
+    except (struct.error, ValueError, KeyError, TypeError, IndexError):
+        _unmap(mm, views)
+        return None
+    return Snapshot(header, catalog, mm, views)
+
+def find(cdslib_path: str) -> Optional[Snapshot]:
+    """Newest snapshot of a cds.lib in snapshot_dirs(), None if there is none."""
+    cdslib = expand_env_vars(cdslib_path)
+    best = None
+    for directory in snapshot_dirs():
+        snapshot = load(os.path.join(directory, snapshot_name(cdslib)))
+        if snapshot is None:
+            continue
+        if snapshot.cdslib == cdslib and (best is None or snapshot.created > best.created):
+            snapshot, best = best, snapshot
+        if snapshot is not None:
+            snapshot.close()
+    return best
+
+def build(ctx: CadContext, max_workers: int = 8) -> Snapshot:
+    """
+    Scan every library of a context, including all views and viewfiles,
+    and return the snapshot contents, for write.
+    """
+    libraries = dict(ctx.libraries())
+    kinds = {}
+    catalog = CompactCatalog()
+    for lib, lib_path in libraries.items():
+        if not fs.isdir(lib_path):
+            kinds[lib] = MISSING
+            continue
+        xschem = ctx.isXschem(lib)
+        kinds[lib] = XSCHEM if xschem else OA
+        try:
+            cells = ctx.getLibraryViewfiles(lib, max_workers)
+        except OSError:
+            continue
+        catalog.addLibrary(lib, lib_path, cells, xschem)
+    header = {'cdslib': expand_env_vars(ctx.cdslibPath), 'created': time.time(),
+              'libraries': libraries, 'kinds': kinds, 'files': {}}
+    return Snapshot(header, catalog)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m eda_explorer.spyder.snapshot',
+        description="Build EDA Explorer snapshots of cds.lib files, for instant browser start up.")
+    parser.add_argument('cdslib', nargs='+', help="cds.lib file(s), or several joined "
+                        f"with '{os.pathsep}' for a workspace")
+    parser.add_argument('--output-dir', default=os.path.join(cache_dir(), 'snapshots'),
+                        help="directory to write to, default %(default)s")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="cells scanned in parallel, default %(default)s")
+    args = parser.parse_args(argv)
+
+    for cdslib in args.cdslib:
+        start = time.perf_counter()
+        paths = [os.path.abspath(path) for path in expand_env_vars(cdslib).split(os.pathsep) if path]
+        ctx = Workspace(paths) if len(paths) > 1 else CadContext(paths[0])
+        snapshot = build(ctx, args.workers)
+        path = os.path.join(args.output_dir, snapshot_name(snapshot.cdslib))
+        write(path, snapshot.cdslib, snapshot.libraries, snapshot.kinds, snapshot.catalog, ctx.files())
+        print(f"{path}: {len(snapshot.libraries)} libraries, {len(snapshot.catalog)} cellviews "
+              f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer filesystem watcher.
+
+Watches the cds.lib files and the selected library and cell directories,
+coalescing bursts of change notifications into a single update. Paths are
+checked through the filesystem guard, so a hung mount doesn't block the
+UI thread.
+"""
+
+# Standard library imports
+import time
+
+# Third party imports
+from qtpy.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+# Local imports
+from .fsguard import guard, FsUnresponsive
+from .instrument import fs
+
+
+class CatalogWatcher(QObject):
+    """
+    Debounced QFileSystemWatcher over named groups of paths.
+
+    Every change notification restarts a short timer. When it expires,
+    or once max_delay has passed since the first pending change, a single
+    sig_changed is emitted with the groups whose paths changed.
+
+    Args:
+        parent: Parent QObject
+        delay: Quiet time in ms before pending changes are emitted
+        max_delay: Longest time in ms a change is held back
+    """
+
+    sig_changed = Signal(object)
+    """
+    Emitted with the set of group names that had changes.
+    """
+
+    def __init__(self, parent=None, delay=300, max_delay=2000):
+        super().__init__(parent)
+        self.delay = delay
+        self.max_delay = max_delay
+        self._groups = {}
+        # group -> guard key its paths are checked under
+        self._keys = {}
+        self._pending = set()
+        self._firstPending = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._watcher.directoryChanged.connect(self._on_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+
+    def watch(self, group, paths, key):
+        """
+        Replace the paths watched for group, missing paths are ignored.
+
+        Args:
+            group: Group name, as emitted by sig_changed
+            paths: Files or directories
+            key: Guard key the paths are checked under, usually their
+                 library directory. Nothing is watched while it is tripped
+        """
+        self._keys[group] = key
+        self._groups[group] = self._existing(key, paths)
+        self._sync()
+
+    def unwatch(self, group):
+        """Stop watching the paths of group."""
+        self._groups.pop(group, None)
+        self._keys.pop(group, None)
+        self._sync()
+
+    def clear(self):
+        """Stop watching everything and drop pending changes."""
+        self._groups = {}
+        # group -> guard key its paths are checked under
+        self._keys = {}
+        self._pending = set()
+        self._timer.stop()
+        self._sync()
+
+    def _existing(self, key, paths):
+        """The paths that exist, none if key is not responding."""
+        if guard.isTripped(key):
+            return set()
+        try:
+            return guard.call(key, _existing, paths)
+        except FsUnresponsive:
+            return set()
+
+    def _wanted(self):
+        return set().union(*self._groups.values())
+
+    def _sync(self):
+        wanted = self._wanted()
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        if watched - wanted:
+            self._watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self._watcher.addPaths(list(wanted - watched))
+
+    def _on_changed(self, path):
+        self._pending.add(path)
+        now = time.monotonic()
+        if self._firstPending is None:
+            self._firstPending = now
+        remaining = self.max_delay/1000 - (now - self._firstPending)
+        self._timer.start(max(0, min(self.delay, int(remaining*1000))))
+
+    def _flush(self):
+        pending, self._pending = self._pending, set()
+        self._firstPending = None
+        changed = {group for group, paths in self._groups.items() if paths & pending}
+        # Files replaced by rename drop out of the watcher, add them back
+        # and forget the ones that are really gone
+        for group, paths in self._groups.items():
+            self._groups[group] = self._existing(self._keys[group], paths)
+        self._sync()
+        if changed:
+            self.sig_changed.emit(changed)
+
+
+def _existing(paths):
+    return {p for p in paths if fs.exists(p)}
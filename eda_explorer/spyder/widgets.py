@@ -9,10 +9,15 @@ EDA Explorer Main Widget.
 """
 
 
+# Standard library imports
+import os
+import threading
+import time
+from bisect import bisect_left
+
 # Third party imports
-from qtpy.QtWidgets import QHBoxLayout,  QListWidgetItem
-from qtpy.QtGui import QColor, QBrush
-from qtpy.QtCore import Qt
+from qtpy.QtWidgets import QHBoxLayout
+from qtpy.QtCore import QItemSelectionModel, QStringListModel, QTimer, Signal
 
 
 # Spyder imports
@@ -21,16 +26,25 @@ from spyder.api.translations import get_translation
 
 from spyder.api.widgets.main_widget import PluginMainWidget
 
-from .guiCreator import create_gui
-from .cadStuff import parse_cdslib, full, oalcv, isXschem, getXschemCells, getXschemCellViews
-import os
+# The browser backend (cadStuff, catalog, compact, snapshot) is imported by
+# the methods using it, so that loading the plugin does not, see build
+from .fsguard import guard, FsUnresponsive, UNRESPONSIVE
+from .instrument import NO_SPAN, fs, recorder
+from .models import NameListModel
+from .watcher import CatalogWatcher
 
 # Localization
 _ = get_translation("eda_explorer.spyder")
 
 
+# Library state while its classification is running
+PENDING = 'pending'
+
+
 class EDAExplorerActions:
     ExampleAction = "example_action"
+    RecordTimings = "record_timings"
+    ShowTimings = "show_timings"
 
 
 class EDAExplorerToolBarSections:
@@ -39,16 +53,177 @@ class EDAExplorerToolBarSections:
 
 class EDAExplorerOptionsMenuSections:
     ExampleSection = "example_section"
+    Diagnostics = "diagnostics_section"
 
 
 class EDAExplorerWidget(PluginMainWidget):
 
     # PluginMainWidget class constants
 
+    # Matches shown for a search, and ms between re-runs of the search
+    # while the index is updated
+    SEARCH_LIMIT = 100
+    SEARCH_RERUN = 300
+    # Prefetching starts once clicks have stopped for PREFETCH_IDLE ms. It
+    # warms the catalog for PREFETCH_LIBRARIES libraries on each side of
+    # the selected one and for the views of the first PREFETCH_CELLS cells,
+    # and the cells next to the selected one. RECENT libraries and cells
+    # are remembered across sessions and prefetched too
+    PREFETCH_IDLE = 500
+    PREFETCH_LIBRARIES = 2
+    PREFETCH_CELLS = 20
+    RECENT = 10
+
     # Signals
+    sig_cdslib_parsed = Signal(int, object)
+    """
+    Emitted from a refresh worker when the cds.lib file has been parsed.
+
+    Parameters
+    ----------
+    generation: int
+        Refresh the result belongs to.
+    libraries: dict
+        Library names mapped to their paths.
+    """
+
+    sig_library_classified = Signal(int, str, str)
+    """
+    Emitted from a refresh worker when a library has been classified.
+
+    Parameters
+    ----------
+    generation: int
+        Refresh the result belongs to.
+    lib: str
+        Library name.
+    kind: str
+        One of the catalog library kinds.
+    """
+
+    sig_library_polled = Signal(str, object)
+    """
+    Emitted from a worker when the selected library has been polled.
+
+    Parameters
+    ----------
+    lib: str
+        Library name.
+    changes: LibraryChanges or None
+        Cells that changed, None if the library did not respond.
+    """
+
+    sig_cells_listed = Signal(str, object)
+    """
+    Emitted from a worker when the cells of a library the catalog had no
+    current listing of have been scanned.
+
+    Parameters
+    ----------
+    lib: str
+        Library name.
+    cells: list
+        Sorted cell names.
+    """
+
+    sig_views_listed = Signal(str, str, object)
+    """
+    Emitted from a worker when the views of a cell the catalog had no
+    current listing of have been scanned.
+
+    Parameters
+    ----------
+    lib: str
+        Library name.
+    cell: str
+        Cell name.
+    views: dict
+        View names mapped to their view file or directory.
+    """
+
+    sig_snapshot_found = Signal(int, object)
+    """
+    Emitted from a refresh worker with the newest snapshot of the cds.lib,
+    if its cds.lib files did not change since.
+
+    Parameters
+    ----------
+    generation: int
+        Refresh the snapshot was looked up for.
+    snapshot: Snapshot
+        The mapped snapshot, closed by the widget.
+    """
+
+    sig_search_results = Signal(int, object)
+    """
+    Emitted from the search worker with the matches of a query.
+
+    Parameters
+    ----------
+    generation: int
+        Query the matches belong to.
+    matches: list
+        SearchMatch list, best first.
+    """
+
+    sig_search_indexed = Signal()
+    """
+    Emitted from a worker when a library has been (re)indexed for search.
+    """
 
     def __init__(self, name=None, plugin=None, parent=None):
         super().__init__(name, plugin, parent)
+        
+        # The browser is built on first show or when Spyder is idle, see
+        # build. Seconds spent in setup, build and the first refresh
+        self._built = False
+        self.startupTimes = {}
+        # Refresh workers, results of a cancelled refresh are dropped by
+        # comparing their generation with self._refreshGen
+        self._pool = None
+        self._refreshGen = 0
+        # Refresh whose cds.lib parse has been shown
+        self._parsedGen = -1
+        self._futures = []
+        self._pendingLibs = set()
+        # cds.lib changed while a refresh was running, it is parsed again
+        # once the refresh is complete
+        self._cdslibChanged = False
+        self._polling = False
+        # Snapshot the lists were filled from and the libraries in it that
+        # have not been checked against the filesystem yet
+        self._snapshot = None
+        self._unverified = set()
+        # Held while a worker decodes cells from the snapshot, so it is not
+        # unmapped under it
+        self._snapshotLock = threading.Lock()
+        # Libraries listed before a refresh of the same cds.lib, checked
+        # again without being greyed out
+        self._recheck = set()
+        # Search index, updated by the refresh workers under _searchLock
+        # and queried from _searchPool. Results of a superseded query are
+        # dropped by comparing their generation with self._searchGen
+        self.search = None
+        self._searchLock = threading.Lock()
+        self._searchPool = None
+        self._searchGen = 0
+        self._searchMatches = {}
+        # Span of the refresh in progress, see instrument
+        self._refreshSpan = NO_SPAN
+        # Whether the recorder was enabled by the 'instrument' option, it
+        # is left alone if $EDA_EXPLORER_TRACE enabled it
+        self._recording = False
+        self._timingsPane = None
+        # The cdslib the library path -> name map of _libraryName is of
+        self._libraryNames = (None, {})
+        # Rolling stat and scandir latencies of the libraries, see latency
+        self.latency = None
+        # Idle time prefetching, in a single worker of its own. A job stops
+        # between libraries once _prefetchGen has moved on
+        self._prefetchPool = None
+        self._prefetchGen = 0
+        # Recently selected 'lib' and 'lib/cell', most recent first
+        self._recent = []
 
 
 
@@ -61,182 +236,981 @@ class EDAExplorerWidget(PluginMainWidget):
         pass
 
     def setup(self):
-        # Create an example action
-       description = '''
-           |
-               -
-                   b.Browse
-                   "cds.lib File"
-                   e.cdslib
-                   b.Refresh
-               -
-                   |Library
-                       l.libraries
-                   |Cell
-                       -
-                           "Category:"
-                           c.category
-                       l.cells
-                       -
-                           b.New Cell
-                   |View
-                       l.views
-                       -
-                           b.Open
-                           b.New
-                           b.Run
-       '''
+        start=time.perf_counter()
+        # Filled by build
+        self._layout=QHBoxLayout()
+        self.setLayout(self._layout)
+        
+        record=self.create_action(
+            EDAExplorerActions.RecordTimings, _("Record timings"),
+            tip=_("Time operations and count their filesystem calls, per library"),
+            toggled=True, option='instrument', initial=self.get_conf('instrument', False))
+        show=self.create_action(
+            EDAExplorerActions.ShowTimings, _("Show timings..."), triggered=self.showTimings)
+        for action in (record, show):
+            self.add_item_to_menu(action, menu=self.get_options_menu(),
+                                  section=EDAExplorerOptionsMenuSections.Diagnostics)
+        self._configureInstrument()
+        self.startupTimes['setup']=time.perf_counter()-start
+
+    def build(self):
+        """
+        Create the browser and start the first refresh, once.
+
+        Called on the first show of the dock, or by the plugin when the
+        main window is up, so the plugin registers without importing the
+        backend or touching the project.
+        """
+        if self._built:
+            return
+        self._built=True
+        start=time.perf_counter()
+        from concurrent.futures import ThreadPoolExecutor
+        from .cadStuff import full
+        from .catalog import Catalog
+        from .guiCreator import create_gui
+        from .latency import LatencyHistory
+        from .search import SearchIndex
+        
+        description = '''
+            |
+                -
+                    b.Browse
+                    "cds.lib File"
+                    e.cdslib
+                    b.Refresh
+                -
+                    "Search"
+                    e.search
+                v.results
+                -
+                    |Library
+                        v.libraries
+                    |Cell
+                        -
+                            "Category:"
+                            c.category
+                        v.cells
+                        -
+                            b.New Cell
+                    |View
+                        v.views
+                        -
+                            b.Open
+                            b.New
+                            b.Run
+        '''
       
-       central_widget = create_gui(self, description)
-
-       # Add example label to layout
-       layout = QHBoxLayout()
-       layout.addWidget(central_widget)
-       self.setLayout(layout)
-       
-       self.lib=None
-       self.cell=None
-       self.view=None
-       
-       if 'PROJHOME' in os.environ:
-           self.widgets['cdslib'].setText(full('$PROJHOME/cds.lib'))
-           self.b_Refresh()        
-       for w in self._parent.widgetlist:
-           # item=QListWidgetItem(str(w.__class__))
-           # self.widgets['cells'].addItem(item)
-           if 'Editor' in str(w.__class__):
-               self.editor=w
-           if 'Console' in str(w.__class__):
-               self.console=w
-       self.widgets['views'].itemDoubleClicked.connect(self.b_Open)
-          
-            
+        central_widget = create_gui(self, description)
+        self._layout.addWidget(central_widget)
+        self.widgets['cdslib'].setToolTip(
+            _("cds.lib file, or several separated by '{}' to browse them together").format(os.pathsep))
+        self.widgets['search'].setToolTip(
+            _("Find libraries, cells and views of the whole cds.lib, 'lib/name' to search "
+              "some libraries, 'lib/cell/view' the views of some cells"))
+        self.widgets['search'].setClearButtonEnabled(True)
+        self.widgets['results'].setVisible(False)
+
+        self.lib=None
+        self.cell=None
+        self.view=None
+        self._pool=ThreadPoolExecutor(max_workers=8, thread_name_prefix='eda_explorer')
+        self._searchPool=ThreadPoolExecutor(max_workers=1, thread_name_prefix='eda_explorer-search')
+        self._prefetchPool=ThreadPoolExecutor(max_workers=1, thread_name_prefix='eda_explorer-prefetch')
+        self._recent=list(self.get_conf('recent', []))
+        self.search=SearchIndex()
+        self.catalog=Catalog()
+        self.latency=LatencyHistory()
+        self.cdslib={}
+        self.cdslibPath=None
+        self.cad=None
+        self.saveState={}
+        
+        self._configureGuard()
+        self.watcher=CatalogWatcher(self)
+        self.watcher.sig_changed.connect(self._on_watched_changed)
+        # inotify does not see changes made on other NFS clients, so the
+        # selected library is also polled through its fingerprints
+        self._pollTimer=QTimer(self)
+        self._pollTimer.timeout.connect(self._poll)
+        self._configurePolling()
+        self.sig_library_polled.connect(self._on_library_polled)
+        self.sig_cdslib_parsed.connect(self._on_cdslib_parsed)
+        self.sig_library_classified.connect(self._on_library_classified)
+        self.sig_cells_listed.connect(self._on_cells_listed)
+        self.sig_views_listed.connect(self._on_views_listed)
+        self.sig_search_results.connect(self._on_search_results)
+        self.sig_snapshot_found.connect(self._showSnapshot)
+        # Matches are refreshed while libraries are indexed, at most every
+        # SEARCH_RERUN ms
+        self._searchTimer=QTimer(self)
+        self._searchTimer.setSingleShot(True)
+        self._searchTimer.setInterval(self.SEARCH_RERUN)
+        self._searchTimer.timeout.connect(lambda: self.e_search(self.widgets['search'].text()))
+        self.sig_search_indexed.connect(self._on_search_indexed)
+        self._prefetchTimer=QTimer(self)
+        self._prefetchTimer.setSingleShot(True)
+        self._prefetchTimer.setInterval(self.PREFETCH_IDLE)
+        self._prefetchTimer.timeout.connect(self._prefetch)
+        
+        self.startupTimes['build']=time.perf_counter()-start
+        
+        if 'PROJHOME' in os.environ:
+            start=time.perf_counter()
+            self.widgets['cdslib'].setText(full('$PROJHOME/cds.lib'))
+            self.b_Refresh()
+            self.startupTimes['refresh']=time.perf_counter()-start
+        for w in self._parent.widgetlist:
+            # item=QListWidgetItem(str(w.__class__))
+            # self.widgets['cells'].addItem(item)
+            if 'Editor' in str(w.__class__):
+                self.editor=w
+            if 'Console' in str(w.__class__):
+                self.console=w
+        self.widgets['views'].doubleClicked.connect(lambda index: self.b_Open())
+           
+             
     
 
     def update_actions(self):
         pass
 
+    def showEvent(self, event):
+        self.build()
+        super().showEvent(event)
+
     @on_conf_change
     def on_section_conf_change(self, section):
         pass
 
+    @on_conf_change(option=['fs_timeout', 'fs_cooldown'])
+    def on_fs_guard_conf_change(self, option, value):
+        if self._built:
+            self._configureGuard()
+
+    @on_conf_change(option='poll_interval')
+    def on_poll_interval_change(self, value):
+        if self._built:
+            self._configurePolling()
+
+    @on_conf_change(option=['latency_slow', 'latency_very_slow'])
+    def on_latency_conf_change(self, option, value):
+        if self._built:
+            self._markLatency(self.cdslib)
+
+    @on_conf_change(option='instrument')
+    def on_instrument_change(self, value):
+        self._configureInstrument()
+
+    def on_close(self):
+        if not self._built:
+            return
+        self.cancelRefresh()
+        self._pollTimer.stop()
+        self.watcher.clear()
+        self._searchTimer.stop()
+        self._prefetchTimer.stop()
+        self._prefetchGen+=1
+        self._pool.shutdown(wait=False)
+        self._searchPool.shutdown(wait=False)
+        self._prefetchPool.shutdown(wait=False)
+        self._closeSnapshot()
+        self.latency.save()
+        self.set_conf('recent', self._recent)
+
     # --- Public API
     # ------------------------------------------------------------------------
     def b_Refresh(self):
-        self.saveState={}
-        if self.lib is not None:
-            self.saveState['lib']=self.lib
-        if self.cell is not None:
-            self.saveState['cell']=self.cell
-        if self.view is not None:
-            self.saveState['view']=self.view
-        self.lib=None
+        """
+        Re-read cds.lib and the libraries in the background.
+
+        Library names are listed as soon as cds.lib is parsed and coloured
+        once their directory has been classified. Starting a new refresh
+        cancels the one in progress.
+
+        Refreshing the cds.lib already shown updates the lists in place:
+        libraries, cells and views that came or went are inserted and
+        removed, the others keep their colour, the selection and the
+        scroll position while they are checked again.
+        """
+        from .cadStuff import context
+        cdslibPath=self.widgets['cdslib'].text()
+        cad=context(cdslibPath)
+        switched=cad is not self.cad
+        if switched:
+            saveState={}
+            if self.lib is not None:
+                saveState['lib']=self.lib
+            if self.cell is not None:
+                saveState['cell']=self.cell
+            if self.view is not None:
+                saveState['view']=self.view
+            if saveState or not self._futures:
+                # Otherwise keep restoring the selection of the cancelled refresh
+                self.saveState=saveState
+        self.cancelRefresh()
                 
-        self.cdslibPath=self.widgets['cdslib'].text()
-        self.cdslib=parse_cdslib(self.cdslibPath)
-        
-        for w in ['libraries', 'cells', 'views']:
-            self.widgets[w].blockSignals(True)
-            self.widgets[w].clear()
-            self.widgets[w].blockSignals(False)
-        
-        self.lib,self.cell,self.view=(None,None,None)
-        
-        for lib in sorted(self.cdslib.keys()):
-            libPath=self.cdslib[lib]
-            pathok=os.path.isdir(libPath)
-            item = QListWidgetItem(lib)
-            if not pathok:
-                item.setForeground(QBrush(QColor('red')))
-                item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
-            elif isXschem(lib):
-                item.setForeground(QBrush(QColor('cornflowerblue')))
-            self.widgets['libraries'].addItem(item)
+        self.cdslibPath=cdslibPath
+        self._refreshSpan=recorder.start('Refresh', cdslib=self.cdslibPath)
+        self.cad=cad
+        self._pendingLibs=set()
+        if switched:
+            self.cdslib={}
+            for w in ['libraries', 'cells', 'views']:
+                self.widgets[w].model().clear()
+            self.lib,self.cell,self.view=(None,None,None)
+            self._closeSnapshot()
+            self._recheck=set()
+            self.watcher.clear()
+        else:
+            self._recheck=set(self.cdslib)
+        
+        if switched:
+            # Jobs of the previous refresh update the index they were given
+            from .search import SearchIndex
+            self.search=SearchIndex()
+            # Ahead of the parse, a snapshot is only of use before it
+            self._submit(self._findSnapshotJob, self._refreshGen, self.cad.cdslibPath)
+        self._submit(self._parseJob, self._refreshGen, self.cad)
+
+    def cancelRefresh(self):
+        """Stop a refresh in progress, pending results are discarded."""
+        self._refreshSpan.finish(cancelled=True)
+        self._refreshGen+=1
+        self._cdslibChanged=False
+        for future in self._futures:
+            future.cancel()
+        self._futures=[]
+
+    def e_cdslib(self, text):
+        if text!=self.cdslibPath:
+            # Switching cds.lib makes the refresh in progress pointless
+            self.cancelRefresh()
+
+    def e_search(self, text):
+        self._searchGen+=1
+        self.widgets['results'].setVisible(bool(text.strip()))
+        if not text.strip():
+            self._on_search_results(self._searchGen, [])
+            return
+        self._searchPool.submit(self._searchJob, self._searchGen, self.search, text)
+
+    def m_results(self):
+        # Ranked, so not a NameListModel
+        return QStringListModel(self)
+
+    def l_results(self):
+        rows=self.widgets['results'].selectionModel().selectedRows()
+        if not rows:
+            return
+        match=self._searchMatches.get(rows[0].data())
+        if match is None:
+            return
+        if match.lib!=self.lib and not self._select('libraries', match.lib):
+            return
+        if match.cell is not None and self._select('cells', match.cell):
+            if match.view is not None and not self._select('views', match.view):
+                # Selected once the views are listed
+                self.saveState['view']=match.view
+
+    def m_libraries(self):
+        from .catalog import MISSING, XSCHEM
+        from .latency import SLOW, VERY_SLOW
+        model=NameListModel(self)
+        model.setStyle(PENDING, color='gray')
+        model.setStyle(MISSING, color='red', selectable=False)
+        model.setStyle(XSCHEM, color='cornflowerblue')
+        model.setStyle(UNRESPONSIVE, color='darkorange')
+        # Translucent so they read on light and dark themes
+        model.setMarkStyle(SLOW, color='#50ffd700')
+        model.setMarkStyle(VERY_SLOW, color='#60ff4500')
+        model.setToolTipProvider(self._latencyOf)
+        return model
+
+    def m_cells(self):
+        return NameListModel(self)
+
+    def m_views(self):
+        model=NameListModel(self)
+        model.setToolTipProvider(self._viewfileOf)
+        return model
+
+    def _viewfileOf(self, view):
+        """Viewfile of a view of the current cell, shown as its tooltip."""
+        from .catalog import XSCHEM
+        path=self.viewD.get(view)
+        if path is None or self.widgets['libraries'].model().state(self.lib)==XSCHEM:
+            return path
+        try:
+            return guard.call(self.libDir, self.cad.readMasterTag, path)
+        except (FsUnresponsive, ValueError):
+            return None
+
+    def _latencyOf(self, lib):
+        """Latency of a slow library, shown as its tooltip."""
+        model=self.widgets['libraries'].model()
+        libPath=self.cdslib.get(lib)
+        if self.latency is None or libPath is None or model.mark(lib) is None:
+            return None
+        stats=self.latency.stats(libPath)
+        return _("Slow library, p50/p95 over the last days:\n"
+                 "stat {:g}/{:g} ms, scandir {:g}/{:g} ms").format(
+            stats['stat']['p50'], stats['stat']['p95'],
+            stats['scandir']['p50'], stats['scandir']['p95'])
+
+    def _markLatency(self, libs):
+        """Mark libraries with their latency tier."""
+        model=self.widgets['libraries'].model()
+        slow=self.get_conf('latency_slow', 50)
+        verySlow=self.get_conf('latency_very_slow', 500)
+        for lib in libs:
+            libPath=self.cdslib.get(lib)
+            model.setMark(lib, None if libPath is None else self.latency.tier(libPath, slow, verySlow))
+
+    def showTimings(self):
+        """Show the timings pane, see instrument."""
+        if self._timingsPane is None:
+            from .instrumentpane import InstrumentPane
+            self._timingsPane=InstrumentPane(self, self._libraryName)
+        self._timingsPane.show()
+        self._timingsPane.raise_()
+
+    def _libraryName(self, path):
+        if not self._built:
+            return None
+        # Rebuilt once per parse, the pane asks for every library each second
+        cdslib, names=self._libraryNames
+        if cdslib is not self.cdslib:
+            names={libPath: lib for lib, libPath in reversed(self.cdslib.items())}
+            self._libraryNames=(self.cdslib, names)
+        return names.get(path)
+
+    def _configureInstrument(self):
+        if self.get_conf('instrument', False):
+            if not recorder.enabled:
+                recorder.enable()
+                self._recording=True
+        elif self._recording:
+            recorder.disable()
+            self._recording=False
+
+    def _configureGuard(self):
+        guard.configure(timeout=self.get_conf('fs_timeout', 2000)/1000,
+                        cooldown=self.get_conf('fs_cooldown', 60))
+        self.widgets['libraries'].model().setStyle(
+            UNRESPONSIVE, color='darkorange',
+            tooltip=_("Library is not responding, skipped for {} s").format(int(guard.cooldown)))
+
+    def _configurePolling(self):
+        interval=self.get_conf('poll_interval', 10)
+        if interval>0:
+            self._pollTimer.start(interval*1000)
+        else:
+            self._pollTimer.stop()
+
+    def _submit(self, fn, *args):
+        self._futures.append(self._pool.submit(fn, *args))
+
+    def _parseJob(self, gen, cad):
+        # Runs in a worker thread
+        if gen!=self._refreshGen:
+            return
+        self.latency.load()
+        # Only the files that changed since the last parse are parsed again
+        self.sig_cdslib_parsed.emit(gen, cad.libraries(revalidate=True))
+
+    def _classifyJob(self, gen, lib, libPath):
+        # Runs in a worker thread
+        if gen!=self._refreshGen:
+            return
+        with recorder.span('classify', lib=lib, path=libPath) as span:
+            try:
+                # Probed before the catalog reads bring the directory
+                # into the client's caches. Only the probe is timed, the
+                # scan of a large library may take longer
+                guard.call(libPath, self.latency.probe, libPath)
+            except FsUnresponsive:
+                kind=UNRESPONSIVE
+            else:
+                kind=self.catalog.kind(libPath)
+            span.set(kind=kind)
+        self.sig_library_classified.emit(gen, lib, kind)
+
+    def _searchJob(self, gen, index, text):
+        # Runs in the search worker, skips queries typed over
+        if gen!=self._searchGen:
+            return
+        with self._searchLock:
+            matches=index.search(text, self.SEARCH_LIMIT)
+        self.sig_search_results.emit(gen, matches)
+
+    def _on_search_results(self, gen, matches):
+        if gen!=self._searchGen:
+            return
+        self._searchMatches={str(match): match for match in matches}
+        view=self.widgets['results']
+        view.selectionModel().blockSignals(True)
+        view.model().setStringList(list(self._searchMatches))
+        view.selectionModel().blockSignals(False)
+
+    def _on_search_indexed(self):
+        if self.widgets['search'].text().strip() and not self._searchTimer.isActive():
+            self._searchTimer.start()
+
+    def _indexJob(self, gen, index, lib, libPath, cells=None):
+        # Runs in a worker thread, cells and the views listed so far are
+        # taken from the catalog unless cells are given, outside the lock
+        # so searches only wait for the update
+        if gen!=self._refreshGen:
+            return
+        views=None
+        if cells is None:
+            # Classified just before, served from the catalog
+            try:
+                cells=self.catalog.cells(libPath)
+            except OSError:
+                return
+            views=self.catalog.contents(libPath)
+        with self._searchLock:
+            index.setLibrary(lib, cells, views)
+        self.sig_search_indexed.emit()
+
+    def _indexViewsJob(self, gen, index, lib, cell, views):
+        # Runs in a worker thread
+        if gen!=self._refreshGen:
+            return
+        with self._searchLock:
+            index.setViews(lib, cell, views)
+        self.sig_search_indexed.emit()
+
+    def _unindexJob(self, index, keep=None, remove=None):
+        # Runs in a worker thread
+        with self._searchLock:
+            if keep is not None:
+                index.retain(keep)
+            if remove is not None:
+                index.removeLibrary(remove)
+        self.sig_search_indexed.emit()
+
+    def _findSnapshotJob(self, gen, cdslibPath):
+        # Runs in a worker thread, the team snapshot directory is usually
+        # on a network filesystem
+        from . import snapshot
+        if gen!=self._refreshGen:
+            return
+        snap=snapshot.find(cdslibPath)
+        if snap is None:
+            return
+        try:
+            changed=guard.call(cdslibPath, snap.filesChanged)
+        except FsUnresponsive:
+            # Still in use by the hung call
+            return
+        if changed:
+            snap.close()
+            return
+        self.sig_snapshot_found.emit(gen, snap)
+
+    def _showSnapshot(self, gen, snap):
+        """
+        Fill the libraries list from a snapshot of the cds.lib, until the
+        refresh in progress has checked each library.
+        """
+        from .catalog import OA
+        if gen!=self._refreshGen or gen==self._parsedGen:
+            # Superseded, or cds.lib was parsed first
+            snap.close()
+            return
+        self._closeSnapshot()
+        self._snapshot=snap
+        self.cdslib=dict(snap.libraries)
+        self._unverified=set(self.cdslib)
+        model=self.widgets['libraries'].model()
+        model.setNames(self.cdslib.keys())
+        for lib in self.cdslib:
+            kind=snap.kinds.get(lib)
+            model.setState(lib, PENDING if kind is None else None if kind==OA else kind)
+        # Cells are only decoded when a library is selected, or by the
+        # worker indexing them for the search
+        self._pool.submit(self._indexSnapshotJob, self._refreshGen, self.search,
+                          snap, dict(self.cdslib))
+
+    def _indexSnapshotJob(self, gen, index, snap, libraries):
+        # Runs in a worker thread, one library at a time so closing the
+        # snapshot only waits for one
+        for lib, libPath in libraries.items():
+            with self._snapshotLock:
+                if gen!=self._refreshGen or snap is not self._snapshot:
+                    return
+                cells=snap.cells(lib)
+            if cells is not None:
+                self._indexJob(gen, index, lib, libPath, cells)
+
+    def _closeSnapshot(self):
+        """Unmap the snapshot the lists were filled from."""
+        with self._snapshotLock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot=None
+        self._unverified=set()
+
+    def _saveSnapshot(self):
+        from .catalog import MISSING, OA, XSCHEM
+        kinds={}
+        model=self.widgets['libraries'].model()
+        for lib in self.cdslib:
+            state=model.state(lib)
+            if state in (None, XSCHEM, MISSING):
+                kinds[lib]=OA if state is None else state
+        self._pool.submit(self._snapshotJob, self.cad, dict(self.cdslib), kinds)
+
+    def _snapshotJob(self, cad, cdslib, kinds):
+        # Runs in a worker thread, snapshots what the catalog knows
+        from . import snapshot
+        from .catalog import MISSING, OA, XSCHEM, cache_dir
+        from .compact import CompactCatalog
+        catalog=CompactCatalog()
+        for lib, kind in kinds.items():
+            if kind==MISSING:
+                continue
+            contents=self.catalog.contents(cdslib[lib])
+            if kind==OA:
+                # The catalog has the view directories, not the viewfiles
+                contents={cell: None if views is None else dict.fromkeys(views)
+                          for cell, views in contents.items()}
+            catalog.addLibrary(lib, cdslib[lib], contents, kind==XSCHEM)
+        path=os.path.join(cache_dir(), 'snapshots', snapshot.snapshot_name(cad.cdslibPath))
+        try:
+            snapshot.write(path, cad.cdslibPath, cdslib, kinds, catalog, cad.files())
+        except OSError as e:
+            print(f"Warning: Could not write snapshot {path}: {str(e)}")
+
+    def _on_cdslib_parsed(self, gen, cdslib):
+        if gen!=self._refreshGen:
+            return
+        self._parsedGen=gen
+        oldCdslib=self.cdslib
+        self.cdslib=cdslib
+        self.watcher.watch('cdslib', self.cad.files(), self.cad.cdslibPath)
+        self._pool.submit(self._unindexJob, self.search, keep=list(self.cdslib))
+        
+        libRemoved=self._syncList('libraries', sorted(self.cdslib.keys()))
+        self._pendingLibs&=set(self.cdslib)
+        self._markLatency(self.cdslib)
+        
+        # New or moved libraries are pending until classified
+        model=self.widgets['libraries'].model()
+        changed=sorted(lib for lib in self.cdslib if oldCdslib.get(lib)!=self.cdslib[lib])
+        for lib in changed:
+            model.setState(lib, PENDING)
+            self._pendingLibs.add(lib)
+            self._submit(self._classifyJob, gen, lib, self.cdslib[lib])
+        # Libraries shown from the snapshot or before the refresh keep
+        # their colour while checked
+        self._unverified&=set(self.cdslib)-set(changed)
+        self._recheck&=set(self.cdslib)-set(changed)
+        for lib in sorted((self._unverified|self._recheck)-self._pendingLibs):
+            self._pendingLibs.add(lib)
+            self._submit(self._classifyJob, gen, lib, self.cdslib[lib])
+        if not self._pendingLibs:
+            self._futures=[]
+            self._refreshSpan.finish(libraries=len(self.cdslib))
+            self._closeSnapshot()
+            self._parseChangedCdslib()
+        
+        if libRemoved:
+            self.l_libraries()
+        elif self.lib in changed:
+            # Moved, its lists are updated from the new directory
+            self.libDir=self.cdslib[self.lib]
+            self._watchLibrary()
+            if self.cell is not None:
+                self.cellDir=os.path.join(self.libDir, self.cell)
+                self._watchCell()
+            self._updateCells()
             
-        if 'lib' in self.saveState:
-            lib=self.saveState.pop('lib')
-            if not lib:
+        self._restore('libraries', 'lib')  # Selecting it triggers l_libraries
+
+    def _on_library_classified(self, gen, lib, kind):
+        if gen!=self._refreshGen or lib not in self._pendingLibs:
+            return
+        from .catalog import MISSING, OA, XSCHEM
+        self._pendingLibs.discard(lib)
+        self.widgets['libraries'].model().setState(lib, None if kind==OA else kind)
+        self._markLatency([lib])
+        if kind in (OA, XSCHEM):
+            self._pool.submit(self._indexJob, gen, self.search, lib, self.cdslib[lib])
+        elif kind==MISSING:
+            self._pool.submit(self._unindexJob, self.search, remove=lib)
+        if lib in self._unverified or lib in self._recheck:
+            self._unverified.discard(lib)
+            self._recheck.discard(lib)
+            if lib==self.lib and kind in (OA, XSCHEM):
+                self._updateCells()
+            elif lib==self.lib and kind==MISSING:
+                self.widgets['libraries'].selectionModel().clearSelection()
+        if not self._pendingLibs:
+            # All libraries classified, the refresh is complete
+            self._futures=[]
+            self._refreshSpan.finish(libraries=len(self.cdslib))
+            self._closeSnapshot()
+            self._saveSnapshot()
+            self._pool.submit(self.latency.save)
+            self._schedulePrefetch()
+            self._parseChangedCdslib()
+
+    def _parseChangedCdslib(self):
+        """Parse cds.lib again if it changed during the refresh just completed."""
+        if self._cdslibChanged:
+            self._cdslibChanged=False
+            self._submit(self._parseJob, self._refreshGen, self.cad)
+
+    def _current(self, name):
+        """Name selected in list name, None if nothing is selected."""
+        view=self.widgets[name]
+        rows=view.selectionModel().selectedRows()
+        return view.model().name(rows[0].row()) if rows else None
+
+    def _select(self, name, text):
+        """Select text in list name, returns False if it isn't listed."""
+        view=self.widgets[name]
+        row=view.model().find(text)
+        if row<0:
+            return False
+        index=view.model().index(row)
+        view.selectionModel().setCurrentIndex(index, QItemSelectionModel.ClearAndSelect)
+        view.scrollTo(index)
+        return True
+
+    def _syncList(self, name, names):
+        """
+        Update a list in place to hold the sorted names, inserting and
+        removing rows rather than rebuilding it.
+
+        Returns:
+            True if the selected row was removed
+        """
+        view=self.widgets[name]
+        current=self._current(name)
+        selection=view.selectionModel()
+        selection.blockSignals(True)
+        view.model().sync(names)
+        removed=current is not None and view.model().find(current)<0
+        if removed:
+            selection.clear()
+        elif current is not None and self._current(name)!=current:
+            # The model was reset rather than patched
+            self._select(name, current)
+        selection.blockSignals(False)
+        return removed
+
+    def _on_watched_changed(self, groups):
+        """Apply a batch of watched filesystem changes to the lists."""
+        if 'cdslib' in groups:
+            if self._futures:
+                # The running refresh may have parsed it already
+                self._cdslibChanged=True
+            else:
+                self._submit(self._parseJob, self._refreshGen, self.cad)
+        if 'library' in groups and self.lib is not None:
+            self._updateCells()
+        elif 'cell' in groups and self.cell is not None:
+            self._updateViews()
+
+    def _poll(self):
+        if self.lib is None or self._polling:
+            return
+        self._polling=True
+        self._pool.submit(self._pollJob, self.lib, self.libDir)
+
+    def _pollJob(self, lib, libDir):
+        # Runs in a worker thread
+        with recorder.span('poll', lib=lib, path=libDir):
+            try:
+                guard.call(libDir, self.latency.probe, libDir)
+            except FsUnresponsive:
+                changes=None
+            else:
+                changes=self.catalog.rescan(libDir)
+        self.sig_library_polled.emit(lib, changes)
+
+    def _on_library_polled(self, lib, changes):
+        self._polling=False
+        self._markLatency([lib])
+        if lib!=self.lib or not changes:
+            return
+        groups=set()
+        if changes.added or changes.removed:
+            groups.add('library')
+        if self.cell in changes.changed:
+            groups.add('cell')
+        self._on_watched_changed(groups)
+
+    def _addRecent(self, item):
+        if item in self._recent:
+            self._recent.remove(item)
+        self._recent.insert(0, item)
+        del self._recent[self.RECENT:]
+
+    def _schedulePrefetch(self):
+        """Prefetch once the user has been idle for PREFETCH_IDLE ms."""
+        self._prefetchGen+=1
+        if self.get_conf('prefetch', True):
+            self._prefetchTimer.start()
+
+    def _prefetch(self):
+        """
+        Warm the catalog for the libraries and cells likely to be clicked
+        next: the neighbours of the selection, the first cells of the
+        selected library and the recent ones.
+        """
+        from .catalog import MISSING
+        model=self.widgets['libraries'].model()
+        skip=(MISSING, UNRESPONSIVE, PENDING)
+        # libPath -> cells whose views are prefetched, in order
+        work={}
+
+        def add(lib, cells=()):
+            libPath=self.cdslib.get(lib)
+            if libPath is None or model.state(lib) in skip or guard.isTripped(libPath):
                 return
-            items = self.widgets['libraries'].findItems(lib, Qt.MatchExactly)
-            if items:
-                self.widgets['libraries'].setCurrentItem(items[0])  # This will trigger itemSelectionChanged
+            work.setdefault(libPath, [])
+            work[libPath].extend(cell for cell in cells if cell not in work[libPath])
+
+        if self.lib is not None:
+            cells=self.widgets['cells'].model().names()
+            around=[]
+            if self.cell is not None:
+                row=bisect_left(cells, self.cell)
+                around=cells[max(0, row-self.PREFETCH_CELLS//4):row+self.PREFETCH_CELLS//4+1]
+            add(self.lib, cells[:self.PREFETCH_CELLS]+around)
+            names=model.names()
+            row=bisect_left(names, self.lib)
+            for offset in range(1, self.PREFETCH_LIBRARIES+1):
+                for neighbour in (row+offset, row-offset):
+                    if 0<=neighbour<len(names):
+                        add(names[neighbour])
+        for item in self._recent:
+            lib, _sep, cell=item.partition('/')
+            add(lib, [cell] if cell else ())
+        if work:
+            self._prefetchPool.submit(self._prefetchJob, self._prefetchGen, work)
+
+    def _prefetchJob(self, gen, work):
+        # Runs in the prefetch worker, gives up as soon as the user clicks
+        for libPath, cells in work.items():
+            if gen!=self._prefetchGen:
+                return
+            with recorder.span('prefetch', path=libPath, cells=len(cells)):
+                try:
+                    if not guard.probe(libPath):
+                        continue
+                    self.catalog.cells(libPath)
+                    for cell in cells:
+                        if gen!=self._prefetchGen:
+                            return
+                        self.catalog.views(libPath, cell)
+                except (FsUnresponsive, OSError):
+                    continue
+
+    def _listCells(self):
+        """
+        Cells of the current library, None if they are being scanned in the
+        background, see _on_cells_listed.
+
+        Raises:
+            FsUnresponsive: If the library is not responding, it is marked so
+        """
+        if self.lib in self._unverified:
+            cells=self._snapshot.cells(self.lib)
+            if cells is not None:
+                return cells
+        try:
+            # Only the check that the catalog listing is current is timed
+            cells=guard.call(self.libDir, self.catalog.cells, self.libDir, False)
+        except FsUnresponsive:
+            self.widgets['libraries'].model().setState(self.lib, UNRESPONSIVE)
+            raise
+        if cells is None:
+            self._pool.submit(self._listCellsJob, self.lib, self.libDir)
+        return cells
+
+    def _listViews(self):
+        """
+        Views of the current cell, empty if the library is not responding,
+        None if they are being scanned in the background, see
+        _on_views_listed.
+        """
+        if self.lib in self._unverified:
+            views=self._snapshot.views(self.lib, self.cell)
+            if views is not None:
+                return views
+        try:
+            views=guard.call(self.libDir, self.catalog.views, self.libDir, self.cell, False)
+        except FsUnresponsive:
+            return {}
+        if views is None:
+            self._pool.submit(self._listViewsJob, self.lib, self.cell, self.libDir)
+        return views
+
+    def _listCellsJob(self, lib, libDir):
+        # Runs in a worker thread, the library answered so it is scanned
+        # however long that takes
+        try:
+            cells=self.catalog.cells(libDir)
+        except OSError:
+            cells=[]
+        self.sig_cells_listed.emit(lib, cells)
+
+    def _listViewsJob(self, lib, cell, libDir):
+        # Runs in a worker thread
+        try:
+            views=self.catalog.views(libDir, cell)
+        except OSError:
+            views={}
+        self.sig_views_listed.emit(lib, cell, views)
+
+    def _on_cells_listed(self, lib, cells):
+        if lib!=self.lib:
+            return
+        self._updateCells(cells)
+        self._restore('cells', 'cell')
+
+    def _on_views_listed(self, lib, cell, views):
+        if lib!=self.lib or cell!=self.cell:
+            return
+        self._updateViews(views)
+        self._restore('views', 'view')
+
+    def _restore(self, name, key):
+        """Select the saveState entry key in list name, once."""
+        if key in self.saveState:
+            text=self.saveState.pop(key)
+            if text:
+                self._select(name, text)
+
+    def _watchLibrary(self):
+        self.watcher.watch('library', [self.libDir, os.path.join(self.libDir, 'xschemviews')],
+                           self.libDir)
+        self.watcher.unwatch('cell')
+
+    def _watchCell(self):
+        self.watcher.watch('cell', [self.cellDir, os.path.join(self.libDir, 'xschemviews', self.cell)],
+                           self.libDir)
+
+    def _updateCells(self, cells=None):
+        if cells is None:
+            try:
+                cells=self._listCells()
+            except FsUnresponsive:
+                return
+            if cells is None:
+                return
+        self._pool.submit(self._indexJob, self._refreshGen, self.search, self.lib, self.libDir, cells)
+        if self._syncList('cells', cells):
+            self.l_cells()
+        elif self.cell is not None:
+            # XSchem views live in the library directory too
+            self._updateViews()
+
+    def _updateViews(self, views=None):
+        if views is None:
+            views=self._listViews()
+            if views is None:
+                return
+        self.viewD=views
+        self._pool.submit(self._indexViewsJob, self._refreshGen, self.search,
+                          self.lib, self.cell, list(views))
+        if self._syncList('views', sorted(self.viewD.keys())):
+            self.l_views()
 
     def l_libraries(self):
         self.cell=None
-        self.widgets['cells'].clear()
-        self.widgets['views'].clear()
-        selected_item = self.widgets['libraries'].currentItem()
-        if not selected_item:
-            self.lib = None
+        self.widgets['cells'].model().clear()
+        self.widgets['views'].model().clear()
+        self.watcher.unwatch('library')
+        self.watcher.unwatch('cell')
+        self.lib = self._current('libraries')
+        if self.lib is None:
             return
         
-        self.lib = selected_item.text()
         self.libDir = self.cdslib[self.lib]
-        if not os.path.isdir(self.libDir):
-            return
-        
-        if isXschem(self.lib):
-            cells=getXschemCells(self.lib)
-        else:
-            cells=sorted([d for d in os.listdir(self.libDir) if os.path.isdir(os.path.join(self.libDir, d)) and not d.startswith('.')])
-        
-        for cell in cells:
-            item=QListWidgetItem(cell)
-            self.widgets['cells'].addItem(item)
         
-        if 'cell' in self.saveState:
-            cell=self.saveState.pop('cell')
-            if not cell:
+        with recorder.span('library click', lib=self.lib, path=self.libDir) as span:
+            try:
+                cells=self._listCells()
+            except FsUnresponsive:
+                span.set(unresponsive=True)
                 return
-            items=self.widgets['cells'].findItems(cell, Qt.MatchExactly)
-            if items:
-                self.widgets['cells'].setCurrentItem(items[0])
+            self._watchLibrary()
+            
+            if cells is None:
+                span.set(scanning=True)
+            else:
+                self.widgets['cells'].model().setNames(cells)
+                span.set(cells=len(cells))
+        self._addRecent(self.lib)
+        self._schedulePrefetch()
+        
+        if cells is not None:
+            self._restore('cells', 'cell')
         
     def l_cells(self):
         self.view=None
-        self.widgets['views'].clear()
-        selected_item = self.widgets['cells'].currentItem()
-        if not selected_item:
-            self.cell = None
+        self.widgets['views'].model().clear()
+        self.watcher.unwatch('cell')
+        self.cell = self._current('cells')
+        if self.cell is None:
             return
-        self.cell = selected_item.text()
         self.cellDir = os.path.join(self.libDir, self.cell)
         
-        
-        if isXschem(self.lib):
-            self.viewD=getXschemCellViews(self.lib, self.cell)
-            views=sorted(self.viewD.keys())
-        else:
-            self.viewD={d:dpath for d in os.listdir(self.cellDir) if os.path.isdir(dpath:=os.path.join(self.cellDir, d)) and not d.startswith('.')}
-            # views=sorted([d for d in os.listdir(self.cellDir) if os.path.isdir(os.path.join(self.cellDir, d)) and not d.startswith('.')])
-        views=sorted(self.viewD.keys())
-        for view in views:
-            item=QListWidgetItem(view)
-            self.widgets['views'].addItem(item)
+        with recorder.span('cell click', lib=self.lib, cell=self.cell, path=self.libDir) as span:
+            views=self._listViews()
+            self._watchCell()
+            self.viewD=views or {}
+            if views is None:
+                span.set(scanning=True)
+            else:
+                self.widgets['views'].model().setNames(views.keys())
+                span.set(views=len(views))
+        self._addRecent(f'{self.lib}/{self.cell}')
+        self._schedulePrefetch()
             
-        if 'view' in self.saveState:
-            view=self.saveState.pop('view')
-            if not view:
-                return
-            items=self.widgets['views'].findItems(view, Qt.MatchExactly)
-            if items:
-                self.widgets['views'].setCurrentItem(items[0])
+        if views is not None:
+            self._restore('views', 'view')
         
     def l_views(self):
-        selected_item = self.widgets['views'].currentItem()
-        if not selected_item:
-            self.view = None
+        self.view = self._current('views')
+        if self.view is None:
             return        
-        self.view = selected_item.text()
         self.viewDir = os.path.join(self.cellDir, self.view)        
         
+    def _selectedViewfile(self):
+        """
+        Viewfile of the selected view, None if there is none or the
+        library is not responding. Taken from the view listing, so no
+        cds.lib or cellview context is read on the UI thread.
+        """
+        if self.view is None:
+            return None
+        viewfile=self._viewfileOf(self.view)
+        try:
+            if viewfile is not None and guard.call(self.libDir, fs.exists, viewfile):
+                return viewfile
+        except FsUnresponsive:
+            pass
+        return None
+
     def b_Open(self):
-        lcv=oalcv(f'{self.lib}/{self.cell}/{self.view}')
-        if lcv.exists():
-            self.editor.load([lcv.viewfile])
+        with recorder.span('Open', lib=self.lib, cell=self.cell, view=self.view,
+                           path=self.cdslib.get(self.lib)):
+            viewfile=self._selectedViewfile()
+            if viewfile is not None:
+                self.editor.load([viewfile])
     
     def b_Run(self):
-        lcv=oalcv(f'{self.lib}/{self.cell}/{self.view}')
-        if lcv.exists():
-            self.console.run_script(lcv.viewfile,os.getcwd())
-    
+        with recorder.span('Run', lib=self.lib, cell=self.cell, view=self.view,
+                           path=self.cdslib.get(self.lib)):
+            viewfile=self._selectedViewfile()
+            if viewfile is not None:
+                self.console.run_script(viewfile,os.getcwd())
@@ -28,11 +28,14 @@ setup(
         "qtawesome",
         "spyder>=5.0.1",
     ],
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     entry_points={
         "spyder.plugins": [
             "eda_explorer = eda_explorer.spyder.plugin:EDAExplorer"
         ],
+        "console_scripts": [
+            "eda-explorer = eda_explorer.spyder.cli:main"
+        ],
     },
     classifiers=[
         "Operating System :: MacOS",
@@ -7,3 +7,152 @@
 """
 EDA Explorer API tests.
 """
+
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from eda_explorer.spyder import api, catalog, cli
+from eda_explorer.spyder.cadStuff import CadContext, clear_cdslib_cache, oalcv
+
+
+@pytest.fixture
+def cdslib(tmp_path, monkeypatch):
+    """A project with an OpenAccess and an XSchem library, its cds.lib path."""
+    for cell, views in {'inv': ['layout', 'schematic'], 'inv_x2': ['layout'],
+                        'nand2': ['schematic']}.items():
+        for view in views:
+            view_dir = tmp_path / 'oa' / cell / view
+            view_dir.mkdir(parents=True)
+            (view_dir / 'master.tag').write_text(f'-- Master.tag File, Rev:1.0\n{view}.oa\n')
+    (tmp_path / 'xs' / 'xschemviews' / 'buf').mkdir(parents=True)
+    (tmp_path / 'xs' / 'buf.sch').write_text('')
+    (tmp_path / 'xs' / 'xschemviews' / 'buf' / 'gen.py').write_text('')
+    (tmp_path / 'cds.lib').write_text('DEFINE oa ./oa\nDEFINE xs ./xs\nDEFINE gone ./gone\n')
+    monkeypatch.setattr(catalog, '_shared', catalog.Catalog(':memory:'))
+    clear_cdslib_cache()
+    yield str(tmp_path / 'cds.lib')
+    clear_cdslib_cache()
+    catalog._shared.close()
+
+
+def run(argv, stdin=''):
+    """Run the command line tool, its exit code and stdout."""
+    stdout = io.StringIO()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sys, 'stdin', io.StringIO(stdin))
+        mp.setattr(sys, 'stdout', stdout)
+        try:
+            code = cli.main(argv)
+        except SystemExit as e:
+            code = e.code
+    return code, stdout.getvalue()
+
+
+def test_ls(cdslib, tmp_path):
+    assert api.ls('', cdslib) == ['gone', 'oa', 'xs']
+    assert api.ls('oa', cdslib) == ['inv', 'inv_x2', 'nand2']
+    assert api.ls('/oa/inv/', cdslib) == ['layout', 'schematic']
+    assert api.ls('xs', cdslib) == ['buf']
+    assert api.ls('xs/buf', cdslib) == ['gen', 'sch']
+    assert api.ls('gone', cdslib) == []
+    with pytest.raises(ValueError, match='not found'):
+        api.ls('none', cdslib)
+    with pytest.raises(ValueError):
+        api.ls('oa/inv/layout', cdslib)
+
+
+def test_resolve(cdslib, tmp_path):
+    lcvs = ['oa/inv/layout', 'oa/nand2', 'xs/buf/sch', 'xs/buf/gen', 'oa/inv/none']
+    assert api.resolve(lcvs, 'schematic', cdslib) == {
+        'oa/inv/layout': str(tmp_path / 'oa' / 'inv' / 'layout' / 'layout.oa'),
+        'oa/nand2': str(tmp_path / 'oa' / 'nand2' / 'schematic' / 'schematic.oa'),
+        'xs/buf/sch': str(tmp_path / 'xs' / 'buf.sch'),
+        'xs/buf/gen': str(tmp_path / 'xs' / 'xschemviews' / 'buf' / 'gen.py'),
+        'oa/inv/none': None}
+
+
+def test_resolve_invalid(cdslib, tmp_path, monkeypatch):
+    lcvs = ['oa/inv/layout', 'bad', 'none/inv/layout', 'oa//layout', 'a/b/c/d', 'xs/buf/sch']
+    batches = []
+    resolve_many = api.resolve_many
+    monkeypatch.setattr(api, 'resolve_many', lambda lcvs, *args: batches.append(list(lcvs)) or
+                        resolve_many(lcvs, *args))
+    assert api.resolve(lcvs, cdslib=cdslib) == {
+        'oa/inv/layout': str(tmp_path / 'oa' / 'inv' / 'layout' / 'layout.oa'),
+        'bad': None, 'none/inv/layout': None, 'oa//layout': None, 'a/b/c/d': None,
+        'xs/buf/sch': str(tmp_path / 'xs' / 'buf.sch')}
+    # The batch that failed, then one batch of the valid strings
+    assert batches == [lcvs, ['oa/inv/layout', 'xs/buf/sch']]
+
+    with pytest.raises(ValueError):
+        api.resolve(lcvs, cdslib=cdslib, strict=True)
+
+
+def test_find(cdslib):
+    assert list(api.find('*', cdslib)) == ['gone', 'oa', 'xs']
+    assert list(api.find('oa/inv*', cdslib)) == ['oa/inv', 'oa/inv_x2']
+    assert list(api.find('*/inv*/layout', cdslib)) == ['oa/inv/layout', 'oa/inv_x2/layout']
+    assert list(api.find('*/*/s*', cdslib)) == ['oa/inv/schematic', 'oa/nand2/schematic',
+                                                'xs/buf/sch']
+    assert list(api.find('gone/*', cdslib)) == []
+    for pattern in ('', 'oa//layout', 'a/b/c/d'):
+        with pytest.raises(ValueError):
+            api.find(pattern, cdslib)
+
+
+def test_glob_walks_the_catalog(cdslib, monkeypatch):
+    ctx = CadContext(cdslib)
+    for pattern in ('*/inv*/layout', '*/*/*', 'oa/inv/layout', 'xs/buf/gen', 'oa/inv/none'):
+        assert [str(lcv) for lcv in oalcv.glob(pattern, ctx=ctx)] == list(api.find(pattern, ctx))
+    walks = []
+    walk = catalog.Catalog.walk
+    monkeypatch.setattr(catalog.Catalog, 'walk', lambda self, *args: walks.append(args) or
+                        walk(self, *args))
+    assert [str(lcv) for lcv in oalcv.glob('oa/inv', 'layout', ctx=ctx)] == ['oa/inv/layout']
+    assert len(walks) == 1
+
+
+def test_cli_ls(cdslib):
+    assert run(['--cdslib', cdslib, 'ls']) == (0, '["gone", "oa", "xs"]\n')
+    code, out = run(['--cdslib', cdslib, 'ls', 'oa/inv'])
+    assert code == 0 and json.loads(out) == ['layout', 'schematic']
+
+
+def test_cli_resolve(cdslib, tmp_path):
+    layout = str(tmp_path / 'oa' / 'inv' / 'layout' / 'layout.oa')
+    code, out = run(['--cdslib', cdslib, 'resolve', 'oa/inv/layout', 'none/inv/layout'])
+    assert code == 0 and json.loads(out) == {'oa/inv/layout': layout, 'none/inv/layout': None}
+
+    for argv in (['resolve'], ['resolve', '-']):
+        code, out = run(['--cdslib', cdslib] + argv + ['--view', 'layout'],
+                        stdin='oa/inv\n\n  oa/inv_x2/layout  \n')
+        assert code == 0
+        assert json.loads(out) == {
+            'oa/inv': layout,
+            'oa/inv_x2/layout': str(tmp_path / 'oa' / 'inv_x2' / 'layout' / 'layout.oa')}
+
+
+def test_cli_find(cdslib):
+    code, out = run(['--cdslib', cdslib, 'find', 'oa/*/layout'])
+    assert code == 0 and json.loads(out) == ['oa/inv/layout', 'oa/inv_x2/layout']
+    assert run(['--cdslib', cdslib, 'find', 'none']) == (0, '[]\n')
+
+
+def test_cli_errors(cdslib, capsys):
+    assert run(['--cdslib', cdslib, 'ls', 'none'])[0] == 1
+    assert "Library 'none' not found" in capsys.readouterr().err
+    assert run(['--cdslib', cdslib, 'resolve', '--strict', 'none/inv/layout'])[0] == 1
+    assert run(['--cdslib', cdslib, 'find', 'a/b/c/d'])[0] == 1
+
+
+def test_no_gui_imports():
+    # In a fresh interpreter, the API is for batch jobs without a display
+    code = ('import sys, eda_explorer.spyder.api, eda_explorer.spyder.cli; '
+            'print([m for m in sys.modules if m.split(".")[0] in ("qtpy", "spyder", "PyQt5")])')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
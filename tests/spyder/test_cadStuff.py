@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer cds.lib parsing tests.
+"""
+
+import os
+import runpy
+
+import pytest
+
+from eda_explorer.spyder.cadStuff import (CadContext, cdslib_files, clear_cdslib_cache,
+                                          parse_cdslib)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    clear_cdslib_cache()
+    yield
+    clear_cdslib_cache()
+
+
+def write(path, text):
+    """Write text to path, moving its mtime on so the change is always seen."""
+    exists = path.exists()
+    mtime = path.stat().st_mtime_ns if exists else 0
+    path.write_text(text)
+    if exists:
+        os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def parse(cdslib):
+    """parse_cdslib as a Refresh calls it, checking the files for changes."""
+    return parse_cdslib(str(cdslib), revalidate=True)
+
+
+def test_parse_cdslib(tmp_path):
+    write(tmp_path / 'cds.lib', 'DEFINE a ./libs/a  # comment\n'
+                                'DEFINE b /abs/b\n'
+                                'define c libs/../libs/c\n')
+    assert parse_cdslib(str(tmp_path / 'cds.lib')) == {
+        'a': str(tmp_path / 'libs' / 'a'), 'b': '/abs/b', 'c': str(tmp_path / 'libs' / 'c')}
+
+
+def test_cached_until_revalidated(tmp_path, monkeypatch):
+    cdslib = tmp_path / 'cds.lib'
+    write(cdslib, 'INCLUDE inc.lib\n')
+    write(tmp_path / 'inc.lib', 'DEFINE a /a\n')
+    libraries = parse_cdslib(str(cdslib))
+    assert parse(cdslib) is libraries
+    write(tmp_path / 'inc.lib', 'DEFINE a /a2\n')
+
+    # The cached table is served without touching the files
+    stats = []
+    stat = os.stat
+    monkeypatch.setattr(os, 'stat', lambda *args, **kwargs: stats.append(args) or
+                        stat(*args, **kwargs))
+    assert parse_cdslib(str(cdslib)) is libraries
+    assert stats == []
+    monkeypatch.undo()
+
+    assert parse(cdslib) == {'a': '/a2'}
+    clear_cdslib_cache()
+    write(tmp_path / 'inc.lib', 'DEFINE a /a3\n')
+    assert parse_cdslib(str(cdslib)) == {'a': '/a3'}
+
+
+def test_included_file_edited(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    write(tmp_path / 'cds.lib', 'INCLUDE sub/inc.lib\nDEFINE top /top\n')
+    write(tmp_path / 'sub' / 'inc.lib', 'DEFINE a ./a\n')
+    cdslib = str(tmp_path / 'cds.lib')
+    # Relative paths are relative to the file they are in
+    assert parse(cdslib) == {'a': str(tmp_path / 'sub' / 'a'), 'top': '/top'}
+
+    write(tmp_path / 'sub' / 'inc.lib', 'DEFINE a ./a\nDEFINE b /b\n')
+    assert parse(cdslib) == {'a': str(tmp_path / 'sub' / 'a'), 'b': '/b', 'top': '/top'}
+    assert sorted(cdslib_files(cdslib)) == [cdslib, str(tmp_path / 'sub' / 'inc.lib')]
+
+
+def test_softinclude_appears(tmp_path):
+    write(tmp_path / 'cds.lib', 'SOFTINCLUDE later.lib\nDEFINE a /a\n')
+    cdslib = str(tmp_path / 'cds.lib')
+    assert parse(cdslib) == {'a': '/a'}
+    assert cdslib_files(cdslib) == [cdslib]
+
+    write(tmp_path / 'later.lib', 'DEFINE b /b\n')
+    assert parse(cdslib) == {'a': '/a', 'b': '/b'}
+    assert sorted(cdslib_files(cdslib)) == [cdslib, str(tmp_path / 'later.lib')]
+
+    (tmp_path / 'later.lib').unlink()
+    assert parse(cdslib) == {'a': '/a'}
+
+
+def test_env_var_changed(tmp_path, monkeypatch):
+    monkeypatch.setenv('EDA_TEST_ROOT', '/one')
+    write(tmp_path / 'cds.lib', 'INCLUDE inc.lib\n')
+    write(tmp_path / 'inc.lib', 'DEFINE a $EDA_TEST_ROOT/a\nDEFINE b ${EDA_TEST_ROOT}/b\n')
+    cdslib = str(tmp_path / 'cds.lib')
+    assert parse(cdslib) == {'a': '/one/a', 'b': '/one/b'}
+
+    monkeypatch.setenv('EDA_TEST_ROOT', '/two')
+    assert parse(cdslib) == {'a': '/two/a', 'b': '/two/b'}
+
+    # An unset variable is left as is, and setting it is a change too
+    monkeypatch.delenv('EDA_TEST_ROOT')
+    assert parse(cdslib) == {'a': str(tmp_path / '$EDA_TEST_ROOT' / 'a'),
+                             'b': str(tmp_path / '${EDA_TEST_ROOT}' / 'b')}
+    monkeypatch.setenv('EDA_TEST_ROOT', '/three')
+    assert parse(cdslib) == {'a': '/three/a', 'b': '/three/b'}
+
+
+def test_env_var_in_include(tmp_path, monkeypatch):
+    (tmp_path / 'one').mkdir()
+    (tmp_path / 'two').mkdir()
+    write(tmp_path / 'one' / 'inc.lib', 'DEFINE a /one\n')
+    write(tmp_path / 'two' / 'inc.lib', 'DEFINE a /two\n')
+    write(tmp_path / 'cds.lib', 'INCLUDE $EDA_TEST_DIR/inc.lib\n')
+    cdslib = str(tmp_path / 'cds.lib')
+    monkeypatch.setenv('EDA_TEST_DIR', str(tmp_path / 'one'))
+    assert parse(cdslib) == {'a': '/one'}
+    monkeypatch.setenv('EDA_TEST_DIR', str(tmp_path / 'two'))
+    assert parse(cdslib) == {'a': '/two'}
+
+
+def test_define_order_across_files(tmp_path):
+    write(tmp_path / 'cds.lib', 'DEFINE a /top/a\n'
+                                'SOFTDEFINE b /top/b\n'
+                                'INCLUDE inc.lib\n'
+                                'SOFTDEFINE c /top/c\n'
+                                'DEFINE d /top/d\n')
+    write(tmp_path / 'inc.lib', 'UNDEFINE a\n'
+                                'DEFINE b /inc/b\n'
+                                'SOFTDEFINE a /inc/a\n'
+                                'DEFINE c /inc/c\n'
+                                'DEFINE d /inc/d\n')
+    cdslib = str(tmp_path / 'cds.lib')
+    # SOFTDEFINE only defines libraries not defined yet, later DEFINEs win
+    assert parse(cdslib) == {'a': '/inc/a', 'b': '/inc/b', 'c': '/inc/c', 'd': '/top/d'}
+
+    # Editing the included file recomposes the whole result in order
+    write(tmp_path / 'inc.lib', 'UNDEFINE d\nUNDEFINE b\n')
+    assert parse(cdslib) == {'a': '/top/a', 'c': '/top/c', 'd': '/top/d'}
+    write(tmp_path / 'cds.lib', 'DEFINE a /top/a\nDEFINE d /top/d\nINCLUDE inc.lib\n')
+    assert parse(cdslib) == {'a': '/top/a'}
+
+
+def test_circular_include(tmp_path):
+    write(tmp_path / 'cds.lib', 'INCLUDE inc.lib\nDEFINE a /a\n')
+    write(tmp_path / 'inc.lib', 'INCLUDE cds.lib\nDEFINE b /b\n')
+    assert parse(tmp_path / 'cds.lib') == {'a': '/a', 'b': '/b'}
+
+
+def test_cellview_context_through_symlink(tmp_path):
+    # DEFINEd through a symlinked directory, the script is run through
+    # either path
+    view = tmp_path / 'real' / 'libs' / 'mylib' / 'inv' / 'layout'
+    view.mkdir(parents=True)
+    (view / 'master.tag').write_text('-- Master.tag File, Rev:1.0\nlayout.oa\n')
+    (view / 'gen.py').write_text("lcv = CTX.oalcv('_/_/_')\n")
+    (tmp_path / 'proj').mkdir()
+    (tmp_path / 'proj' / 'libs').symlink_to(tmp_path / 'real' / 'libs')
+    write(tmp_path / 'proj' / 'cds.lib', 'DEFINE mylib libs/mylib\n')
+    lib_path = str(tmp_path / 'proj' / 'libs' / 'mylib')
+    for script in (view / 'gen.py', tmp_path / 'proj' / 'libs' / 'mylib' / 'inv' / 'layout' / 'gen.py'):
+        ctx = CadContext(str(tmp_path / 'proj' / 'cds.lib'))
+        lcv = runpy.run_path(str(script), init_globals={'CTX': ctx})['lcv']
+        assert (lcv.lib, lcv.cell, lcv.view) == ('mylib', 'inv', 'layout')
+        assert lcv.viewfile == os.path.join(lib_path, 'inv', 'layout', 'layout.oa')
+
+
+def test_oalcv_reads_the_library_table_once(tmp_path, monkeypatch):
+    (tmp_path / 'a' / 'inv' / 'layout').mkdir(parents=True)
+    write(tmp_path / 'cds.lib', 'DEFINE a ./a\n')
+    ctx = CadContext(str(tmp_path / 'cds.lib'))
+    calls = []
+    libraries = CadContext.libraries
+    monkeypatch.setattr(CadContext, 'libraries', lambda self, *args: calls.append(args) or
+                        libraries(self, *args))
+    assert ctx.oalcv('a/inv/layout').libPath == str(tmp_path / 'a')
+    assert len(calls) == 1
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer catalog tests.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from eda_explorer.spyder import catalog as catalog_module
+from eda_explorer.spyder.catalog import MISSING, OA, SCHEMA_VERSION, XSCHEM, Catalog
+from eda_explorer.spyder.scanner import XschemScanner
+
+
+def bump(path):
+    """Move the mtime of path on, changes within the mtime granularity are tested apart."""
+    mtime = path.stat().st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime, mtime))
+
+
+def oa_library(path, cells):
+    for cell, views in cells.items():
+        for view in views:
+            (path / cell / view).mkdir(parents=True)
+    return str(path)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = Catalog(str(tmp_path / 'cache' / 'catalog.sqlite'))
+    yield catalog
+    catalog.close()
+
+
+def test_oa_listing(tmp_path, catalog):
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic', 'layout'], 'nand2': ['schematic']})
+    (tmp_path / 'lib' / '.hidden').mkdir()
+    assert catalog.kind(lib) == OA
+    assert catalog.cells(lib) == ['inv', 'nand2']
+    assert catalog.views(lib, 'inv') == {'layout': str(tmp_path / 'lib' / 'inv' / 'layout'),
+                                         'schematic': str(tmp_path / 'lib' / 'inv' / 'schematic')}
+    assert catalog.views(lib, 'none') == {}
+    assert catalog.kind(str(tmp_path / 'none')) == MISSING
+    assert catalog.cells(str(tmp_path / 'none')) == []
+
+
+def test_listing_persists(tmp_path, catalog):
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic']})
+    catalog.cells(lib)
+    catalog.views(lib, 'inv')
+    catalog.close()
+    catalog = Catalog(catalog.path)
+    try:
+        # Current listings are served without scanning
+        assert catalog.cells(lib, scan=False) == ['inv']
+        assert catalog.views(lib, 'inv', scan=False) == {
+            'schematic': str(tmp_path / 'lib' / 'inv' / 'schematic')}
+    finally:
+        catalog.close()
+
+
+def test_cell_added_and_removed(tmp_path, catalog):
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic'], 'nand2': ['schematic']})
+    assert catalog.cells(lib) == ['inv', 'nand2']
+    catalog.views(lib, 'inv')
+
+    (tmp_path / 'lib' / 'buf' / 'schematic').mkdir(parents=True)
+    assert catalog.cells(lib, scan=False) is None
+    assert catalog.rescan(lib) == (['buf'], [], [])
+    assert catalog.cells(lib) == ['buf', 'inv', 'nand2']
+
+    (tmp_path / 'lib' / 'inv' / 'schematic').rmdir()
+    (tmp_path / 'lib' / 'inv').rmdir()
+    assert catalog.cells(lib) == ['buf', 'nand2']
+    assert catalog.views(lib, 'inv') == {}
+    assert 'inv' not in catalog.contents(lib)
+    assert not catalog.rescan(lib)
+
+
+def test_view_added(tmp_path, catalog):
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic'], 'nand2': ['schematic']})
+    assert list(catalog.views(lib, 'inv')) == ['schematic']
+
+    (tmp_path / 'lib' / 'inv' / 'layout').mkdir()
+    (tmp_path / 'lib' / 'nand2' / 'layout').mkdir()
+    assert catalog.views(lib, 'inv', scan=False) is None
+    # Only cells whose views were listed are polled
+    assert catalog.rescan(lib) == ([], [], ['inv'])
+    assert sorted(catalog.views(lib, 'inv', scan=False)) == ['layout', 'schematic']
+    assert sorted(catalog.views(lib, 'nand2')) == ['layout', 'schematic']
+
+
+def test_library_changes_kind(tmp_path, catalog):
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic']})
+    assert catalog.kind(lib) == OA
+    assert list(catalog.views(lib, 'inv')) == ['schematic']
+
+    (tmp_path / 'lib' / 'buf.sch').write_text('')
+    (tmp_path / 'lib' / 'inv.sym').write_text('')
+    bump(tmp_path / 'lib')
+    assert catalog.kind(lib) == XSCHEM
+    assert catalog.cells(lib) == ['buf', 'inv']
+    # The OpenAccess view listing is not kept
+    assert catalog.contents(lib) == {'buf': None, 'inv': None}
+    assert catalog.views(lib, 'inv') == {'sym': str(tmp_path / 'lib' / 'inv.sym')}
+
+    (tmp_path / 'lib' / 'buf.sch').unlink()
+    (tmp_path / 'lib' / 'inv.sym').unlink()
+    bump(tmp_path / 'lib')
+    assert catalog.kind(lib) == OA
+    assert catalog.views(lib, 'inv') == {'schematic': str(tmp_path / 'lib' / 'inv' / 'schematic')}
+
+
+def test_xschem_views(tmp_path, catalog):
+    lib = tmp_path / 'lib'
+    (lib / 'xschemviews' / 'inv').mkdir(parents=True)
+    (lib / 'inv.sch').write_text('')
+    (lib / 'xschemviews' / 'inv' / 'gen.py').write_text('')
+    assert catalog.kind(str(lib)) == XSCHEM
+    assert catalog.views(str(lib), 'inv') == {'sch': str(lib / 'inv.sch'),
+                                              'gen': str(lib / 'xschemviews' / 'inv' / 'gen.py')}
+
+    (lib / 'xschemviews' / 'inv' / 'py.py').write_text('')
+    bump(lib / 'xschemviews' / 'inv')
+    assert catalog.rescan(str(lib)) == ([], [], ['inv'])
+    assert sorted(catalog.views(str(lib), 'inv')) == ['gen', 'py', 'sch']
+
+
+def test_schema_version_rebuild(tmp_path):
+    path = str(tmp_path / 'catalog.sqlite')
+    db = sqlite3.connect(path)
+    with db:
+        db.execute('CREATE TABLE libraries (path TEXT PRIMARY KEY, stamp TEXT NOT NULL)')
+        db.execute("INSERT INTO libraries VALUES ('/old', 'stale')")
+        db.execute(f'PRAGMA user_version={SCHEMA_VERSION - 1}')
+    db.close()
+
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic']})
+    catalog = Catalog(path)
+    try:
+        assert catalog.path == path
+        assert catalog.cells(lib) == ['inv']
+        assert catalog.contents('/old') == {}
+    finally:
+        catalog.close()
+    db = sqlite3.connect(path)
+    try:
+        assert db.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        assert db.execute('SELECT path FROM libraries').fetchall() == [(lib,)]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize('broken', ['parent_is_file', 'not_a_database'])
+def test_in_memory_fallback(tmp_path, capsys, broken):
+    if broken == 'parent_is_file':
+        (tmp_path / 'file').write_text('')
+        path = str(tmp_path / 'file' / 'catalog.sqlite')
+    else:
+        path = str(tmp_path / 'catalog.sqlite')
+        (tmp_path / 'catalog.sqlite').write_bytes(b'not a database' * 100)
+    catalog = Catalog(path)
+    try:
+        assert catalog.path == ':memory:'
+        assert 'Could not open catalog' in capsys.readouterr().out
+        lib = oa_library(tmp_path / 'lib', {'inv': ['schematic']})
+        assert catalog.cells(lib) == ['inv']
+    finally:
+        catalog.close()
+
+
+def test_invalidate(tmp_path, catalog):
+    lib = oa_library(tmp_path / 'lib', {'inv': ['schematic']})
+    catalog.views(lib, 'inv')
+    catalog.invalidate(lib)
+    assert catalog.contents(lib) == {}
+    assert catalog.cells(lib, scan=False) is None
+    assert catalog.cells(lib) == ['inv']
+
+
+def test_xschem_rescan_stats(tmp_path, catalog, monkeypatch):
+    lib = tmp_path / 'lib'
+    for i in range(10):
+        (lib / 'xschemviews' / f'c{i}').mkdir(parents=True)
+        (lib / f'c{i}.sch').write_text('')
+    for cell in catalog.cells(str(lib)):
+        catalog.views(str(lib), cell)
+
+    stats = []
+    stat = os.stat
+    monkeypatch.setattr(os, 'stat', lambda path, *args, **kwargs: stats.append(path) or
+                        stat(path, *args, **kwargs))
+    assert not catalog.rescan(str(lib))
+    # The library and xschemviews directories, then one per cell
+    assert len(stats) == 12
+
+
+def test_xschem_scan_no_cell_stats(tmp_path, monkeypatch):
+    lib = tmp_path / 'lib'
+    for i in range(10):
+        (lib / 'xschemviews' / f'c{i}').mkdir(parents=True)
+        (lib / 'xschemviews' / f'c{i}' / 'gen.py').write_text('')
+    calls = []
+    for name in ('stat', 'scandir'):
+        monkeypatch.setattr(os, name, lambda path, *args, fn=getattr(os, name), **kwargs:
+                            calls.append(os.path.basename(path)) or fn(path, *args, **kwargs))
+    scanner = XschemScanner()
+    assert scanner.isXschem(str(lib))
+    assert scanner.cells(str(lib)) == [f'c{i}' for i in range(10)]
+    # The library and xschemviews directories only, listed once
+    assert set(calls) == {'lib', 'xschemviews'}
+    assert len(calls) == 6
+    calls.clear()
+    # A cell's directory is read when its views are
+    assert scanner.cellViews(str(lib), 'c3') == {'gen': str(lib / 'xschemviews' / 'c3' / 'gen.py')}
+    assert sorted(calls) == ['c3', 'c3', 'lib', 'xschemviews']
+
+
+@pytest.fixture
+def mounts(tmp_path, monkeypatch):
+    """Mount table with tmp_path/nfs on NFS and a local disk mounted inside it."""
+    table = tmp_path / 'mounts'
+    table.write_text('/dev/sda1 / ext4 rw 0 0\n'
+                     f'server:/home {tmp_path}/nfs nfs4 rw 0 0\n'
+                     f'/dev/sdb1 {tmp_path}/nfs/local\\040disk xfs rw 0 0\n')
+    monkeypatch.setattr(catalog_module, 'MOUNTS', str(table))
+    return tmp_path
+
+
+@pytest.mark.parametrize('directory, mode', [('nfs/cache', 'delete'), ('local/cache', 'wal'),
+                                             ('nfs/local disk/cache', 'wal')])
+def test_journal_mode(mounts, directory, mode):
+    # WAL needs shared memory, which NFS doesn't provide
+    catalog = Catalog(str(mounts / directory / 'catalog.sqlite'))
+    try:
+        assert catalog._db.execute('PRAGMA journal_mode').fetchone()[0] == mode
+    finally:
+        catalog.close()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer instrumentation tests.
+"""
+
+import builtins
+import os
+
+from eda_explorer.spyder.instrument import Recorder, _Fs
+
+
+def test_only_fs_calls_counted(tmp_path):
+    (tmp_path / 'f').write_text('')
+    recorder = Recorder()
+    fs = _Fs(recorder)
+    stat, scandir, open_ = os.stat, os.scandir, builtins.open
+    recorder.enable()
+    try:
+        # Nothing outside of EDA Explorer is replaced
+        assert (os.stat, os.scandir, builtins.open) == (stat, scandir, open_)
+        with recorder.span('op', path=str(tmp_path)):
+            fs.stat(tmp_path)
+            fs.exists(tmp_path / 'f')
+            with fs.scandir(tmp_path):
+                pass
+            with fs.open(tmp_path / 'f'):
+                pass
+            os.stat(tmp_path)
+            os.listdir(tmp_path)
+    finally:
+        recorder.disable()
+    [event] = recorder.events()
+    assert {k: event.get(k) for k in ('stat', 'lstat', 'listdir', 'scandir', 'open')} == \
+        {'stat': 2, 'lstat': None, 'listdir': None, 'scandir': 1, 'open': 1}
+
+
+def test_disabled_not_counted(tmp_path):
+    recorder = Recorder()
+    fs = _Fs(recorder)
+    recorder.enable()
+    span = recorder.span('op')
+    recorder.disable()
+    fs.stat(tmp_path)
+    span.finish()
+    assert 'stat' not in recorder.events()[0]
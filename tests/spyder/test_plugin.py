@@ -7,3 +7,59 @@
 """
 EDA Explorer plugin tests.
 """
+
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Imported when the browser is built, never by the plugin itself
+DEFERRED_MODULES = ['eda_explorer.spyder.api', 'eda_explorer.spyder.cadStuff',
+                    'eda_explorer.spyder.catalog', 'eda_explorer.spyder.compact',
+                    'eda_explorer.spyder.guiCreator', 'eda_explorer.spyder.instrumentpane',
+                    'eda_explorer.spyder.latency', 'eda_explorer.spyder.scanner',
+                    'eda_explorer.spyder.search', 'eda_explorer.spyder.snapshot',
+                    'concurrent.futures', 'mmap', 'sqlite3']
+
+# Spyder is imported first, it is already loaded when plugins are
+IMPORT_PLUGIN = """
+import sys
+import spyder.api.plugins, spyder.api.widgets.main_widget
+import spyder.api.preferences, spyder.api.config.decorators
+before = set(sys.modules)
+import eda_explorer.spyder.plugin
+print('\\n'.join(sorted(set(sys.modules) - before)))
+"""
+
+# Cumulative import time of the plugin module, in microseconds, with Spyder
+# loaded. Generous, a few ms are expected
+IMPORT_BUDGET_US = 250_000
+
+
+def run_import(*options):
+    """Run IMPORT_PLUGIN in a fresh interpreter, skip without Spyder."""
+    result = subprocess.run([sys.executable, *options, '-c', IMPORT_PLUGIN],
+                            capture_output=True, text=True)
+    if "No module named 'spyder" in result.stderr:
+        pytest.skip("spyder is not installed")
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_plugin_import_is_light():
+    # In a fresh interpreter, whatever this one imported already
+    result = run_import()
+    imported = result.stdout.split()
+    assert 'eda_explorer.spyder.widgets' in imported
+    for module in DEFERRED_MODULES:
+        assert module not in imported, f"{module} imported with the plugin"
+
+
+def test_plugin_import_time():
+    result = run_import('-X', 'importtime')
+    # import time: self [us] | cumulative | imported package
+    times = re.findall(r'^import time:\s*\d+ \|\s*(\d+) \| eda_explorer\.spyder\.plugin$',
+                       result.stderr, re.MULTILINE)
+    assert len(times) == 1, result.stderr
+    assert int(times[0]) < IMPORT_BUDGET_US
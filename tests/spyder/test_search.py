@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer search tests.
+"""
+
+from eda_explorer.spyder.search import EXACT, GATHER, PREFIX, SUBSTRING, SearchIndex
+
+
+def test_tiers():
+    index = SearchIndex()
+    index.setLibrary('std', ['inv', 'inv_x2', 'buf_inv', 'nand2'])
+    index.setLibrary('io', ['inv'])
+    assert [(str(m), m.tier) for m in index.search('inv')] == [
+        ('io/inv', EXACT), ('std/inv', EXACT), ('std/inv_x2', PREFIX), ('std/buf_inv', SUBSTRING)]
+    assert [str(m) for m in index.search('st/inv')] == ['std/inv', 'std/inv_x2', 'std/buf_inv']
+    assert [str(m) for m in index.search('io')] == ['io']
+
+
+def test_exact_match_beyond_gather():
+    # The exact match is indexed after more than GATHER prefix matches
+    index = SearchIndex()
+    index.setLibrary('lib', [f'inv_{i:05d}' for i in range(GATHER + 1000)] + ['inv', 'Inv'])
+    matches = index.search('inv', 5)
+    assert [(m.cell, m.tier) for m in matches[:2]] == [('inv', EXACT), ('Inv', EXACT)]
+    assert all(m.tier == PREFIX for m in matches[2:])
+    assert [m.cell for m in index.search('INV', 2)] == ['inv', 'Inv']
+
+
+def test_removed_exact_match():
+    index = SearchIndex()
+    index.setLibrary('lib', ['Inv', 'inv_x2'])
+    index.setLibrary('lib', ['inv_x2'])
+    assert [m.cell for m in index.search('inv')] == ['inv_x2']
+
+
+def test_views():
+    index = SearchIndex()
+    index.setLibrary('std', ['inv', 'nand2'], {'inv': ['schematic', 'layout'], 'nand2': None})
+    index.setLibrary('io', ['inv'])
+    assert [str(m) for m in index.search('sch')] == ['std/inv/schematic']
+    # Listed later
+    index.setViews('std', 'nand2', ['schematic'])
+    index.setViews('io', 'inv', ['schematic'])
+    assert [str(m) for m in index.search('sch')] == [
+        'io/inv/schematic', 'std/inv/schematic', 'std/nand2/schematic']
+    assert [str(m) for m in index.search('std/sch')] == ['std/inv/schematic', 'std/nand2/schematic']
+    assert [str(m) for m in index.search('/nand/sch')] == ['std/nand2/schematic']
+    assert [(m.lib, m.cell, m.view) for m in index.search('std/inv/lay')] == [('std', 'inv', 'layout')]
+    # Views of cells that went, or of libraries removed, go with them
+    index.setLibrary('std', ['nand2'])
+    index.removeLibrary('io')
+    assert [str(m) for m in index.search('sch')] == ['std/nand2/schematic']
+    assert index.search('layout') == []
+
+
+def test_short_substrings():
+    index = SearchIndex()
+    index.setLibrary('std', ['ab', 'xab', 'xa', 'bx'])
+    # Not across the end of xa into bx
+    assert [(str(m), m.tier) for m in index.search('ab')] == [('std/ab', EXACT), ('std/xab', SUBSTRING)]
+    assert [(str(m), m.tier) for m in index.search('b')] == [
+        ('std/bx', PREFIX), ('std/ab', SUBSTRING), ('std/xab', SUBSTRING)]
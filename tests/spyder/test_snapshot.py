@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Copyright © 2025, Spyder Bot
+#
+# Licensed under the terms of the Not open source
+# ----------------------------------------------------------------------------
+"""
+EDA Explorer snapshot tests.
+"""
+
+import struct
+
+import pytest
+
+from eda_explorer.spyder import snapshot
+from eda_explorer.spyder.cadStuff import CadContext, clear_cdslib_cache
+from eda_explorer.spyder.catalog import MISSING, OA, XSCHEM
+
+
+@pytest.fixture
+def project(tmp_path):
+    for cell, views in {'inv': ['schematic', 'layout'], 'nand2': ['schematic']}.items():
+        for view in views:
+            (tmp_path / 'oa' / cell / view).mkdir(parents=True)
+    (tmp_path / 'xs').mkdir()
+    (tmp_path / 'xs' / 'buf.sch').write_text('')
+    (tmp_path / 'cds.lib').write_text('DEFINE oa ./oa\nDEFINE xs ./xs\nDEFINE gone ./gone\n')
+    clear_cdslib_cache()
+    yield CadContext(str(tmp_path / 'cds.lib'))
+    clear_cdslib_cache()
+
+
+def save(ctx, path):
+    snap = snapshot.build(ctx)
+    snapshot.write(str(path), snap.cdslib, snap.libraries, snap.kinds, snap.catalog, ctx.files())
+    return snap
+
+
+def test_round_trip(tmp_path, project):
+    save(project, tmp_path / 'project.snap')
+    snap = snapshot.load(str(tmp_path / 'project.snap'))
+    try:
+        assert snap.cdslib == str(tmp_path / 'cds.lib')
+        assert snap.libraries == project.libraries()
+        assert snap.kinds == {'oa': OA, 'xs': XSCHEM, 'gone': MISSING}
+        assert snap.cells('oa') == ['inv', 'nand2']
+        assert snap.cells('xs') == ['buf']
+        assert snap.cells('gone') is None
+        assert sorted(snap.views('oa', 'inv')) == ['layout', 'schematic']
+        assert snap.views('oa', 'inv')['layout'] == str(tmp_path / 'oa' / 'inv' / 'layout')
+        assert snap.views('xs', 'buf') == {'sch': str(tmp_path / 'xs' / 'buf.sch')}
+        assert snap.views('oa', 'none') is None
+        assert not snap.filesChanged()
+        (tmp_path / 'cds.lib').write_text('DEFINE oa ./oa\n')
+        assert snap.filesChanged()
+    finally:
+        snap.close()
+    snap.close()
+
+
+def test_reject_truncated(tmp_path, project):
+    path = tmp_path / 'project.snap'
+    save(project, path)
+    data = path.read_bytes()
+    for size in (4, snapshot._PREAMBLE.size + 10, len(data) - 8):
+        path.write_bytes(data[:size])
+        assert snapshot.load(str(path)) is None, size
+    path.write_bytes(b'')
+    assert snapshot.load(str(path)) is None
+    assert snapshot.load(str(tmp_path / 'none.snap')) is None
+
+
+def test_reject_other_version(tmp_path, project):
+    path = tmp_path / 'project.snap'
+    save(project, path)
+    data = bytearray(path.read_bytes())
+    magic, version, length = snapshot._PREAMBLE.unpack_from(data)
+    struct.pack_into('<I', data, len(magic), version + 1)
+    path.write_bytes(bytes(data))
+    assert snapshot.load(str(path)) is None
+    path.write_bytes(b'NOTASNAP' + bytes(data[len(magic):]))
+    assert snapshot.load(str(path)) is None
+
+
+def test_find_newest(tmp_path, project, monkeypatch):
+    user = tmp_path / 'cache'
+    team = tmp_path / 'team'
+    monkeypatch.setenv('EDA_EXPLORER_CACHE', str(user))
+    monkeypatch.setenv('EDA_EXPLORER_SNAPSHOT_DIR', str(team))
+    name = snapshot.snapshot_name(project.cdslibPath)
+    save(project, user / 'snapshots' / name)
+    save(project, team / name)
+
+    loaded = []
+    load = snapshot.load
+    monkeypatch.setattr(snapshot, 'load', lambda path: loaded.append(load(path)) or loaded[-1])
+    snap = snapshot.find(project.cdslibPath)
+    try:
+        # The team snapshot was written last, the user's one is unmapped
+        assert len(loaded) == 2 and snap is loaded[1]
+        assert loaded[0]._mmap is None
+        assert snap.cells('oa') == ['inv', 'nand2']
+    finally:
+        snap.close()
@@ -7,3 +7,465 @@
 """
 EDA Explorer widget tests.
 """
+
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('pytestqt')
+
+from qtpy.QtWidgets import QMainWindow
+
+from eda_explorer.spyder import cadStuff, snapshot
+from eda_explorer.spyder.cadStuff import clear_cdslib_cache
+from eda_explorer.spyder.catalog import MISSING, XSCHEM
+from eda_explorer.spyder.instrument import recorder
+from eda_explorer.spyder.models import NameListModel
+from eda_explorer.spyder.widgets import EDAExplorerWidget
+
+# Each browser registers its actions and toolbars under the same ids
+pytestmark = pytest.mark.filterwarnings('ignore:There already exists a reference')
+
+
+class Parent(QMainWindow):
+    widgetlist = []
+
+
+class Widget(EDAExplorerWidget):
+    """The browser with its options in a dict rather than Spyder's config."""
+    CONF_SECTION = 'eda_explorer'
+
+    def __init__(self, conf, parent):
+        self.conf = dict(conf)
+        super().__init__(name='eda_explorer', plugin=None, parent=parent)
+
+    def get_conf(self, option, default=None, section=None):
+        return self.conf.get(option, default)
+
+    def set_conf(self, option, value, section=None, recursive_notification=True):
+        self.conf[option] = value
+
+
+@pytest.fixture
+def make_widget(qtbot, tmp_path, monkeypatch):
+    """Create browsers with the given options, caching under tmp_path."""
+    monkeypatch.setenv('EDA_EXPLORER_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.delenv('EDA_EXPLORER_SNAPSHOT_DIR', raising=False)
+    monkeypatch.delenv('PROJHOME', raising=False)
+    widgets = []
+
+    def make(build=True, **conf):
+        parent = Parent()
+        qtbot.addWidget(parent)
+        widget = Widget(conf, parent)
+        widget._setup()
+        widget.setup()
+        if build:
+            widget.build()
+        widgets.append(widget)
+        return widget
+    yield make
+    for widget in widgets:
+        widget.on_close()
+
+
+@pytest.fixture
+def cdslib(tmp_path):
+    """A project with an OpenAccess and an XSchem library, its cds.lib path."""
+    for cell, views in {'inv': ['layout', 'schematic'], 'nand2': ['schematic']}.items():
+        for view in views:
+            view_dir = tmp_path / 'oa' / cell / view
+            view_dir.mkdir(parents=True)
+            (view_dir / 'master.tag').write_text(f'-- Master.tag File, Rev:1.0\n{view}.oa\n')
+            (view_dir / f'{view}.oa').write_text('')
+    (tmp_path / 'xs').mkdir()
+    (tmp_path / 'xs' / 'buf.sch').write_text('')
+    (tmp_path / 'cds.lib').write_text('DEFINE oa ./oa\nDEFINE xs ./xs\n')
+    clear_cdslib_cache()
+    yield tmp_path / 'cds.lib'
+    clear_cdslib_cache()
+
+
+def write(path, text):
+    """Write text to path, moving its mtime on so the change is always seen."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def names(widget, pane):
+    return widget.widgets[pane].model().names()
+
+
+def view(cdslib, lib, cell, name):
+    """Add an OpenAccess view to the project of cdslib."""
+    view_dir = cdslib.parent / lib / cell / name
+    view_dir.mkdir(parents=True)
+    (view_dir / 'master.tag').write_text(f'-- Master.tag File, Rev:1.0\n{name}.oa\n')
+    (view_dir / f'{name}.oa').write_text('')
+
+
+def refresh(qtbot, widget, cdslib=None):
+    """Refresh widget, of cdslib if given, and wait for it to complete."""
+    if cdslib is not None:
+        widget.widgets['cdslib'].setText(str(cdslib))
+    widget.b_Refresh()
+    qtbot.waitUntil(lambda: not widget._futures)
+
+
+def select(qtbot, widget, *names):
+    """Select a library, cell and view, waiting for each to be listed."""
+    for pane, name in zip(('libraries', 'cells', 'views'), names):
+        qtbot.waitUntil(lambda: widget.widgets[pane].model().find(name) >= 0)
+        assert widget._select(pane, name)
+
+
+@pytest.fixture
+def model(qtbot):
+    """A NameListModel, the row insertions, removals and resets it signals."""
+    model = NameListModel()
+    model.signals = []
+    model.rowsInserted.connect(lambda parent, first, last: model.signals.append(('+', first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: model.signals.append(('-', first, last)))
+    model.modelReset.connect(lambda: model.signals.append(('reset',)))
+    return model
+
+
+def shown(model):
+    return [model.data(model.index(row)) for row in range(model.rowCount())]
+
+
+def test_sync_partly_loaded(model):
+    model.BATCH = 4
+    model.setStyle('busy', 'orange')
+    model.setMarkStyle('hit', 'yellow')
+    names = [f'n{i:02d}' for i in range(20)]
+    model.setNames(names)
+    model.setState('n02', 'busy')
+    model.setMark('n09', 'hit')
+    assert model.rowCount() == 4
+    model.signals.clear()
+
+    new = [name for name in names if name not in ('n01', 'n03', 'n04', 'n05', 'n08')]
+    new += ['n00a', 'n10a', 'zz']
+    model.sync(new)
+    # Runs are removed from the bottom, only their loaded rows are signalled,
+    # and insertions are signalled at their final rows when they are loaded
+    assert model.signals == [('-', 3, 3), ('-', 1, 1), ('+', 1, 1)]
+    assert shown(model) == ['n00', 'n00a', 'n02']
+    assert model.names() == sorted(new)
+    assert model.state('n02') == 'busy' and model.state('n00a') is None
+    assert model.mark('n09') == 'hit' and model.mark('n10a') is None
+
+    while model.canFetchMore():
+        model.fetchMore()
+    assert shown(model) == sorted(new)
+
+
+def test_sync_model_tester(model, qtmodeltester):
+    model.BATCH = 4
+    names = [f'n{i:02d}' for i in range(20)]
+    model.setNames(names)
+    # The tester fetches rows itself whenever the model changes
+    qtmodeltester.check(model)
+    model.sync([name for name in names if name[-1] not in '147'] + ['n00a', 'n13a', 'zz'])
+    model.sync(names[5:])
+    model.sync(names)
+
+
+def test_sync_fully_loaded(model):
+    model.setNames(['b', 'd'])
+    model.signals.clear()
+    model.sync(['a', 'd', 'e'])
+    # Appended rows are loaded when every row was
+    assert model.signals == [('-', 0, 0), ('+', 0, 0), ('+', 2, 2)]
+    assert shown(model) == ['a', 'd', 'e']
+    assert not model.canFetchMore()
+
+
+def test_sync_runs(model):
+    model.setNames(['a', 'b', 'c', 'g', 'h'])
+    model.signals.clear()
+    model.sync(['a', 'd', 'e', 'f', 'h', 'i', 'j'])
+    # Consecutive rows are removed and inserted together
+    assert model.signals == [('-', 1, 3), ('+', 1, 3), ('+', 5, 6)]
+    assert shown(model) == ['a', 'd', 'e', 'f', 'h', 'i', 'j']
+
+
+def test_sync_reset(model):
+    model.BATCH = 4
+    model.setNames([f'a{i:02d}' for i in range(20)])
+    model.setStyle('busy', 'orange')
+    model.setState('a00', 'busy')
+    model.signals.clear()
+    # Mostly new names, cheaper to reset
+    new = ['a00'] + [f'b{i:02d}' for i in range(20)]
+    model.sync(new)
+    assert model.signals == [('reset',)]
+    assert model.rowCount() == 4 and model.names() == new
+    assert model.state('a00') is None
+
+
+def test_sync_beyond_batch(model):
+    names = [f'cell{i:05d}' for i in range(3 * NameListModel.BATCH)]
+    model.setNames(names)
+    assert model.rowCount() == NameListModel.BATCH
+    model.signals.clear()
+
+    # Changes past the loaded rows leave the view alone
+    new = names[:2000] + names[2100:] + ['cell02000a', 'cell99999']
+    model.sync(new)
+    assert model.signals == []
+    assert model.rowCount() == NameListModel.BATCH and model.canFetchMore()
+    assert model.names() == sorted(new)
+
+    new = names[:10] + names[11:] + ['cell00000a']
+    model.sync(new)
+    assert model.signals == [('-', 10, 10), ('+', 1, 1)]
+    assert model.rowCount() == NameListModel.BATCH
+    while model.canFetchMore():
+        model.fetchMore()
+    assert shown(model) == sorted(new)
+
+
+def set_option(widget, option, value):
+    widget.conf[option] = value
+    getattr(widget, {'instrument': 'on_instrument_change'}[option])(value)
+
+
+def test_instrument_option(make_widget):
+    widget = make_widget(build=False)
+    assert not recorder.enabled
+    try:
+        set_option(widget, 'instrument', True)
+        assert recorder.enabled
+    finally:
+        set_option(widget, 'instrument', False)
+    assert not recorder.enabled
+
+
+def test_instrument_option_leaves_trace_on(make_widget):
+    # As $EDA_EXPLORER_TRACE enables it at import
+    recorder.enable()
+    try:
+        widget = make_widget(build=False, instrument=False)
+        assert recorder.enabled
+        set_option(widget, 'instrument', True)
+        set_option(widget, 'instrument', False)
+        assert recorder.enabled
+    finally:
+        recorder.disable()
+
+
+class Editor:
+    def __init__(self):
+        self.loaded = []
+
+    def load(self, filenames):
+        self.loaded.extend(filenames)
+
+
+# Seconds setup, build and starting the first refresh may take. Generous,
+# the refresh itself runs in the background
+STARTUP_BUDGET = {'setup': 0.5, 'build': 0.5, 'refresh': 0.2}
+
+
+def test_startup_times(qtbot, make_widget, cdslib, monkeypatch):
+    monkeypatch.setenv('PROJHOME', str(cdslib.parent))
+    widget = make_widget()
+    assert sorted(widget.startupTimes) == sorted(STARTUP_BUDGET)
+    for step, budget in STARTUP_BUDGET.items():
+        assert widget.startupTimes[step] < budget, step
+    qtbot.waitUntil(lambda: names(widget, 'libraries') == ['oa', 'xs'])
+    qtbot.waitUntil(lambda: not widget._futures)
+
+
+def test_open(qtbot, make_widget, cdslib, monkeypatch):
+    widget = make_widget()
+    widget.editor = Editor()
+    refresh(qtbot, widget, cdslib)
+    select(qtbot, widget, 'oa', 'inv', 'schematic')
+    # The view listing is used, not the cds.lib and the caller's context
+    monkeypatch.setattr(cadStuff, 'oalcv', None)
+    widget.b_Open()
+    assert widget.editor.loaded == [str(cdslib.parent / 'oa' / 'inv' / 'schematic' / 'schematic.oa')]
+
+    (cdslib.parent / 'oa' / 'inv' / 'schematic' / 'schematic.oa').unlink()
+    widget.b_Open()
+    select(qtbot, widget, 'xs', 'buf', 'sch')
+    widget.b_Open()
+    assert widget.editor.loaded[1:] == [str(cdslib.parent / 'xs' / 'buf.sch')]
+
+
+def test_cdslib_changed_during_refresh(qtbot, make_widget, cdslib, monkeypatch):
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    # The refresh is held in classification, after its cds.lib parse
+    release = threading.Event()
+    kind = widget.catalog.kind
+
+    def held(path):
+        release.wait(10)
+        return kind(path)
+    monkeypatch.setattr(widget.catalog, 'kind', held)
+    widget.b_Refresh()
+    qtbot.waitUntil(lambda: widget._parsedGen == widget._refreshGen)
+
+    # The change is delivered here rather than by the watcher
+    widget.watcher.unwatch('cdslib')
+    write(cdslib, cdslib.read_text() + 'DEFINE oa2 ./oa\n')
+    widget._on_watched_changed({'cdslib'})
+    assert widget._futures and names(widget, 'libraries') == ['oa', 'xs']
+    release.set()
+    qtbot.waitUntil(lambda: names(widget, 'libraries') == ['oa', 'oa2', 'xs'])
+
+
+def test_refresh(qtbot, make_widget, cdslib):
+    write(cdslib, cdslib.read_text() + 'DEFINE gone ./gone\n')
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    libraries = widget.widgets['libraries'].model()
+    assert libraries.names() == ['gone', 'oa', 'xs']
+    assert [libraries.state(lib) for lib in libraries.names()] == [MISSING, None, XSCHEM]
+    select(qtbot, widget, 'oa', 'inv')
+    assert names(widget, 'cells') == ['inv', 'nand2']
+    # Scanned in the background the first time
+    qtbot.waitUntil(lambda: names(widget, 'views') == ['layout', 'schematic'])
+
+
+def test_refresh_in_place(qtbot, make_widget, cdslib):
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    select(qtbot, widget, 'oa', 'inv', 'schematic')
+    resets = []
+    for pane in ('libraries', 'cells', 'views'):
+        widget.widgets[pane].model().modelReset.connect(lambda pane=pane: resets.append(pane))
+
+    write(cdslib, 'DEFINE oa ./oa\nDEFINE oa2 ./oa\n')
+    view(cdslib, 'oa', 'buf', 'schematic')
+    view(cdslib, 'oa', 'inv', 'symbol')
+    refresh(qtbot, widget)
+    qtbot.waitUntil(lambda: names(widget, 'cells') == ['buf', 'inv', 'nand2'])
+    qtbot.waitUntil(lambda: names(widget, 'views') == ['layout', 'schematic', 'symbol'])
+    # Rows came and went without resets, the selection stayed
+    assert names(widget, 'libraries') == ['oa', 'oa2']
+    assert widget.widgets['libraries'].model().state('oa') is None
+    assert resets == []
+    assert [widget._current(pane) for pane in ('libraries', 'cells', 'views')] == ['oa', 'inv', 'schematic']
+
+    # The selected library is gone
+    write(cdslib, 'DEFINE oa2 ./oa\n')
+    refresh(qtbot, widget)
+    assert names(widget, 'libraries') == ['oa2']
+    assert widget.lib is None and names(widget, 'cells') == []
+
+
+def test_refresh_switched(qtbot, make_widget, cdslib):
+    other = cdslib.parent / 'other' / 'cds.lib'
+    other.parent.mkdir()
+    other.write_text('DEFINE other ../oa\n')
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    select(qtbot, widget, 'oa', 'inv')
+    # Switching cds.lib cancels the refresh in progress
+    widget.widgets['cdslib'].setText(str(cdslib))
+    widget.b_Refresh()
+    refresh(qtbot, widget, other)
+    assert names(widget, 'libraries') == ['other']
+    assert widget.lib is None and names(widget, 'cells') == []
+
+
+def test_cdslib_watched(qtbot, make_widget, cdslib):
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    write(cdslib, cdslib.read_text() + 'DEFINE oa2 ./oa\n')
+    # Parsed again without a Refresh
+    qtbot.waitUntil(lambda: names(widget, 'libraries') == ['oa', 'oa2', 'xs'])
+    qtbot.waitUntil(lambda: not widget._futures)
+    assert widget.widgets['libraries'].model().state('oa2') is None
+
+
+def test_snapshot_cells_not_decoded_on_ui_thread(qtbot, make_widget, cdslib, monkeypatch):
+    snap = snapshot.build(cadStuff.CadContext(str(cdslib)))
+    threads = []
+    cells = snap.cells
+    monkeypatch.setattr(snap, 'cells', lambda lib: threads.append(threading.current_thread()) or
+                        cells(lib))
+    widget = make_widget()
+    # Only the snapshot lists the libraries, the refresh never completes
+    # so it isn't waited for
+    monkeypatch.setattr(widget, '_parseJob', lambda gen, cad: None)
+    widget.widgets['cdslib'].setText(str(cdslib))
+    widget.b_Refresh()
+    widget._showSnapshot(widget._refreshGen, snap)
+    assert names(widget, 'libraries') == ['oa', 'xs']
+    qtbot.waitUntil(lambda: [str(m) for m in widget.search.search('nand')] == ['oa/nand2'])
+    assert threads and threading.main_thread() not in threads
+    # Decoded when the library is selected
+    select(qtbot, widget, 'oa')
+    assert names(widget, 'cells') == ['inv', 'nand2']
+
+
+def test_search(qtbot, make_widget, cdslib):
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    results = widget.widgets['results']
+    widget.widgets['search'].setText('nand')
+    assert not results.isHidden()
+    qtbot.waitUntil(lambda: 'oa/nand2' in results.model().stringList())
+    # Picking a match selects its library and cell
+    row = results.model().stringList().index('oa/nand2')
+    results.setCurrentIndex(results.model().index(row))
+    qtbot.waitUntil(lambda: names(widget, 'views') == ['schematic'])
+    assert (widget.lib, widget.cell) == ('oa', 'nand2')
+
+    widget.widgets['search'].setText('')
+    assert results.isHidden() and results.model().stringList() == []
+
+
+def test_search_views(qtbot, make_widget, cdslib):
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    # Indexed once listed
+    select(qtbot, widget, 'oa', 'inv')
+    qtbot.waitUntil(lambda: names(widget, 'views') == ['layout', 'schematic'])
+    select(qtbot, widget, 'xs')
+    widget.widgets['search'].setText('lay')
+    results = widget.widgets['results']
+    qtbot.waitUntil(lambda: 'oa/inv/layout' in results.model().stringList())
+    row = results.model().stringList().index('oa/inv/layout')
+    results.setCurrentIndex(results.model().index(row))
+    qtbot.waitUntil(lambda: widget.view == 'layout')
+    assert (widget.lib, widget.cell) == ('oa', 'inv')
+
+
+def test_search_updated(qtbot, make_widget, cdslib):
+    widget = make_widget()
+    refresh(qtbot, widget, cdslib)
+    widget.widgets['search'].setText('buf')
+    results = widget.widgets['results'].model()
+    qtbot.waitUntil(lambda: 'xs/buf' in results.stringList())
+    assert 'oa/buf' not in results.stringList()
+    # The matches follow the index as the library is reindexed
+    view(cdslib, 'oa', 'buf', 'schematic')
+    refresh(qtbot, widget)
+    qtbot.waitUntil(lambda: 'oa/buf' in results.stringList())
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_prefetch(qtbot, make_widget, cdslib, monkeypatch, prefetch):
+    monkeypatch.setattr(Widget, 'PREFETCH_IDLE', 0)
+    widget = make_widget(prefetch=prefetch)
+    refresh(qtbot, widget, cdslib)
+    libPath = widget.cdslib['oa']
+    assert widget.catalog.views(libPath, 'nand2', False) is None
+    select(qtbot, widget, 'oa')
+    if prefetch:
+        # The views of the first cells are listed before they are clicked
+        qtbot.waitUntil(lambda: widget.catalog.views(libPath, 'nand2', False) is not None)
+        assert widget.catalog.views(libPath, 'inv', False) is not None
+        assert widget._recent == ['oa']
+    else:
+        qtbot.wait(200)
+        assert widget.catalog.views(libPath, 'nand2', False) is None